@@ -0,0 +1,289 @@
+# This file contains performance benchmarks for scoring, dealing and loading decks, and
+# compares them against a saved baseline so slowdowns are caught.
+#
+# Each benchmark runs one operation over and over and records:
+#   ops_per_sec        operations per second (best of a few timed runs)
+#   peak_bytes_per_op  memory allocated at the peak of one operation (from tracemalloc),
+#                      averaged over a few operations
+#   blocks_per_op      memory blocks each operation leaves allocated, such as new cache
+#                      entries or leaks (from sys.getallocatedblocks), averaged over many
+#
+# Usage:
+#   python Benchmark.py run [--output baseline.json] [--only score_hand] [--targets]
+#   python Benchmark.py compare baseline.json [--threshold 0.1] [--targets]
+#
+# compare exits with status 1 when any benchmark is slower than the baseline by more than
+# the threshold (a fraction), or needs more memory by more than the threshold. With --targets,
+# both commands also exit with status 1 when a benchmark in TARGET_OPS_PER_SEC is slower than
+# its target.
+
+from DecksAndCards.Card import CARDS
+from DecksAndCards.Deck import Deck, ReusableDeck, parse_card_token
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+import Cribbage
+import Game
+
+DEFAULT_THRESHOLD = 0.1
+# Memory measurements wobble by a few bytes from run to run, so growth below this is ignored
+MEMORY_SLACK_BYTES = 256
+# Blocks per operation wobble too, as caches fill
+BLOCK_SLACK = 1
+_REPEATS = 3
+
+def _random_deals(count=1000, seed=0):
+    rng = random.Random(seed)
+    deals = []
+    for _ in range(count):
+        cards = rng.sample(CARDS, 5)
+        deals.append((cards[:4], cards[4]))
+    return deals
+
+def _score_fixed(tokens):
+    def setup():
+        cards = [parse_card_token(token) for token in tokens]
+        hand, cut_card = cards[:4], cards[4]
+        return lambda: Cribbage.score_hand(hand, cut_card)
+    return setup
+
+def _score_random(score):
+    def setup():
+        deals = itertools.cycle(_random_deals())
+        return lambda: score(*next(deals))
+    return setup
+
+def _shuffle():
+    deck = Deck(rng=random.Random(0))
+    return deck.shuffle
+
+def _shuffle_and_deal():
+    rng = random.Random(0)
+
+    def deal():
+        deck = Deck(cards=list(CARDS), rng=rng)
+        deck.shuffle()
+        return deck.draw(6), deck.draw(6), deck.draw()
+    return deal
+
+def _reusable_deal():
+    deck = ReusableDeck(rng=random.Random(0))
+
+    def deal():
+        deck.reset()
+        return deck.draw(6), deck.draw(6), deck.draw()
+    return deal
+
+def _from_file():
+    # The operation holds on to the directory, which is removed once the operation is dropped
+    directory = tempfile.TemporaryDirectory()
+    path = os.path.join(directory.name, "deck.csv")
+    with open(path, 'w', newline='') as file:
+        file.write("value,suit\n")
+        for card in CARDS:
+            file.write(f"{card.value.name},{card.suit.name}\n")
+
+    def load():
+        return Deck.from_file(path)
+    load.directory = directory
+    return load
+
+def _play_games(strategy_name):
+    def setup():
+        # The same 100 games over and over, so every timed run plays the same mix of long and short games
+        seeds = itertools.cycle(range(100))
+        strategies = [Game.STRATEGIES[strategy_name](), Game.STRATEGIES[strategy_name]()]
+        return lambda: Game.play_game(strategies, random.Random(next(seeds)))
+    return setup
+
+# Name to a setup function that prepares the inputs and returns the operation to time
+BENCHMARKS = {
+    "score_hand_random": _score_random(Cribbage.score_hand),
+    "score_hand_29": _score_fixed(["5H", "5C", "5D", "JS", "5S"]),
+    "score_hand_double_double_run": _score_fixed(["3H", "3D", "4C", "4S", "5H"]),
+    "score_breakdown_random": _score_random(Cribbage.score_breakdown),
+    "check_15s": _score_random(lambda hand, cut_card: Cribbage.check_15s(hand, cut_card, 0)),
+    "check_pairs": _score_random(lambda hand, cut_card: Cribbage.check_pairs(hand, cut_card, 0)),
+    "check_runs": _score_random(lambda hand, cut_card: Cribbage.check_runs(hand, cut_card, 0)),
+    "check_flushes": _score_random(lambda hand, cut_card: Cribbage.check_flushes(hand, cut_card, 0)),
+    "check_nibs_and_nobs": _score_random(lambda hand, cut_card: Cribbage.check_nibs_and_nobs(hand, cut_card, 0)),
+    "deck_construction": lambda: Deck,
+    "deck_shuffle": _shuffle,
+    "deck_shuffle_and_deal": _shuffle_and_deal,
+    "reusable_deck_deal": _reusable_deal,
+    "deck_from_file": _from_file,
+    "game_random": _play_games("random"),
+    "game_greedy": _play_games("greedy"),
+}
+
+# Operations per second (on one core) that a benchmark should reach, whatever the baseline.
+# They depend on the machine, so they are only checked with --targets. On the machine they were
+# set on, random games ran at about 850-1,500 games per second and greedy games, which score 15
+# ways to discard with their expected crib values for every hand dealt, at about 350-650.
+TARGET_OPS_PER_SEC = {
+    "game_random": 1000,
+    "game_greedy": 400,
+}
+
+def measure(operation, min_time=0.2):
+    """
+    Times an operation and measures its memory use.
+
+    Returns:
+        dict: ops_per_sec, peak_bytes_per_op and blocks_per_op
+    """
+    # Warm up caches, then find a number of calls that takes at least min_time
+    operation()
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            operation()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        number *= 2 if elapsed == 0 else max(2, min(10, int(min_time / elapsed) + 1))
+    best = elapsed
+    for _ in range(_REPEATS - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            operation()
+        best = min(best, time.perf_counter() - start)
+
+    samples = 20
+    peak_total = 0
+    tracemalloc.start()
+    try:
+        for _ in range(samples):
+            before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            operation()
+            peak_total += tracemalloc.get_traced_memory()[1] - before
+    finally:
+        tracemalloc.stop()
+
+    block_samples = 100
+    before = sys.getallocatedblocks()
+    for _ in range(block_samples):
+        operation()
+    blocks = (sys.getallocatedblocks() - before) / block_samples
+    return {"ops_per_sec": number / best, "peak_bytes_per_op": peak_total / samples, "blocks_per_op": blocks}
+
+def run_benchmarks(names=None, min_time=0.2, report=None):
+    """
+    Runs the named benchmarks (default: all of them).
+
+    Args:
+        report: optional callable given (name, result) as each benchmark finishes
+
+    Returns:
+        dict: name to the measure result
+    """
+    results = {}
+    for name in names or BENCHMARKS:
+        if name not in BENCHMARKS:
+            raise ValueError(f"Unknown benchmark: {name}")
+        results[name] = measure(BENCHMARKS[name](), min_time=min_time)
+        if report is not None:
+            report(name, results[name])
+    return results
+
+def compare_results(baseline, current, threshold=DEFAULT_THRESHOLD):
+    """
+    Compares benchmark results against a baseline. Benchmarks missing from either are skipped.
+
+    Returns:
+        list: (name, description) for each regression beyond the threshold
+    """
+    regressions = []
+    for name, result in current.items():
+        if name not in baseline:
+            continue
+        base = baseline[name]
+        if result["ops_per_sec"] < base["ops_per_sec"] * (1 - threshold):
+            regressions.append((name, f"{result['ops_per_sec']:.0f} ops/s, baseline {base['ops_per_sec']:.0f}"))
+        if result["peak_bytes_per_op"] > base["peak_bytes_per_op"] * (1 + threshold) + MEMORY_SLACK_BYTES:
+            regressions.append((name, f"{result['peak_bytes_per_op']:.0f} bytes/op, baseline {base['peak_bytes_per_op']:.0f}"))
+        # Baselines saved before blocks were counted don't have them
+        if "blocks_per_op" in base and \
+                result["blocks_per_op"] > base["blocks_per_op"] * (1 + threshold) + BLOCK_SLACK:
+            regressions.append((name, f"{result['blocks_per_op']:.1f} blocks/op, baseline {base['blocks_per_op']:.1f}"))
+    return regressions
+
+def check_targets(results, targets=TARGET_OPS_PER_SEC):
+    """
+    Checks benchmark results against their targets in operations per second.
+
+    Returns:
+        list: (name, description) for each benchmark slower than its target
+    """
+    misses = []
+    for name, result in results.items():
+        if name in targets and result["ops_per_sec"] < targets[name]:
+            misses.append((name, f"{result['ops_per_sec']:.0f} ops/s, target {targets[name]}"))
+    return misses
+
+def save_baseline(path, results):
+    """Writes benchmark results, with the Python version they were run on, as JSON"""
+    with open(path, 'w') as file:
+        json.dump({"python": platform.python_version(), "benchmarks": results}, file, indent=2)
+
+def load_baseline(path):
+    """Reads the benchmark results written by save_baseline"""
+    with open(path) as file:
+        return json.load(file)["benchmarks"]
+
+def _print_result(name, result, base=None):
+    line = (f"{name:32} {result['ops_per_sec']:>14,.0f} ops/s {result['peak_bytes_per_op']:>10,.0f} bytes/op"
+            f" {result['blocks_per_op']:>6.1f} blocks/op")
+    if base is not None:
+        change = result["ops_per_sec"] / base["ops_per_sec"] - 1
+        line += f"   {change:+.1%} vs baseline"
+    print(line)
+
+def _report_targets(results):
+    misses = check_targets(results)
+    for name, description in misses:
+        print(f"BELOW TARGET {name}: {description}")
+    return 1 if misses else 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark scoring, dealing and deck loading")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run", help="run the benchmarks")
+    run_parser.add_argument("--output", help="save the results as a baseline JSON file")
+    compare_parser = commands.add_parser("compare", help="run the benchmarks and compare them to a baseline")
+    compare_parser.add_argument("baseline", help="baseline JSON file written by run --output")
+    compare_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                                help="allowed slowdown as a fraction (default 0.1)")
+    for command_parser in (run_parser, compare_parser):
+        command_parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), help="benchmarks to run")
+        command_parser.add_argument("--min-time", type=float, default=0.2, help="seconds per timed run")
+        command_parser.add_argument("--targets", action="store_true",
+                                    help="also fail when a benchmark is slower than its target in TARGET_OPS_PER_SEC")
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        results = run_benchmarks(args.only, min_time=args.min_time, report=_print_result)
+        if args.output:
+            save_baseline(args.output, results)
+        return _report_targets(results) if args.targets else 0
+
+    baseline = load_baseline(args.baseline)
+    results = run_benchmarks(args.only, min_time=args.min_time,
+                             report=lambda name, result: _print_result(name, result, baseline.get(name)))
+    regressions = compare_results(baseline, results, args.threshold)
+    for name, description in regressions:
+        print(f"REGRESSION {name}: {description}")
+    missed_targets = _report_targets(results) if args.targets else 0
+    return max(missed_targets, 1 if regressions else 0)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,250 @@
+# This file contains the expected crib values: the points two discarded cards are expected
+# to make in the crib, once the other player's two discards and the cut are added.
+#
+# Discards are grouped by their ranks and whether they share a suit, which gives 169 kinds
+# (13 pairs and 78 suited and 78 unsuited rank pairs), each with a value for when the
+# discarding player is the dealer and when they are the pone. The other player's discards
+# depend on their seat: a dealer keeps good cards for their own crib, a pone avoids feeding it.
+#
+# The values are estimated by dealing the other player random hands and letting them discard
+# with Discard.best_discard, in parallel worker processes, and are saved in a small binary
+# file that expected_crib_value loads the first time it is used.
+#
+# The hands and crib are scored with standard rules unless compute_values is given a variant's
+# Rules; the values are only estimated for two players who each discard 2 of 6 cards.
+#
+# Rebuild the file with:  python CribValues.py [--samples 20000] [--workers N]
+
+from DecksAndCards.Card import CARDS
+import os
+import random
+import struct
+import sys
+import time
+import Cribbage
+import Discard
+from DecksAndCards import Rules
+
+EXPECTED_CRIB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "expected_crib.bin")
+
+# Header is (magic, format version, samples per kind); then a float32 per kind, pone values first
+_MAGIC = b"CRIBEXP\0"
+_VERSION = 1
+_HEADER = struct.Struct("<8sII")
+
+DEFAULT_SAMPLES = 20000
+# Hands are dealt to worker processes in chunks; each chunk has its own seeded random number
+# generator, so the values only depend on the seed and number of samples, never on the workers.
+SAMPLES_PER_CHUNK = 500
+
+# Every kind of discard as (lower rank, higher rank, same suit), in file order
+KINDS = [(low, high, suited)
+         for low in range(1, 14)
+         for high in range(low, 14)
+         for suited in ((False,) if low == high else (False, True))]
+_KIND_INDEX = {kind: index for index, kind in enumerate(KINDS)}
+
+# [pone values, dealer values], set by load_values
+_values = None
+
+def discard_kind(discard):
+    """Returns (lower rank, higher rank, same suit) for two discarded cards"""
+    first, second = discard
+    if first.rank <= second.rank:
+        return (first.rank, second.rank, first.suit_index == second.suit_index)
+    return (second.rank, first.rank, first.suit_index == second.suit_index)
+
+def expected_crib_value(discard, is_dealer):
+    """
+    Returns the points the two discards are expected to make in the crib, loading the
+    values from EXPECTED_CRIB_PATH the first time.
+    """
+    if _values is None:
+        load_values()
+    return _values[int(is_dealer)][_KIND_INDEX[discard_kind(discard)]]
+
+def load_values(path=EXPECTED_CRIB_PATH):
+    """
+    Loads the expected crib values written by write_values.
+
+    Raises:
+        ValueError: If the file is not an expected crib value file
+    """
+    global _values
+    with open(path, 'rb') as file:
+        data = file.read()
+    if len(data) != _HEADER.size + 2 * len(KINDS) * 4:
+        raise ValueError(f"Expected crib values file has the wrong size: {path}")
+    magic, version, samples = _HEADER.unpack_from(data, 0)
+    if magic != _MAGIC or version != _VERSION:
+        raise ValueError(f"Not an expected crib values file (or an outdated one): {path}")
+    values = struct.unpack_from(f"<{2 * len(KINDS)}f", data, _HEADER.size)
+    _values = [values[:len(KINDS)], values[len(KINDS):]]
+
+def write_values(path, values, samples):
+    """Writes [pone values, dealer values], each a value per kind in KINDS order"""
+    with open(path, 'wb') as file:
+        file.write(_HEADER.pack(_MAGIC, _VERSION, samples))
+        file.write(struct.pack(f"<{2 * len(KINDS)}f", *values[0], *values[1]))
+
+def _cut_only_values(rules=None):
+    """
+    The crib points of each kind of discard with just the cut, averaged over the 50 other
+    cards. The other player discards by these while the real values are being estimated.
+    """
+    values = {}
+    for low, high, suited in KINDS:
+        # Hearts, plus diamonds when the cards are not suited; the suits only matter for nobs
+        discard = [CARDS[low - 1], CARDS[high - 1 if suited else 13 + high - 1]]
+        cuts = [card for card in CARDS if card not in discard]
+        values[(low, high, suited)] = sum(Cribbage.score_hand(discard, cut, is_crib=True, rules=rules)
+                                          for cut in cuts) / len(cuts)
+    return values
+
+def _realizations(kind, free_suits):
+    """Every pair of card ids of the kind, given the suits still free for each rank"""
+    low, high, suited = kind
+    if low == high:
+        suits = free_suits[low]
+        return [(first * 13 + low - 1, second * 13 + low - 1)
+                for i, first in enumerate(suits) for second in suits[i + 1:]]
+    return [(first * 13 + low - 1, second * 13 + high - 1)
+            for first in free_suits[low] for second in free_suits[high]
+            if (first == second) == suited]
+
+def _crib_points(crib_ids, discard_ids, cuts_of_rank, cuts_of_suit, num_cuts, rules=None):
+    """
+    The crib's points averaged over every cut (see Cribbage.score_hand with is_crib and rules).
+    The cut counts are for the cards the other player does not hold, so the two discards are
+    taken off.
+    """
+    # 15s, pairs and runs, weighted by how many cuts have each rank
+    points = Discard.rank_points_by_cut(tuple(sorted(card % 13 + 1 for card in crib_ids)))
+    total = 0
+    for cut_rank in range(1, 14):
+        total += cuts_of_rank[cut_rank] * points[cut_rank - 1]
+    for card in discard_ids:
+        total -= points[card % 13]
+    # Flushes and nobs only depend on the cut's suit, so they are scored once for each suit,
+    # with that suit's ace standing in for the cut
+    crib = [CARDS[card] for card in crib_ids]
+    suit_counts = list(cuts_of_suit)
+    for card in discard_ids:
+        suit_counts[card // 13] -= 1
+    for suit, count in enumerate(suit_counts):
+        if count:
+            cut = CARDS[suit * 13]
+            if rules is None:
+                flush = Cribbage.check_flushes(crib, cut, 0, is_crib=True)
+            else:
+                flush = Cribbage.flush_points(crib, cut, True, rules)
+            total += count * (flush + Cribbage.check_nibs_and_nobs(crib, cut, 0, is_dealer=False))
+    return total / (num_cuts - 2)
+
+def _sample_chunk(seed, chunk, num_samples, rules=None):
+    """
+    Deals num_samples hands to the other player and scores every kind of discard against
+    their discards, for both seats. Returns (weights, weighted points) for [pone, dealer],
+    each a list with an entry per kind.
+    """
+    rng = random.Random(f"{seed}:{chunk}")
+    cut_only = _cut_only_values(rules)
+
+    def other_player_crib_value(discard, is_dealer):
+        return cut_only[discard_kind(discard)]
+
+    weights = [[0] * len(KINDS), [0] * len(KINDS)]
+    points = [[0.0] * len(KINDS), [0.0] * len(KINDS)]
+    for _ in range(num_samples):
+        other_hand = rng.sample(CARDS, 6)
+        other_ids = set(card.id for card in other_hand)
+        free_suits = {rank: [suit for suit in range(4) if suit * 13 + rank - 1 not in other_ids]
+                      for rank in range(1, 14)}
+        # Cards the other player does not hold, by rank and suit
+        cuts_of_rank = [0] + [len(free_suits[rank]) for rank in range(1, 14)]
+        cuts_of_suit = [13] * 4
+        for card in other_ids:
+            cuts_of_suit[card // 13] -= 1
+        for is_dealer in (False, True):
+            other_discard = Discard.best_discard(other_hand, not is_dealer, include_crib=True,
+                                                 crib_value=other_player_crib_value, rules=rules)[0].discard
+            other_discard_ids = [card.id for card in other_discard]
+            for index, kind in enumerate(KINDS):
+                # Each way the discard can be made from the cards the other player does not hold
+                # is equally likely, so this hand counts once for each of them
+                realizations = _realizations(kind, free_suits)
+                if not realizations:
+                    continue
+                discard_ids = rng.choice(realizations)
+                crib_points = _crib_points(list(discard_ids) + other_discard_ids, discard_ids,
+                                           cuts_of_rank, cuts_of_suit, 46, rules)
+                weights[is_dealer][index] += len(realizations)
+                points[is_dealer][index] += len(realizations) * crib_points
+    return weights, points
+
+def compute_values(samples=DEFAULT_SAMPLES, seed=0, workers=None, progress=None, rules=None):
+    """
+    Estimates the expected crib value of every kind of discard for both seats.
+
+    Args:
+        samples: number of hands dealt to the other player
+        seed: values are reproducible for a seed, whatever the number of workers
+        workers: number of worker processes (default: one per CPU)
+        progress: optional callable given the number of samples done after each chunk
+        rules: the Rules.Rules of a variant to score the crib by (default: standard rules)
+
+    Returns:
+        list: [pone values, dealer values], each a value per kind in KINDS order
+
+    Raises:
+        ValueError: If the rules don't have two players each discarding 2 of 6 cards
+    """
+    if rules is not None:
+        Rules.validate(rules)
+        if (rules.players, rules.cards_dealt, rules.discards, rules.crib_from_deck) != (2, 6, 2, 0):
+            raise ValueError(f"Crib values are only estimated for two players discarding 2 of 6 cards, not {rules.name}")
+    chunks = [(chunk, min(SAMPLES_PER_CHUNK, samples - start))
+              for chunk, start in enumerate(range(0, samples, SAMPLES_PER_CHUNK))]
+    weights = [[0] * len(KINDS), [0] * len(KINDS)]
+    points = [[0] * len(KINDS), [0] * len(KINDS)]
+    done = 0
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(_sample_chunk, [seed] * len(chunks),
+                               [chunk for chunk, _ in chunks], [size for _, size in chunks],
+                               [rules] * len(chunks))
+        for (chunk_weights, chunk_points), (_, size) in zip(results, chunks):
+            for seat in (0, 1):
+                for index in range(len(KINDS)):
+                    weights[seat][index] += chunk_weights[seat][index]
+                    points[seat][index] += chunk_points[seat][index]
+            done += size
+            if progress is not None:
+                progress(done)
+    return [[points[seat][index] / weights[seat][index] if weights[seat][index] else 0.0
+             for index in range(len(KINDS))] for seat in (0, 1)]
+
+def main(argv=None):
+    # Only the command line needs argparse
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Estimate the expected crib value of every kind of discard")
+    parser.add_argument("--samples", type=int, default=DEFAULT_SAMPLES, help="hands dealt to the other player")
+    parser.add_argument("--seed", type=int, default=0, help="seed for reproducible results")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per CPU)")
+    parser.add_argument("--output", default=EXPECTED_CRIB_PATH, help="file to write")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+
+    def progress(done):
+        print(f"{done}/{args.samples} samples ({time.perf_counter() - start:.1f}s)", file=sys.stderr)
+
+    values = compute_values(args.samples, seed=args.seed, workers=args.workers, progress=progress)
+    write_values(args.output, values, args.samples)
+    print(f"Wrote {args.output}: average crib value {sum(values[0]) / len(KINDS):.3f} as pone, "
+          f"{sum(values[1]) / len(KINDS):.3f} as dealer", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -1,60 +1,630 @@
 # This file contains functions for scoring, and other cribbage-related functions
 
 from DecksAndCards.Card import Card, Suits, Values
+from collections import namedtuple
+from functools import lru_cache
+import _thread
 import itertools
+import time
+from DecksAndCards import Rules
 
-def score_hand(hand, cut_card):
-    """Scores a hand of cards"""
-    score = 0
+# Memory-mapped (hand, crib) score tables keyed by the Rules.table_key they were built for,
+# set by enable_score_tables
+_score_tables = {}
 
-    # Check for 15s
-    score = check_15s(hand, cut_card, score)
-    # Check for pairs, returns incremented score
-    score = check_pairs(hand, cut_card, score)
-    # Check for runs
-    score = check_runs(hand, cut_card, score)
-    # Check for flushes
-    score = check_flushes(hand, cut_card, score)
-    # Check for nibs and nobs
-    score = check_nibs_and_nobs(hand, cut_card, score)
+def enable_score_tables(directory):
+    """
+    Loads the precomputed score tables written by ScoreTable.build_tables from a directory.
+    While enabled, score_hand looks up hands with a cut instead of scoring them, for the
+    variant the tables were built for. Tables for several variants can be enabled at once;
+    enabling a variant's tables again replaces them.
+    """
+    import ScoreTable
+    tables = ScoreTable.load_tables(directory)
+    key = tables[0].table_key
+    if key in _score_tables:
+        for table in _score_tables.pop(key):
+            table.close()
+    _score_tables[key] = tables
+
+def disable_score_tables():
+    """Stops using the precomputed score tables and releases them"""
+    for tables in _score_tables.values():
+        for table in tables:
+            table.close()
+    _score_tables.clear()
+
+def _lookup_score(hand, cut_card, is_crib, is_dealer, rules):
+    """Returns the score from an enabled table for the rules, or None if none covers the hand"""
+    tables = _score_tables.get(Rules.table_key(Rules.STANDARD if rules is None else rules))
+    if tables is None:
+        return None
+    score = tables[1 if is_crib else 0].lookup(hand, cut_card)
+    # The tables leave out nibs, since it depends on who is scoring
+    if score is not None and is_dealer and not is_crib and cut_card.rank == 11:
+        score += 2 if rules is None else rules.nibs_points
+    return score
+
+def score_hand(hand, cut_card, is_crib=False, is_dealer=True, rules=None):
+    """
+    Scores a hand of cards.
+
+    Args:
+        hand: the cards in the hand, or in the crib
+        cut_card: the cut card, or None
+        is_crib: score the crib, which only scores a flush when the cut matches too
+        is_dealer: whether the hand is the dealer's. The dealer scores nibs (2 for a jack cut)
+                   with their hand; the crib never scores it, so nibs is only counted once.
+        rules: the Rules.Rules of a variant, for its flush and nibs rules (see flush_points).
+               Without them, flushes are scored by check_flushes.
+    """
+    if _instrumented:
+        return _instrumented_score_hand(hand, cut_card, is_crib, is_dealer, rules)
+    return _score_hand(hand, cut_card, is_crib, is_dealer, rules)
+
+def _score_hand(hand, cut_card, is_crib, is_dealer, rules, lap=None):
+    """
+    score_hand's scoring. With instrumentation, lap is called with the name of each stage as
+    it finishes (see INSTRUMENTED_STAGES).
+    """
+    # Use the precomputed table when one is loaded and covers this hand
+    if _score_tables:
+        score = _lookup_score(hand, cut_card, is_crib, is_dealer, rules)
+        if lap is not None:
+            lap('table_lookup')
+        if score is not None:
+            return score
+
+    # 15s, pairs and runs only depend on the ranks, and are cached for each set of ranks
+    ranks = [card.rank for card in hand]
+    if cut_card is not None:
+        ranks.append(cut_card.rank)
+    score = score_ranks(ranks)
+    if lap is not None:
+        lap('score_ranks')
+
+    if rules is None:
+        # Check for flushes
+        score = check_flushes(hand, cut_card, score, is_crib=is_crib)
+        if lap is not None:
+            lap('check_flushes')
+        # Check for nibs and nobs
+        score = check_nibs_and_nobs(hand, cut_card, score, is_dealer=is_dealer and not is_crib)
+    else:
+        score += flush_points(hand, cut_card, is_crib, rules)
+        if lap is not None:
+            lap('check_flushes')
+        score = check_nibs_and_nobs(hand, cut_card, score, is_dealer=False)
+        if is_dealer and not is_crib and cut_card is not None and cut_card.rank == 11:
+            score += rules.nibs_points
+    if lap is not None:
+        lap('check_nibs_and_nobs')
 
     return score
 
+def flush_points(hand, cut_card, is_crib, rules):
+    """
+    Returns the flush points for a hand or crib under the rules of a variant: a point for each
+    card when they are all one suit, and one more when the cut matches. When the rules say the
+    hand (or crib) needs the cut to match, it scores nothing without it.
+    """
+    if not hand:
+        return 0
+    suit = hand[0].suit_index
+    for card in hand:
+        if card.suit_index != suit:
+            return 0
+    if cut_card is not None and cut_card.suit_index == suit:
+        return len(hand) + 1
+    if rules.crib_flush_needs_cut if is_crib else rules.hand_flush_needs_cut:
+        return 0
+    return len(hand)
+
+# Stages of score_hand that are counted and timed while instrumentation is enabled. 15s, pairs
+# and runs are scored together by score_ranks (see rank_cache_info for its cache hits).
+INSTRUMENTED_STAGES = ('score_hand', 'table_lookup', 'score_ranks', 'check_flushes', 'check_nibs_and_nobs')
+
+# Calls and nanoseconds spent in a stage, as returned by instrumentation_snapshot
+StageCounter = namedtuple('StageCounter', ['calls', 'nanoseconds'])
+
+# score_hand only checks this flag while instrumentation is off, so it costs next to nothing
+_instrumented = False
+# [calls, nanoseconds] for each stage, updated under the lock so threads don't lose counts
+_stage_counters = {stage: [0, 0] for stage in INSTRUMENTED_STAGES}
+# A bare lock, so importing Cribbage doesn't pull in the threading module
+_stage_lock = _thread.allocate_lock()
+
+def _count_stage(stage, start):
+    """Adds a call that started at start (perf_counter_ns) to a stage; returns the time now"""
+    now = time.perf_counter_ns()
+    counter = _stage_counters[stage]
+    with _stage_lock:
+        counter[0] += 1
+        counter[1] += now - start
+    return now
+
+def _instrumented_score_hand(hand, cut_card, is_crib, is_dealer, rules):
+    """score_hand, timing each stage"""
+    start = time.perf_counter_ns()
+    last = [start]
+
+    def lap(stage):
+        last[0] = _count_stage(stage, last[0])
+
+    score = _score_hand(hand, cut_card, is_crib, is_dealer, rules, lap)
+    _count_stage('score_hand', start)
+    return score
+
+def enable_instrumentation():
+    """Starts counting calls to score_hand and the time spent in each of its stages"""
+    global _instrumented
+    _instrumented = True
+
+def disable_instrumentation():
+    """Stops counting. The counts so far are kept until reset_instrumentation."""
+    global _instrumented
+    _instrumented = False
+
+class _Instrumentation:
+    # A plain context manager rather than contextlib's, which is slower to import
+    def __enter__(self):
+        global _instrumented
+        self._was_instrumented = _instrumented
+        _instrumented = True
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        global _instrumented
+        _instrumented = self._was_instrumented
+
+def instrumentation():
+    """Enables instrumentation inside a with block, then puts it back as it was"""
+    return _Instrumentation()
+
+def instrumentation_snapshot():
+    """Returns a StageCounter for each stage in INSTRUMENTED_STAGES, keyed by stage"""
+    with _stage_lock:
+        return {stage: StageCounter(*counter) for stage, counter in _stage_counters.items()}
+
+def reset_instrumentation():
+    """Sets every stage's counts back to 0"""
+    with _stage_lock:
+        for counter in _stage_counters.values():
+            counter[0] = counter[1] = 0
+
+def export_instrumentation(file=None):
+    """
+    Returns the counts in a plain text exposition format, one line per stage and counter,
+    and writes them to file (a text file) if one is given:
+        cribbage_stage_calls_total{stage="score_hand"} 1000
+        cribbage_stage_nanoseconds_total{stage="score_hand"} 5512000
+    """
+    snapshot = instrumentation_snapshot()
+    lines = []
+    for field, description in (('calls', 'Calls to each stage of score_hand'),
+                               ('nanoseconds', 'Nanoseconds spent in each stage of score_hand')):
+        name = f"cribbage_stage_{field}_total"
+        lines.append(f"# HELP {name} {description}")
+        lines.append(f"# TYPE {name} counter")
+        for stage, counter in snapshot.items():
+            lines.append(f'{name}{{stage="{stage}"}} {getattr(counter, field)}')
+    text = "\n".join(lines) + "\n"
+    if file is not None:
+        file.write(text)
+    return text
+
+# Default number of rank sets kept by the score_ranks cache. There are 6,175 sets of ranks for
+# 5 cards, so every 5 card hand fits.
+RANK_CACHE_SIZE = 8192
+
+def _score_sorted_ranks(ranks):
+    rank_counts = _rank_counts(ranks)
+    return count_fifteens([min(rank, 10) for rank in ranks]) * 2 + _pair_points(rank_counts) + _run_points(rank_counts)
+
+# Points from 15s, pairs and runs, keyed by the sorted tuple of ranks they were scored for.
+# lru_cache is safe to call from several threads and counts its hits and misses.
+_cached_rank_score = lru_cache(maxsize=RANK_CACHE_SIZE)(_score_sorted_ranks)
+
+def score_ranks(ranks):
+    """
+    Returns the points from 15s, pairs and runs for cards of the given ranks (1-13).
+    These only depend on the ranks, so results are cached for each sorted tuple of ranks
+    (see configure_rank_cache).
+    """
+    return _cached_rank_score(tuple(sorted(ranks)))
+
+def configure_rank_cache(maxsize=RANK_CACHE_SIZE):
+    """
+    Replaces the score_ranks cache with an empty one holding up to maxsize sets of ranks, the
+    least recently used dropped first. maxsize 0 turns caching off; None never drops any.
+    """
+    global _cached_rank_score
+    _cached_rank_score = lru_cache(maxsize=maxsize)(_score_sorted_ranks)
+
+def rank_cache_info():
+    """Returns the score_ranks cache statistics: (hits, misses, maxsize, currsize)"""
+    return _cached_rank_score.cache_info()
+
+def clear_rank_cache():
+    """Empties the score_ranks cache and resets its statistics"""
+    _cached_rank_score.cache_clear()
+
+# Points from each scoring category, as returned by score_breakdown
+ScoreBreakdown = namedtuple('ScoreBreakdown', ['fifteens', 'pairs', 'runs', 'flush', 'nobs', 'nibs', 'total'])
+
+def score_breakdown(hand, cut_card, is_crib=False, is_dealer=True, rules=None):
+    """
+    Scores a hand and returns the points from each category. is_crib, is_dealer and rules work
+    as they do for score_hand.
+    The hand and cut are gathered and counted by rank once and shared by every category.
+    The total is the same as the check_* functions add up to.
+
+    Returns:
+        ScoreBreakdown: (fifteens, pairs, runs, flush, nobs, nibs, total)
+    """
+    cards = list(hand)
+    if cut_card is not None:
+        cards.append(cut_card)
+    # Count the ranks, adding 2 points for each earlier card of the same rank as we go
+    rank_counts = [0] * 15
+    pairs = 0
+    for card in cards:
+        pairs += 2 * rank_counts[card.rank]
+        rank_counts[card.rank] += 1
+
+    fifteens = count_fifteens([card.pip for card in cards]) * 2
+    runs = _run_points(rank_counts)
+
+    # Flushes are scored by the same functions as score_hand, so the rules for the crib match
+    if rules is None:
+        flush = check_flushes(list(hand), cut_card, 0, is_crib=is_crib)
+    else:
+        flush = flush_points(hand, cut_card, is_crib, rules)
+
+    # Nobs: a jack in the hand of the cut's suit. Nibs: the cut is a jack, for the dealer's hand.
+    nobs = 0
+    nibs = 0
+    if cut_card is not None:
+        if any(card.rank == 11 and card.suit_index == cut_card.suit_index for card in hand):
+            nobs = 1
+        if cut_card.rank == 11 and is_dealer and not is_crib:
+            nibs = 2 if rules is None else rules.nibs_points
+
+    return ScoreBreakdown(fifteens, pairs, runs, flush, nobs, nibs,
+                          fifteens + pairs + runs + flush + nobs + nibs)
+
+def _rank_counts(ranks):
+    """Returns how many of each rank there are, indexed by rank (1-13), with 0s at both ends"""
+    rank_counts = [0] * 15
+    for rank in ranks:
+        rank_counts[rank] += 1
+    return rank_counts
+
+def _pair_points(rank_counts):
+    # n cards of a rank make n * (n - 1) / 2 pairs of 2 points each
+    return sum(count * (count - 1) for count in rank_counts)
+
+def _run_points(rank_counts):
+    # Only the longest runs score: their length for every way to pick one card of each rank
+    best_length = 0
+    points = 0
+    length = 0
+    ways = 1
+    for count in rank_counts:
+        if count:
+            length += 1
+            ways *= count
+            continue
+        if length >= 3:
+            if length > best_length:
+                best_length = length
+                points = 0
+            if length == best_length:
+                points += length * ways
+        length = 0
+        ways = 1
+    return points
+
+# Marks a cut card that IncrementalScorer should leave as it is
+_SAME_CUT = object()
+# IncrementalScorer packs how many cards there are of each rank into one integer, 3 bits per rank
+_RANK_KEY_BITS = 3
+
+@lru_cache(maxsize=RANK_CACHE_SIZE)
+def _run_points_for_key(rank_key):
+    rank_counts = [(rank_key >> (rank * _RANK_KEY_BITS)) & 7 for rank in range(15)]
+    return _run_points(rank_counts)
+
+class IncrementalScorer:
+    """
+    Scores a hand and how its score changes when one card is added, removed or replaced, or
+    the cut changes, without scoring the new hand from scratch. Scores match score_hand with
+    the same is_crib, is_dealer and rules.
+
+    It keeps the number of cards of each rank and the number of subsets making each pip total
+    up to 15 (both including the cut), and the hand's suits and jacks. A change updates these
+    for the cards that leave and enter, so its cost doesn't depend on the size of the hand.
+    Run points are cached for each set of rank counts.
+
+    The *_delta methods return the change in score and leave the hand as it is; add, remove,
+    replace and set_cut make the change and return the new score.
+    """
+    def __init__(self, hand, cut_card=None, is_crib=False, is_dealer=True, rules=None):
+        self.is_crib = is_crib
+        self.is_dealer = is_dealer
+        self.rules = rules
+        self.hand = []
+        self.cut_card = None
+        self._rank_key = 0
+        self._pairs = 0
+        # _ways[total] is the number of subsets of the cards whose pips add up to total
+        self._ways = [1] + [0] * 15
+        self._hand_suits = [0] * 4
+        self._jacks = [0] * 4
+        self.score = 0
+        self._change((), tuple(hand), cut_card, keep=True)
+
+    def add_delta(self, card):
+        """Returns the change in score if card were added to the hand"""
+        return self._change((), (card,), _SAME_CUT) - self.score
+
+    def remove_delta(self, card):
+        """Returns the change in score if card were taken out of the hand"""
+        return self._change((self._hand_card(card),), (), _SAME_CUT) - self.score
+
+    def replace_delta(self, old_card, new_card):
+        """Returns the change in score if old_card in the hand were swapped for new_card"""
+        return self._change((self._hand_card(old_card),), (new_card,), _SAME_CUT) - self.score
+
+    def cut_delta(self, cut_card):
+        """Returns the change in score if the cut were cut_card (or None for no cut)"""
+        return self._change((), (), cut_card) - self.score
+
+    def add(self, card):
+        return self._change((), (card,), _SAME_CUT, keep=True)
+
+    def remove(self, card):
+        return self._change((self._hand_card(card),), (), _SAME_CUT, keep=True)
+
+    def replace(self, old_card, new_card):
+        return self._change((self._hand_card(old_card),), (new_card,), _SAME_CUT, keep=True)
+
+    def set_cut(self, cut_card):
+        return self._change((), (), cut_card, keep=True)
+
+    def _hand_card(self, card):
+        for held in self.hand:
+            if held.id == card.id:
+                return held
+        raise ValueError(f"{card.short_print()} is not in the hand")
+
+    def _change(self, leaving, entering, cut_card, keep=False):
+        """
+        Scores the hand with the leaving cards taken out, the entering cards added and the cut
+        changed to cut_card. With keep, the scorer takes on the new hand.
+        """
+        old_cut = self.cut_card
+        if cut_card is _SAME_CUT:
+            cut_card = old_cut
+        # Cards leaving and entering the counts for 15s, pairs and runs, which include the cut
+        counted_out = leaving
+        counted_in = entering
+        if cut_card is not old_cut:
+            if old_cut is not None:
+                counted_out = leaving + (old_cut,)
+            if cut_card is not None:
+                counted_in = entering + (cut_card,)
+
+        ways = self._ways
+        if not counted_out and len(counted_in) == 1 and not keep:
+            # Adding one card makes a 15 with every subset that totals 15 minus its pip
+            fifteens = ways[15] + ways[15 - counted_in[0].pip]
+        else:
+            ways = list(ways)
+            # Taking a card out undoes adding it, from the lowest total up
+            for card in counted_out:
+                pip = card.pip
+                for total in range(pip, 16):
+                    ways[total] -= ways[total - pip]
+            for card in counted_in:
+                pip = card.pip
+                for total in range(15, pip - 1, -1):
+                    ways[total] += ways[total - pip]
+            fifteens = ways[15]
+
+        # A card makes a pair with each other card of its rank
+        rank_key = self._rank_key
+        pairs = self._pairs
+        for card in counted_out:
+            shift = card.rank * _RANK_KEY_BITS
+            rank_key -= 1 << shift
+            pairs -= 2 * ((rank_key >> shift) & 7)
+        for card in counted_in:
+            shift = card.rank * _RANK_KEY_BITS
+            pairs += 2 * ((rank_key >> shift) & 7)
+            rank_key += 1 << shift
+
+        hand_suits = self._hand_suits
+        jacks = self._jacks
+        if leaving or entering:
+            hand_suits = list(hand_suits)
+            jacks = list(jacks)
+            for card in leaving:
+                hand_suits[card.suit_index] -= 1
+                if card.rank == 11:
+                    jacks[card.suit_index] -= 1
+            for card in entering:
+                hand_suits[card.suit_index] += 1
+                if card.rank == 11:
+                    jacks[card.suit_index] += 1
+        hand_size = len(self.hand) - len(leaving) + len(entering)
+
+        score = fifteens * 2 + pairs + _run_points_for_key(rank_key)
+        # Flushes: a hand scores 4 for its own cards in one suit and 5 with the cut too; the crib only scores 5.
+        # A variant's rules score them as flush_points does.
+        rules = self.rules
+        if hand_size and hand_size in hand_suits:
+            cut_matches = cut_card is not None and hand_suits[cut_card.suit_index] == hand_size
+            if rules is not None:
+                if cut_matches:
+                    score += hand_size + 1
+                elif not (rules.crib_flush_needs_cut if self.is_crib else rules.hand_flush_needs_cut):
+                    score += hand_size
+            elif self.is_crib:
+                # Only when every one of 5 cards, the cut included, is in the suit
+                if hand_size + (cut_card is not None) == 5 and (cut_card is None or cut_matches):
+                    score += 5
+            else:
+                score += 5 if cut_matches else 4
+        if cut_card is not None:
+            # Nobs, and nibs for the dealer's hand
+            if jacks[cut_card.suit_index]:
+                score += 1
+            if cut_card.rank == 11 and self.is_dealer and not self.is_crib:
+                score += 2 if rules is None else rules.nibs_points
+
+        if keep:
+            for card in leaving:
+                self.hand.remove(card)
+            self.hand.extend(entering)
+            self.cut_card = cut_card
+            self._ways = ways
+            self._rank_key = rank_key
+            self._pairs = pairs
+            self._hand_suits = hand_suits
+            self._jacks = jacks
+            self.score = score
+        return score
+
+# Rows scored at a time by score_hands, which bounds the size of its temporary arrays
+_BATCH_CHUNK = 1 << 16
+
+def score_hands(hands, cuts, is_crib=False, is_dealer=True, rules=None):
+    """
+    Scores many hands at once using NumPy array operations. Requires NumPy.
+    Gives the same scores as score_hand with the same is_crib, is_dealer and rules.
+
+    Args:
+        hands: integer array of card ids (see Card.id) with shape (N, k), usually k = 4
+        cuts: integer array of cut card ids with shape (N,)
+        is_crib: score every hand as a crib
+        is_dealer: every hand is the dealer's, so scores nibs
+        rules: the Rules.Rules of a variant (see score_hand)
+
+    Returns:
+        numpy.ndarray: (N,) uint8 array of scores
+    """
+    import numpy as np
+
+    hands = np.asarray(hands, dtype=np.int64)
+    cuts = np.asarray(cuts, dtype=np.int64)
+    if hands.ndim != 2 or cuts.shape != (len(hands),):
+        raise ValueError(f"Expected hands of shape (N, k) and cuts of shape (N,), got {hands.shape} and {cuts.shape}")
+
+    scores = np.empty(len(hands), dtype=np.uint8)
+    for start in range(0, len(hands), _BATCH_CHUNK):
+        stop = start + _BATCH_CHUNK
+        scores[start:stop] = _score_hands_chunk(hands[start:stop], cuts[start:stop], is_crib, is_dealer, rules)
+    return scores
+
+# 0/1 matrices with a column for every subset of 2 or more cards, keyed by the number of cards
+_subset_matrices = {}
+
+def _subset_matrix(num_cards):
+    import numpy as np
+
+    if num_cards not in _subset_matrices:
+        subsets = [combo for r in range(2, num_cards + 1) for combo in itertools.combinations(range(num_cards), r)]
+        matrix = np.zeros((num_cards, len(subsets)), dtype=np.float32)
+        for column, combo in enumerate(subsets):
+            matrix[list(combo), column] = 1
+        _subset_matrices[num_cards] = matrix
+    return _subset_matrices[num_cards]
+
+def _score_hands_chunk(hands, cuts, is_crib, is_dealer, rules):
+    import numpy as np
+
+    cards = np.concatenate([hands, cuts[:, None]], axis=1)
+    ranks = cards % 13 + 1
+    num_cards = cards.shape[1]
+
+    # 15s: sum the pips of every subset at once with a matrix product.
+    # float32 goes through BLAS and is exact for sums this small.
+    pips = np.minimum(ranks, 10).astype(np.float32)
+    scores = 2 * np.count_nonzero(pips @ _subset_matrix(num_cards) == 15, axis=1)
+
+    # Pairs: every pair of cards with equal ranks
+    first, second = np.triu_indices(num_cards, 1)
+    scores += 2 * np.count_nonzero(ranks[:, first] == ranks[:, second], axis=1)
+
+    # Runs: count cards per rank, then multiply counts over each window of consecutive ranks.
+    # A window with a zero count is not a run. Only the longest run length scores.
+    rank_counts = np.bincount((np.arange(len(cards))[:, None] * 14 + ranks).ravel(),
+                              minlength=len(cards) * 14).reshape(-1, 14)[:, 1:]
+    run_points = np.zeros(len(cards), dtype=np.int64)
+    found = np.zeros(len(cards), dtype=bool)
+    for length in range(min(num_cards, 13), 2, -1):
+        products = rank_counts[:, :14 - length].copy()
+        for offset in range(1, length):
+            products *= rank_counts[:, offset:14 - length + offset]
+        runs = products.sum(axis=1)
+        new_runs = ~found & (runs > 0)
+        run_points[new_runs] = length * runs[new_runs]
+        found |= new_runs
+    scores += run_points
+
+    # Flushes: a hand scores 4 for all its cards in one suit and 5 with the cut, a crib only 5
+    # and only as 4 cards and the cut, as check_flushes scores them
+    suits = hands // 13
+    cut_suits = cuts // 13
+    hand_flush = (suits == suits[:, :1]).all(axis=1)
+    full_flush = hand_flush & (cut_suits == suits[:, 0])
+    if rules is not None:
+        # A point per card, and one more for the cut; without the cut only if the rules allow
+        hand_size = hands.shape[1]
+        scores += (hand_size + 1) * full_flush
+        if not (rules.crib_flush_needs_cut if is_crib else rules.hand_flush_needs_cut):
+            scores += hand_size * (hand_flush & ~full_flush)
+    elif is_crib:
+        if hands.shape[1] == 4:
+            scores += 5 * full_flush
+    else:
+        scores += 4 * hand_flush + full_flush
+
+    # Nibs (the cut is a jack, for the dealer's hand) and nobs (a jack in the hand matches the cut's suit)
+    if is_dealer and not is_crib:
+        scores += (2 if rules is None else rules.nibs_points) * (cuts % 13 == 10)
+    scores += ((hands % 13 == 10) & (suits == cut_suits[:, None])).any(axis=1)
+    return scores
+
+def count_fifteens(pips):
+    """
+    Returns how many subsets of the given pips (1-10) add up to 15, for any number of cards.
+    This is a subset-sum count, so the cost grows with the number of cards, not the number of subsets.
+    """
+    # The number of subsets making each total from 0 to 15 is packed into one integer, width
+    # bits per total. Adding a card of pip p adds every count to the count p higher. A count
+    # can't exceed 2 ** len(pips), so one never spills into the next.
+    width = len(pips) + 1
+    mask = (1 << (16 * width)) - 1
+    ways = 1
+    for pip in pips:
+        ways = (ways + (ways << (pip * width))) & mask
+    return ways >> (15 * width)
+
 # Checks for 15s in the hand, rewarding 2 points for each 15
 def check_15s(hand, cut_card, score):
     """
     Finds all combinations of cards that sum to exactly 15.
-    Each combination of 2, 3, 4, or 5 cards that sums to 15 is worth 2 points.
-    """
-    def get_card_value(card):
-        """Get the numeric value of a card for 15s scoring (ACE=1, 2-10=2-10, J/Q/K=10)"""
-        if card.value == Values.ACE:
-            return 1
-        elif card.value in [Values.JACK, Values.QUEEN, Values.KING]:
-            return 10
-        else:
-            # For 2-10, use the numeric value from the enum
-            return card.value.value[0]
-    
-    # Combine hand and cut_card into a list of all cards
-    all_cards = hand.copy()
+    Each combination of 2 or more cards that sums to 15 is worth 2 points.
+    """
+    # pip is the card's value for 15s (ACE=1, 2-10=2-10, J/Q/K=10). No single card makes 15,
+    # so every subset counted has at least 2 cards.
+    pips = [card.pip for card in hand]
     if cut_card is not None:
-        all_cards.append(cut_card)
-    
-    # Count how many combinations sum to 15
-    # We need to check all subsets of size 2, 3, 4, and 5
-    combinations_that_sum_to_15 = 0
-    
-    # Check all possible combinations of 2, 3, 4, and 5 cards
-    for r in range(2, len(all_cards) + 1):
-        for combo in itertools.combinations(all_cards, r):
-            # Calculate the sum of this combination
-            total = sum(get_card_value(card) for card in combo)
-            if total == 15:
-                combinations_that_sum_to_15 += 1
+        pips.append(cut_card.pip)
     
     # Each combination that sums to 15 is worth 2 points
-    score += combinations_that_sum_to_15 * 2
+    score += count_fifteens(pips) * 2
     
     return score
 
@@ -68,7 +638,7 @@ def check_pairs(hand, cut_card, score):
     # Group cards by their value
     value_counts = {}
     for card in cards:
-        card_value = card.value
+        card_value = card.rank
         value_counts[card_value] = value_counts.get(card_value, 0) + 1
     
     # For each value with n cards, calculate pairs = n*(n-1)/2
@@ -87,23 +657,10 @@ def check_runs(hand, cut_card, score):
         cards.append(cut_card)
     
     # Check for runs
-    # First, convert card values to run values (J=11, Q=12, K=13)
-    def get_run_value(card):
-        """Convert card value to numeric value for run checking"""
-        if card.value == Values.JACK:
-            return 11
-        elif card.value == Values.QUEEN:
-            return 12
-        elif card.value == Values.KING:
-            return 13
-        else:
-            # For ACE through TEN, use the numeric value from the enum
-            return card.value.value[0]
-    
-    # Group cards by their run value, keeping track of counts
+    # Group cards by their run value (rank: A=1 ... J=11, Q=12, K=13), keeping track of counts
     value_counts = {}
     for card in cards:
-        run_value = get_run_value(card)
+        run_value = card.rank
         value_counts[run_value] = value_counts.get(run_value, 0) + 1
     
     # Find all runs of length 3 or more
@@ -177,12 +734,12 @@ def check_flushes(hand, cut_card, score, is_crib=False):
             return score + flush_points
     
 # A simple nibs and nobs check
-# Will be expanded to only score nibs for the dealer
-def check_nibs_and_nobs(hand, cut_card, score):
+# Nibs is only scored for the dealer
+def check_nibs_and_nobs(hand, cut_card, score, is_dealer=True):
     # Check for nibs (the cut card is any Jack)
-    if cut_card is not None and cut_card.value == Values.JACK:
+    if is_dealer and cut_card is not None and cut_card.rank == 11:
         score += 2
     # Check for nobs (the cut card matches the suit of any Jack in the hand)
-    if cut_card is not None and any(card.value == Values.JACK and card.suit == cut_card.suit for card in hand):
+    if cut_card is not None and any(card.rank == 11 and card.suit == cut_card.suit for card in hand):
         score += 1
     return score
@@ -0,0 +1,104 @@
+# This file maps hands to a canonical representative under suit permutation.
+#
+# 15s, pairs and runs only look at ranks, and flushes and nobs only care whether suits
+# match, so renaming the suits never changes a score. Two (hand, cut) pairs that differ
+# only by such a renaming have the same canonical form, so caches and tables can store
+# one entry for all of them.
+#
+# Suits are relabelled by a signature: a bitmask of the hand ranks held in that suit,
+# plus the cut's rank if the cut is in that suit. The suit with the largest signature
+# becomes suit 0, and so on. Suits with equal signatures hold identical cards, so the
+# result does not depend on how ties are broken.
+#
+# Hands are expected to hold distinct cards.
+
+from .Card import CARDS
+from math import factorial
+
+def _signatures(hand_ids, cut_id):
+    signatures = [0, 0, 0, 0]
+    for card in hand_ids:
+        signatures[card // 13] |= 1 << (card % 13 + 4)
+    if cut_id is not None:
+        signatures[cut_id // 13] |= cut_id % 13 + 1
+    return signatures
+
+def canonical_ids(hand_ids, cut_id=None):
+    """
+    Returns the canonical form of a hand and cut given as card ids (see Card.id).
+
+    Returns:
+        tuple: (sorted tuple of canonical hand ids, canonical cut id or None)
+    """
+    signatures = _signatures(hand_ids, cut_id)
+    order = sorted(range(4), key=signatures.__getitem__, reverse=True)
+    relabel = [0, 0, 0, 0]
+    for new_suit, old_suit in enumerate(order):
+        relabel[old_suit] = new_suit * 13
+    hand = tuple(sorted(relabel[card // 13] + card % 13 for card in hand_ids))
+    if cut_id is None:
+        return hand, None
+    return hand, relabel[cut_id // 13] + cut_id % 13
+
+def canonicalize(hand, cut_card=None):
+    """Returns the canonical (hand, cut_card) as Card objects, with the hand sorted"""
+    hand_ids, cut_id = canonical_ids([card.id for card in hand], None if cut_card is None else cut_card.id)
+    return [CARDS[card] for card in hand_ids], None if cut_id is None else CARDS[cut_id]
+
+def canonical_key(hand, cut_card=None):
+    """
+    Returns a small integer that is equal for two (hand, cut_card) pairs exactly when they
+    are the same up to suit permutation. Each card id takes 6 bits, and a missing cut is 63.
+    """
+    hand_ids, cut_id = canonical_ids([card.id for card in hand], None if cut_card is None else cut_card.id)
+    key = 63 if cut_id is None else cut_id
+    for card in hand_ids:
+        key = (key << 6) | card
+    return key
+
+def orbit_size(hand_ids, cut_id=None):
+    """Returns how many distinct (hand, cut) pairs share the canonical form of the one given"""
+    # Permuting suits with equal signatures (including empty suits) changes nothing
+    counts = {}
+    for signature in _signatures(hand_ids, cut_id):
+        counts[signature] = counts.get(signature, 0) + 1
+    symmetries = 1
+    for count in counts.values():
+        symmetries *= factorial(count)
+    return 24 // symmetries
+
+def canonicalize_array(hands, cuts=None):
+    """
+    Canonicalizes many hands at once. Requires NumPy.
+
+    Args:
+        hands: integer array of card ids with shape (N, k)
+        cuts: integer array of card ids with shape (N,), or None for hands without a cut
+
+    Returns:
+        tuple: (canonical hands as an (N, k) array sorted along each row,
+                canonical cuts as an (N,) array, or None)
+    """
+    import numpy as np
+
+    hands = np.asarray(hands, dtype=np.int64)
+    suits = hands // 13
+    ranks = hands % 13
+    rows = np.arange(len(hands))[:, None]
+
+    signatures = np.zeros((len(hands), 4), dtype=np.int64)
+    np.bitwise_or.at(signatures, (rows, suits), np.left_shift(1, ranks + 4))
+    if cuts is not None:
+        cuts = np.asarray(cuts, dtype=np.int64)
+        signatures[np.arange(len(cuts)), cuts // 13] |= cuts % 13 + 1
+
+    # order[n, i] is the old suit that becomes suit i; relabel is its inverse
+    order = np.argsort(-signatures, axis=1, kind='stable')
+    relabel = np.empty_like(order)
+    np.put_along_axis(relabel, order, np.arange(4)[None, :], axis=1)
+
+    canonical_hands = np.sort(np.take_along_axis(relabel, suits, axis=1) * 13 + ranks, axis=1)
+    if cuts is None:
+        return canonical_hands, None
+    canonical_cuts = relabel[np.arange(len(cuts)), cuts // 13] * 13 + cuts % 13
+    return canonical_hands, canonical_cuts
@@ -24,9 +24,41 @@ class Values(Enum):
     KING = (10, "King", "K")
 
 class Card:
-    def __init__(self, value, suit):
-        self.value = value
-        self.suit = suit
+    """
+    A playing card. There are exactly 52 Card objects, one per value and suit, created when
+    this module is imported; Card(value, suit) returns the existing one. Cards cannot be changed.
+
+    Besides value and suit, each card carries precomputed fields for scoring:
+        id:         stable index 0-51 (suit-major, Ace through King, the order of a default deck)
+        rank:       1-13 (Ace=1, Jack=11, Queen=12, King=13), used for pairs and runs
+        pip:        1-10 (face cards count 10), used for 15s
+        suit_index: 0-3
+    """
+    __slots__ = ('value', 'suit', 'id', 'rank', 'pip', 'suit_index')
+
+    def __new__(cls, value, suit):
+        try:
+            return _CARDS_BY_VALUE_AND_SUIT[(value, suit)]
+        except KeyError:
+            raise ValueError(f"Invalid card: {value!r} of {suit!r}") from None
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Cards cannot be changed")
+
+    def __eq__(self, other):
+        if isinstance(other, Card):
+            return self.id == other.id
+        return NotImplemented
+
+    def __hash__(self):
+        return self.id
+
+    def __reduce__(self):
+        # Unpickling (e.g. in another process) returns the shared card for this id
+        return (card_from_id, (self.id,))
+
+    def __repr__(self):
+        return f"Card({self.value}, {self.suit})"
 
     def short_print(self):
         """Returns a short string representation of the card (e.g., 'AH', '10D')"""
@@ -40,4 +72,28 @@ class Card:
         # Values and Suits are stored as tuples: (id, name, symbol)
         value_name = self.value.value[1]
         suit_name = self.suit.value[1]
-        return f"{value_name} of {suit_name}"
\ No newline at end of file
+        return f"{value_name} of {suit_name}"
+
+def _create_card(value, suit, suit_index, value_index):
+    card = object.__new__(Card)
+    object.__setattr__(card, 'value', value)
+    object.__setattr__(card, 'suit', suit)
+    object.__setattr__(card, 'id', suit_index * 13 + value_index)
+    object.__setattr__(card, 'rank', value_index + 1)
+    object.__setattr__(card, 'pip', value.value[0])
+    object.__setattr__(card, 'suit_index', suit_index)
+    return card
+
+# All 52 cards, indexed by id
+CARDS = tuple(_create_card(value, suit, suit_index, value_index)
+              for suit_index, suit in enumerate(Suits)
+              for value_index, value in enumerate(Values))
+_CARDS_BY_VALUE_AND_SUIT = {(card.value, card.suit): card for card in CARDS}
+
+def card_id(card):
+    """Returns the index (0-51) of the card in a default deck: suit-major, Ace through King"""
+    return card.id
+
+def card_from_id(index):
+    """Returns the Card for an index produced by card_id"""
+    return CARDS[index]
@@ -0,0 +1,71 @@
+# This file deals many hands at once as NumPy arrays of card ids (see Card.id), for
+# simulations that need millions of deals. Requires NumPy.
+#
+# Each deal is a hand for every player, any cards that go straight into the crib, and a
+# cut card, taken from the top of an independently shuffled deck; by default two 6 card
+# hands (see Rules for other variants). Deals are made in fixed-size chunks, and each chunk
+# draws from its own random stream spawned from the seed, so a seed always gives the same
+# deals, bit for bit, whatever the number of worker processes.
+
+from collections import namedtuple
+from . import Rules
+
+# Deals made from each random stream
+DEALS_PER_CHUNK = 1 << 16
+
+# hands: (N, players, cards dealt) uint8 card ids, the first hand dealt first; cuts: (N,)
+# uint8 card ids; crib_cards: (N, cards) uint8 card ids dealt straight into the crib
+Deals = namedtuple('Deals', ['hands', 'cuts', 'crib_cards'])
+
+def _deal_chunk(seed, chunk, num_deals, cards_per_deal):
+    """Returns (num_deals, cards_per_deal) card ids: the top cards of num_deals shuffled decks"""
+    import numpy as np
+
+    rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(chunk,)))
+    decks = np.tile(np.arange(52, dtype=np.uint8), (num_deals, 1))
+    rows = np.arange(num_deals)
+    # Fisher-Yates on every deck at once, stopping once the cards to deal are in place
+    for position in range(cards_per_deal):
+        swap = rng.integers(position, 52, size=num_deals)
+        top = decks[:, position].copy()
+        decks[:, position] = decks[rows, swap]
+        decks[rows, swap] = top
+    return decks[:, :cards_per_deal]
+
+def deal(num_deals, seed=0, workers=None, rules=None):
+    """
+    Deals a hand to each player, the crib's cards from the deck and a cut from each of
+    num_deals shuffled decks.
+
+    Args:
+        num_deals: number of deals
+        seed: non-negative integer; the deals only depend on it, num_deals and the rules
+        workers: number of worker processes (default: one per CPU). Deals that fit in one
+                 chunk are always made in this process.
+        rules: the Rules.Rules of a variant (default: Rules.STANDARD, two players dealt 6 cards each)
+
+    Returns:
+        Deals: (hands, cuts, crib_cards) arrays of card ids
+
+    Raises:
+        ValueError: If the rules don't make a playable game (see Rules.validate)
+    """
+    import numpy as np
+
+    rules = Rules.validate(Rules.STANDARD if rules is None else rules)
+    players, cards_dealt, crib_from_deck = rules.players, rules.cards_dealt, rules.crib_from_deck
+    cards_per_deal = rules.cards_per_deal
+    chunks = [(chunk, min(DEALS_PER_CHUNK, num_deals - start))
+              for chunk, start in enumerate(range(0, num_deals, DEALS_PER_CHUNK))]
+    if len(chunks) <= 1 or workers == 1:
+        parts = [_deal_chunk(seed, chunk, size, cards_per_deal) for chunk, size in chunks]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            parts = list(executor.map(_deal_chunk, [seed] * len(chunks), [chunk for chunk, _ in chunks],
+                                      [size for _, size in chunks], [cards_per_deal] * len(chunks)))
+    cards = np.concatenate(parts) if parts else np.zeros((0, cards_per_deal), dtype=np.uint8)
+    dealt = players * cards_dealt
+    hands = cards[:, :dealt].reshape(-1, players, cards_dealt)
+    return Deals(hands, cards[:, -1], cards[:, dealt:dealt + crib_from_deck])
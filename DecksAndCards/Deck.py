@@ -1,9 +1,187 @@
-from .Card import Card, Suits, Values
+from .Card import Card, Suits, Values, CARDS
 import random
-import csv
+
+# Number of cards (and bytes) in each deck of a binary deck file
+DECK_SIZE = 52
+# Decks are read from binary files this many at a time
+_BINARY_DECKS_PER_READ = 4096
+
+# Lookup tables from an uppercased enum name or symbol to the enum, built once at import
+_VALUES_BY_TOKEN = {}
+for _value in Values:
+    _VALUES_BY_TOKEN[_value.name] = _value
+    _VALUES_BY_TOKEN[_value.value[2].upper()] = _value
+_SUITS_BY_TOKEN = {}
+for _suit in Suits:
+    _SUITS_BY_TOKEN[_suit.name] = _suit
+    _SUITS_BY_TOKEN[_suit.value[2].upper()] = _suit
+
+def _spellings(member):
+    name = member.name
+    symbol = member.value[2]
+    return {name, name.lower(), name.capitalize(), symbol.upper(), symbol.lower()}
+
+# Cards by their (value, suit) tokens in the usual spellings, so most rows are read with one
+# dict lookup and no stripping or uppercasing. Any other spelling goes through find_value/find_suit.
+_CARDS_BY_TOKENS = {}
+for _card in CARDS:
+    for _value_token in _spellings(_card.value):
+        for _suit_token in _spellings(_card.suit):
+            _CARDS_BY_TOKENS[(_value_token, _suit_token)] = _card
+
+# Helper functions to find enum by name or symbol (case-insensitive)
+def find_value(value_str):
+    value_str = value_str.strip().upper()
+    try:
+        return _VALUES_BY_TOKEN[value_str]
+    except KeyError:
+        raise ValueError(f"Invalid value: {value_str}") from None
+
+def find_suit(suit_str):
+    suit_str = suit_str.strip().upper()
+    try:
+        return _SUITS_BY_TOKEN[suit_str]
+    except KeyError:
+        raise ValueError(f"Invalid suit: {suit_str}") from None
+
+def card_from_tokens(value_str, suit_str):
+    """Returns the Card for a value and a suit written as enum names or symbols (case-insensitive)"""
+    card = _CARDS_BY_TOKENS.get((value_str, suit_str))
+    if card is None:
+        card = Card(find_value(value_str), find_suit(suit_str))
+    return card
+
+def parse_card_token(token):
+    """Parses a short card token such as '5H', '10D' or 'QS' into a Card"""
+    token = token.strip()
+    if len(token) < 2:
+        raise ValueError(f"Invalid card: {token}")
+    return card_from_tokens(token[:-1], token[-1])
+
+def _is_header(row):
+    # Common header patterns
+    return len(row) >= 2 and (row[0].strip().upper() in ['VALUE', 'VALUES', 'CARD_VALUE', 'RANK'] or
+                              row[1].strip().upper() in ['SUIT', 'SUITS', 'CARD_SUIT'])
+
+def _read_cards(file):
+    """
+    Yields the Card on each row of a deck CSV file, or None for an empty row.
+    A header on the first row is skipped.
+
+    Raises:
+        ValueError: If a row cannot be parsed, naming its row number
+    """
+    # csv pulls in re, so it is only imported once a file is read
+    import csv
+
+    for row_num, row in enumerate(csv.reader(file), start=1):
+        if len(row) >= 2:
+            card = _CARDS_BY_TOKENS.get((row[0], row[1]))
+            if card is not None:
+                yield card
+                continue
+        if not row or (len(row) >= 2 and not row[0].strip() and not row[1].strip()):
+            yield None
+            continue
+        if row_num == 1 and _is_header(row):
+            continue
+        if len(row) < 2:
+            raise ValueError(f"Row {row_num}: Expected 2 columns (value, suit), got {len(row)}")
+        try:
+            yield Card(find_value(row[0]), find_suit(row[1]))
+        except ValueError as e:
+            raise ValueError(f"Row {row_num}: {str(e)}")
+
+def read_decks(file_paths):
+    """
+    Reads many decks in a single pass over one or more CSV files. Each file holds one deck, or
+    several separated by empty rows, in the format Deck.deck_from_file reads.
+
+    Args:
+        file_paths: a path or a list of paths
+
+    Yields:
+        Deck: each deck in file order
+
+    Raises:
+        FileNotFoundError: If a file doesn't exist
+        ValueError: If a row cannot be parsed, naming the file and row number
+    """
+    if isinstance(file_paths, str):
+        file_paths = [file_paths]
+    for file_path in file_paths:
+        try:
+            with open(file_path, 'r', newline='') as file:
+                cards = []
+                for card in _read_cards(file):
+                    if card is not None:
+                        cards.append(card)
+                    elif cards:
+                        yield Deck(cards=cards)
+                        cards = []
+                if cards:
+                    yield Deck(cards=cards)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Deck file not found: {file_path}")
+        except ValueError as e:
+            raise ValueError(f"{file_path}: {str(e)}")
+        except Exception as e:
+            raise ValueError(f"Error reading deck file {file_path}: {str(e)}")
+
+def write_binary_decks(file_path, decks):
+    """
+    Writes full decks to a binary file, 52 bytes per deck (see Deck.to_bytes).
+
+    Returns:
+        int: the number of decks written
+
+    Raises:
+        ValueError: If a deck does not have 52 cards
+    """
+    count = 0
+    with open(file_path, 'wb') as file:
+        for deck in decks:
+            if len(deck.cards) != DECK_SIZE:
+                raise ValueError(f"Deck {count + 1}: Expected {DECK_SIZE} cards, got {len(deck.cards)}")
+            file.write(deck.to_bytes())
+            count += 1
+    return count
+
+def read_binary_decks(file_path):
+    """
+    Reads the decks in a file written by write_binary_decks.
+
+    Yields:
+        Deck: each deck in file order
+
+    Raises:
+        FileNotFoundError: If the file doesn't exist
+        ValueError: If a deck is cut short or holds an invalid card id, naming the deck number
+    """
+    deck_num = 0
+    try:
+        file = open(file_path, 'rb')
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Deck file not found: {file_path}")
+    with file:
+        while True:
+            data = file.read(DECK_SIZE * _BINARY_DECKS_PER_READ)
+            if not data:
+                break
+            for start in range(0, len(data), DECK_SIZE):
+                deck_num += 1
+                deck_bytes = data[start:start + DECK_SIZE]
+                if len(deck_bytes) != DECK_SIZE:
+                    raise ValueError(f"Deck {deck_num}: Expected {DECK_SIZE} bytes, got {len(deck_bytes)}")
+                try:
+                    yield Deck.from_bytes(deck_bytes)
+                except ValueError as e:
+                    raise ValueError(f"Deck {deck_num}: {str(e)}")
 
 class Deck:
-    def __init__(self, cards=None):
+    def __init__(self, cards=None, rng=None):
+        # Shuffles use rng (a random.Random) when given, otherwise the global random module
+        self.rng = rng
         # If we do not pass in a list of cards we create a default deck
         if cards is None:
             self.cards = []
@@ -31,51 +209,10 @@ class Deck:
         # Clear existing deck
         self.cards = []
         
-        # Helper function to find enum by name or symbol
-        def find_value(value_str):
-            value_str = value_str.strip().upper()
-            # Try by enum name first
-            for value in Values:
-                if value.name == value_str or value.value[2].upper() == value_str:
-                    return value
-            raise ValueError(f"Invalid value: {value_str}")
-        
-        def find_suit(suit_str):
-            suit_str = suit_str.strip().upper()
-            # Try by enum name first
-            for suit in Suits:
-                if suit.name == suit_str or suit.value[2].upper() == suit_str:
-                    return suit
-            raise ValueError(f"Invalid suit: {suit_str}")
-        
         try:
             with open(file_path, 'r', newline='') as file:
-                reader = csv.reader(file)
-                for row_num, row in enumerate(reader, start=1):
-                    # Skip empty rows
-                    if not row or (len(row) >= 2 and not row[0].strip() and not row[1].strip()):
-                        continue
-                    
-                    # Skip header row if it looks like a header (contains non-enum values)
-                    if row_num == 1:
-                        # Check if first row looks like a header
-                        if len(row) >= 2:
-                            first_col = row[0].strip().upper()
-                            second_col = row[1].strip().upper()
-                            # Common header patterns
-                            if first_col in ['VALUE', 'VALUES', 'CARD_VALUE', 'RANK'] or \
-                               second_col in ['SUIT', 'SUITS', 'CARD_SUIT']:
-                                continue
-                    
-                    if len(row) < 2:
-                        raise ValueError(f"Row {row_num}: Expected 2 columns (value, suit), got {len(row)}")
-                    
-                    try:
-                        value = find_value(row[0])
-                        suit = find_suit(row[1])
-                        self.cards.append(Card(value, suit))
-                    except ValueError as e:
-                        raise ValueError(f"Row {row_num}: {str(e)}")
+                # Empty rows are skipped
+                self.cards.extend(card for card in _read_cards(file) if card is not None)
         except FileNotFoundError:
             raise FileNotFoundError(f"Deck file not found: {file_path}")
         except Exception as e:
@@ -85,11 +222,21 @@ class Deck:
 
     # Returns a list of cards drawn from the deck of length num_cards (default is 1)
     def draw(self, num_cards=1):
-        return [self.cards.pop() for _ in range(num_cards)]
+        if num_cards <= 0:
+            return []
+        if num_cards > len(self.cards):
+            raise IndexError(f"Cannot draw {num_cards} cards from a deck of {len(self.cards)}")
+        # Cards come off the end of the list, last card first
+        drawn = self.cards[:-num_cards - 1:-1]
+        del self.cards[-num_cards:]
+        return drawn
 
     def shuffle(self):
         """Shuffles the deck in place"""
-        random.shuffle(self.cards)
+        if self.rng is None:
+            random.shuffle(self.cards)
+        else:
+            self.rng.shuffle(self.cards)
     
     @classmethod
     def from_file(cls, file_path):
@@ -104,4 +251,69 @@ class Deck:
         """
         deck = cls(cards=[])
         deck.deck_from_file(file_path)
-        return deck
\ No newline at end of file
+        return deck
+
+    def to_bytes(self):
+        """Returns the deck as bytes, one card id (see Card.card_id) per card in deck order"""
+        return bytes([card.id for card in self.cards])
+
+    @classmethod
+    def from_bytes(cls, data):
+        """
+        Creates a new Deck from bytes written by to_bytes.
+
+        Raises:
+            ValueError: If a byte is not a card id
+        """
+        if data and max(data) >= len(CARDS):
+            raise ValueError(f"Invalid card id: {max(data)}")
+        return cls(cards=list(map(CARDS.__getitem__, data)))
+
+class ReusableDeck:
+    """
+    A deck for simulation loops that is shuffled and dealt over and over. It keeps one list
+    of cards and deals by moving a position through it, so no deck is built per deal.
+    Shuffling happens as cards are dealt: each card dealt is swapped with a random one of
+    the cards left, so a deal of 13 cards only does 13 steps of the shuffle, not 52.
+    """
+    __slots__ = ('cards', 'position', 'rng', '_shuffling')
+
+    def __init__(self, cards=None, rng=None):
+        # Starts as a default deck (or a copy of the given cards), dealt in order until reset
+        self.cards = list(CARDS) if cards is None else list(cards)
+        self.position = 0
+        # Shuffles use rng (a random.Random) when given, otherwise the global random module
+        self.rng = rng
+        self._shuffling = False
+
+    def __len__(self):
+        """Number of cards left to deal"""
+        return len(self.cards) - self.position
+
+    def reset(self, shuffle=True):
+        """Puts every card back, to be dealt in random order, or in their current order if shuffle is False"""
+        self.position = 0
+        self._shuffling = shuffle
+
+    def draw(self, num_cards=1):
+        """
+        Deals the next num_cards cards.
+
+        Raises:
+            IndexError: If fewer than num_cards are left
+        """
+        cards = self.cards
+        start = self.position
+        stop = start + num_cards
+        if stop > len(cards):
+            raise IndexError(f"Cannot draw {num_cards} cards, {len(cards) - start} left")
+        if self._shuffling:
+            # Fisher-Yates, one step per card dealt
+            random_value = random.random if self.rng is None else self.rng.random
+            remaining = len(cards) - start
+            for position in range(start, stop):
+                swap = position + int(random_value() * remaining)
+                cards[position], cards[swap] = cards[swap], cards[position]
+                remaining -= 1
+        self.position = stop
+        return cards[start:stop]
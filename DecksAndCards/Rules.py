@@ -0,0 +1,80 @@
+# This file contains the rules of the cribbage variants: how many players there are, how many
+# cards are dealt and discarded, how the crib is made up, and how flushes and nibs score.
+#
+# Scoring (Cribbage.score_hand, score_hands and IncrementalScorer), the score tables
+# (ScoreTable), discarding (Discard.best_discard and CribValues) and dealing (Dealer) take a
+# Rules; without one they play standard six-card cribbage.
+#
+#   six-card:      2 players dealt 6, each discards 2 into the crib; hands of 4
+#   five-card:     2 players dealt 5, each discards 2 into the crib; hands of 3, a crib of 4, game to 61
+#   three-player:  3 players dealt 5, each discards 1, plus 1 card from the deck; hands of 4
+
+from collections import namedtuple
+from functools import lru_cache
+
+_FIELDS = [
+    'name',
+    'players',
+    'cards_dealt',            # cards dealt to each player
+    'discards',               # cards each player puts in the crib
+    'crib_from_deck',         # cards dealt straight from the deck into the crib
+    'hand_flush_needs_cut',   # a hand only scores a flush when the cut matches too
+    'crib_flush_needs_cut',   # the crib only scores a flush when the cut matches too
+    'nibs_points',            # points for the dealer when the cut is a jack (0 for none)
+    'winning_score',
+]
+
+class Rules(namedtuple('Rules', _FIELDS)):
+    """
+    The rules of a cribbage variant. A flush scores a point for each card in it: every card in
+    the hand or crib, plus one more when the cut matches.
+    """
+    __slots__ = ()
+
+    @property
+    def hand_size(self):
+        """Cards each player keeps after discarding"""
+        return self.cards_dealt - self.discards
+
+    @property
+    def crib_size(self):
+        return self.players * self.discards + self.crib_from_deck
+
+    @property
+    def cards_per_deal(self):
+        """Cards taken from the deck for each deal: every player's cards, the crib's and the cut"""
+        return self.players * self.cards_dealt + self.crib_from_deck + 1
+
+def validate(rules):
+    """
+    Checks the rules make a playable game.
+
+    Raises:
+        ValueError: If they don't
+    """
+    if not 2 <= rules.players <= 4:
+        raise ValueError(f"Expected 2 to 4 players, got {rules.players}")
+    if not 0 <= rules.discards < rules.cards_dealt:
+        raise ValueError(f"Players must keep some of their {rules.cards_dealt} cards, not discard {rules.discards}")
+    if rules.cards_per_deal > 52:
+        raise ValueError(f"A deal needs {rules.cards_per_deal} cards, more than the deck has")
+    return rules
+
+@lru_cache(maxsize=None)
+def table_key(rules):
+    """
+    Returns a short, stable hash of the rules that decide the scores in the score tables: the
+    hand and crib sizes and flush rules. Nibs is never in the tables, and names don't change
+    scores, so variants that only differ in those share tables.
+    """
+    # hashlib loads OpenSSL, so it is imported only once a key is needed
+    import hashlib
+    scoring = (rules.hand_size, rules.crib_size, rules.hand_flush_needs_cut, rules.crib_flush_needs_cut)
+    return hashlib.sha1(repr(scoring).encode()).hexdigest()[:12]
+
+STANDARD = Rules(name="six-card", players=2, cards_dealt=6, discards=2, crib_from_deck=0,
+                 hand_flush_needs_cut=False, crib_flush_needs_cut=True, nibs_points=2, winning_score=121)
+FIVE_CARD = STANDARD._replace(name="five-card", cards_dealt=5, winning_score=61)
+THREE_PLAYER = STANDARD._replace(name="three-player", players=3, cards_dealt=5, discards=1, crib_from_deck=1)
+
+VARIANTS = {rules.name: rules for rules in (STANDARD, FIVE_CARD, THREE_PLAYER)}
@@ -0,0 +1,7 @@
+# Helpers shared by the test modules
+
+from DecksAndCards.Deck import parse_card_token
+
+def cards(*tokens):
+    """Returns the cards for short tokens such as '5H', '10D' or 'QS'"""
+    return [parse_card_token(token) for token in tokens]
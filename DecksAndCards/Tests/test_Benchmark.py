@@ -0,0 +1,105 @@
+import unittest
+import sys
+import os
+import tempfile
+import io
+import gc
+from contextlib import redirect_stdout
+
+# Add project root directory to path to import from DecksAndCards package
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+import Benchmark
+
+class TestBenchmark(unittest.TestCase):
+    def test_every_benchmark_runs(self):
+        """Test each benchmark's operation can be set up and called"""
+        for name, setup in Benchmark.BENCHMARKS.items():
+            with self.subTest(name=name):
+                setup()()
+
+    def test_measure(self):
+        """Test measure reports a positive rate and the memory one operation allocates"""
+        result = Benchmark.measure(lambda: [0] * 1000, min_time=0.01)
+        self.assertGreater(result["ops_per_sec"], 0)
+        # A list of 1000 pointers is at least 8000 bytes
+        self.assertGreaterEqual(result["peak_bytes_per_op"], 8000)
+        self.assertLess(result["blocks_per_op"], 1)
+        # Each operation keeps a new list alive
+        kept = []
+        self.assertGreaterEqual(Benchmark.measure(lambda: kept.append([0] * 10), min_time=0.01)["blocks_per_op"], 1)
+
+    def test_from_file_cleans_up(self):
+        """Test the deck file benchmark removes its temporary directory once dropped"""
+        operation = Benchmark.BENCHMARKS["deck_from_file"]()
+        directory = operation.directory.name
+        self.assertEqual(len(operation().cards), 52)
+        del operation
+        gc.collect()
+        self.assertFalse(os.path.exists(directory))
+
+    def test_run_benchmarks(self):
+        """Test only the named benchmarks run and unknown names are rejected"""
+        results = Benchmark.run_benchmarks(["score_hand_29"], min_time=0.01)
+        self.assertEqual(list(results), ["score_hand_29"])
+        with self.assertRaises(ValueError):
+            Benchmark.run_benchmarks(["no_such_benchmark"], min_time=0.01)
+
+    def test_compare_results(self):
+        """Test slowdowns and memory growth beyond the threshold are regressions"""
+        baseline = {"a": {"ops_per_sec": 1000.0, "peak_bytes_per_op": 1000.0},
+                    "b": {"ops_per_sec": 1000.0, "peak_bytes_per_op": 1000.0}}
+        within = {"a": {"ops_per_sec": 950.0, "peak_bytes_per_op": 1100.0},
+                  "new": {"ops_per_sec": 1.0, "peak_bytes_per_op": 1.0}}
+        self.assertEqual(Benchmark.compare_results(baseline, within, threshold=0.1), [])
+        slower = {"a": {"ops_per_sec": 850.0, "peak_bytes_per_op": 1000.0}}
+        self.assertEqual([name for name, _ in Benchmark.compare_results(baseline, slower, threshold=0.1)], ["a"])
+        self.assertEqual(Benchmark.compare_results(baseline, slower, threshold=0.2), [])
+        bigger = {"b": {"ops_per_sec": 1000.0, "peak_bytes_per_op": 5000.0}}
+        self.assertEqual([name for name, _ in Benchmark.compare_results(baseline, bigger, threshold=0.1)], ["b"])
+        # Blocks left allocated are only compared when the baseline counted them
+        counted = {"a": dict(baseline["a"], blocks_per_op=2.0)}
+        leaking = {"a": {"ops_per_sec": 1000.0, "peak_bytes_per_op": 1000.0, "blocks_per_op": 10.0}}
+        self.assertEqual([name for name, _ in Benchmark.compare_results(counted, leaking, threshold=0.1)], ["a"])
+        self.assertEqual(Benchmark.compare_results(baseline, leaking, threshold=0.1), [])
+
+    def test_check_targets(self):
+        """Test benchmarks slower than their target are reported, whatever the baseline"""
+        results = {"game_random": {"ops_per_sec": 500.0, "peak_bytes_per_op": 0.0},
+                   "game_greedy": {"ops_per_sec": 5000.0, "peak_bytes_per_op": 0.0},
+                   "check_pairs": {"ops_per_sec": 1.0, "peak_bytes_per_op": 0.0}}
+        self.assertEqual([name for name, _ in Benchmark.check_targets(results)], ["game_random"])
+        self.assertEqual(Benchmark.check_targets(results, {"check_pairs": 2})[0][0], "check_pairs")
+
+    def test_targets_only_checked_when_asked(self):
+        """Test a missed target only fails the run with --targets"""
+        Benchmark.TARGET_OPS_PER_SEC["check_pairs"] = 1e12
+        try:
+            argv = ["run", "--only", "check_pairs", "--min-time", "0.01"]
+            with redirect_stdout(io.StringIO()):
+                self.assertEqual(Benchmark.main(argv), 0)
+            output = io.StringIO()
+            with redirect_stdout(output):
+                self.assertEqual(Benchmark.main(argv + ["--targets"]), 1)
+            self.assertIn("BELOW TARGET check_pairs", output.getvalue())
+        finally:
+            del Benchmark.TARGET_OPS_PER_SEC["check_pairs"]
+
+    def test_compare_command(self):
+        """Test compare exits nonzero against a baseline that is impossibly fast"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "baseline.json")
+            with redirect_stdout(io.StringIO()):
+                self.assertEqual(Benchmark.main(["run", "--only", "check_pairs", "--min-time", "0.01", "--output", path]), 0)
+            results = Benchmark.load_baseline(path)
+            self.assertEqual(list(results), ["check_pairs"])
+            results["check_pairs"]["ops_per_sec"] *= 1000
+            Benchmark.save_baseline(path, results)
+            output = io.StringIO()
+            with redirect_stdout(output):
+                self.assertEqual(Benchmark.main(["compare", path, "--only", "check_pairs", "--min-time", "0.01"]), 1)
+            self.assertIn("REGRESSION check_pairs", output.getvalue())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import unittest
+import sys
+import os
+import itertools
+import random
+
+# Add project root directory to path to import from DecksAndCards package
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from DecksAndCards.Card import card_from_id
+from DecksAndCards.Canonical import canonical_ids, canonicalize, canonical_key, orbit_size, canonicalize_array
+from Cribbage import score_hand
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+def permute_suits(ids, permutation):
+    """Renames the suit of each card id according to permutation (old suit -> new suit)"""
+    return [permutation[card // 13] * 13 + card % 13 for card in ids]
+
+def random_deals(count, seed=7):
+    """Returns a list of (hand ids, cut id) for random 4 card hands"""
+    rng = random.Random(seed)
+    deals = []
+    for _ in range(count):
+        ids = rng.sample(range(52), 5)
+        deals.append((ids[:4], ids[4]))
+    return deals
+
+class TestCanonical(unittest.TestCase):
+    def test_same_form_under_every_suit_permutation(self):
+        """Test every suit renaming of a hand has the same canonical form"""
+        for hand, cut in random_deals(50):
+            expected = canonical_ids(hand, cut)
+            for permutation in itertools.permutations(range(4)):
+                self.assertEqual(canonical_ids(permute_suits(hand, permutation), permutation[cut // 13] * 13 + cut % 13),
+                                 expected)
+
+    def test_canonical_form_is_a_suit_renaming(self):
+        """Test the canonical form can be reached by renaming the suits of the original"""
+        for hand, cut in random_deals(50):
+            renamings = set()
+            for permutation in itertools.permutations(range(4)):
+                renamings.add((tuple(sorted(permute_suits(hand, permutation))), permutation[cut // 13] * 13 + cut % 13))
+            self.assertIn(canonical_ids(hand, cut), renamings)
+
+    def test_canonical_form_keeps_score(self):
+        """Test scoring the canonical form gives the same score as the original hand"""
+        for hand, cut in random_deals(200):
+            cards = [card_from_id(card) for card in hand]
+            cut_card = card_from_id(cut)
+            canonical_hand, canonical_cut = canonicalize(cards, cut_card)
+            self.assertEqual(score_hand(canonical_hand, canonical_cut), score_hand(cards, cut_card))
+
+    def test_flush_is_not_merged_with_non_flush(self):
+        """Test hands that differ by more than suit names have different keys"""
+        flush = [card_from_id(card) for card in (0, 4, 8, 12)]
+        not_flush = [card_from_id(card) for card in (0, 4, 8, 25)]
+        self.assertNotEqual(canonical_key(flush), canonical_key(not_flush))
+        # A jack with the cut in its suit (nobs) differs from a jack with the cut elsewhere
+        jack = [card_from_id(card) for card in (10, 14, 28, 42)]
+        self.assertNotEqual(canonical_key(jack, card_from_id(1)), canonical_key(jack, card_from_id(40)))
+
+    def test_orbit_sizes_count_every_hand(self):
+        """Test orbit_size matches the number of 2 card hands and cuts with each canonical form"""
+        classes = {}
+        for hand in itertools.combinations(range(52), 2):
+            for cut in range(52):
+                if cut in hand:
+                    continue
+                key = canonical_ids(hand, cut)
+                classes[key] = classes.get(key, 0) + 1
+        for (hand, cut), count in classes.items():
+            self.assertEqual(orbit_size(hand, cut), count)
+        self.assertEqual(sum(classes.values()), 1326 * 50)
+
+    @unittest.skipIf(numpy is None, "NumPy is not installed")
+    def test_canonicalize_array_matches_canonical_ids(self):
+        """Test the bulk API gives the same forms as canonical_ids"""
+        deals = random_deals(500)
+        hands, cuts = canonicalize_array([hand for hand, _ in deals], [cut for _, cut in deals])
+        for (hand, cut), canonical_hand, canonical_cut in zip(deals, hands, cuts):
+            self.assertEqual((tuple(canonical_hand.tolist()), int(canonical_cut)), canonical_ids(hand, cut))
+        hands, cuts = canonicalize_array([hand for hand, _ in deals])
+        self.assertIsNone(cuts)
+        for (hand, _), canonical_hand in zip(deals, hands):
+            self.assertEqual(tuple(canonical_hand.tolist()), canonical_ids(hand)[0])
+
+if __name__ == '__main__':
+    unittest.main()
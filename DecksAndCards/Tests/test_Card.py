@@ -1,12 +1,13 @@
 import unittest
 import sys
 import os
+import pickle
 
 # Add project root directory to path to import from DecksAndCards package
 project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 sys.path.insert(0, project_root)
 
-from DecksAndCards.Card import Card, Suits, Values
+from DecksAndCards.Card import Card, Suits, Values, CARDS, card_from_id
 
 def get_suit_name(suit):
     """Helper function to get suit name, handling both nested and non-nested tuple formats"""
@@ -98,6 +99,53 @@ class TestCard(unittest.TestCase):
             self.assertEqual(card.short_print(), expected,
                            f"Failed for {value.value[1]} of {get_suit_name(suit)}")
 
+    def test_cards_are_interned(self):
+        """Test constructing the same value and suit twice returns the same object"""
+        self.assertIs(Card(Values.ACE, Suits.HEARTS), Card(Values.ACE, Suits.HEARTS))
+        self.assertIsNot(Card(Values.ACE, Suits.HEARTS), Card(Values.ACE, Suits.SPADES))
+        self.assertEqual(len(CARDS), 52)
+        self.assertEqual(len(set(map(id, CARDS))), 52)
+
+    def test_cards_have_no_dict_and_cannot_change(self):
+        """Test cards use __slots__ and reject attribute changes"""
+        card = Card(Values.KING, Suits.CLUBS)
+        self.assertFalse(hasattr(card, '__dict__'))
+        with self.assertRaises(AttributeError):
+            card.value = Values.ACE
+        self.assertEqual(card.value, Values.KING)
+
+    def test_card_fields(self):
+        """Test id, rank, pip and suit_index for a few cards"""
+        test_cases = [
+            (Values.ACE, Suits.HEARTS, 0, 1, 1, 0),
+            (Values.TEN, Suits.DIAMONDS, 22, 10, 10, 1),
+            (Values.JACK, Suits.CLUBS, 36, 11, 10, 2),
+            (Values.KING, Suits.SPADES, 51, 13, 10, 3),
+        ]
+        for value, suit, card_id, rank, pip, suit_index in test_cases:
+            card = Card(value, suit)
+            self.assertEqual((card.id, card.rank, card.pip, card.suit_index), (card_id, rank, pip, suit_index),
+                             f"Failed for {value.value[1]} of {get_suit_name(suit)}")
+            self.assertIs(card_from_id(card_id), card)
+
+    def test_equality_and_hashing(self):
+        """Test cards compare and hash by value and suit"""
+        card = Card(Values.FIVE, Suits.HEARTS)
+        self.assertEqual(card, Card(Values.FIVE, Suits.HEARTS))
+        self.assertNotEqual(card, Card(Values.FIVE, Suits.DIAMONDS))
+        self.assertNotEqual(card, "5H")
+        self.assertEqual(len({card, Card(Values.FIVE, Suits.HEARTS)}), 1)
+
+    def test_pickle_returns_interned_card(self):
+        """Test unpickling a card gives back the shared instance"""
+        card = Card(Values.QUEEN, Suits.DIAMONDS)
+        self.assertIs(pickle.loads(pickle.dumps(card)), card)
+
+    def test_invalid_card_raises(self):
+        """Test values that are not enum members raise ValueError"""
+        with self.assertRaises(ValueError):
+            Card("A", Suits.HEARTS)
+
 if __name__ == '__main__':
     unittest.main()
 
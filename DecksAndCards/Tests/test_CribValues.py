@@ -0,0 +1,109 @@
+import unittest
+import sys
+import os
+import itertools
+import random
+import tempfile
+
+# Add project root directory to path to import from DecksAndCards package
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from DecksAndCards.Card import Card, Suits, Values, CARDS
+from Cribbage import score_hand
+import CribValues
+from DecksAndCards import Rules
+
+class TestCribValues(unittest.TestCase):
+    def test_kinds(self):
+        """Test there are 169 kinds of discard and every pair of cards has one"""
+        self.assertEqual(len(CribValues.KINDS), 169)
+        kinds = set(CribValues.discard_kind(pair) for pair in itertools.combinations(CARDS, 2))
+        self.assertEqual(kinds, set(CribValues.KINDS))
+        self.assertEqual(CribValues.discard_kind([Card(Values.KING, Suits.HEARTS), Card(Values.FIVE, Suits.HEARTS)]),
+                         (5, 13, True))
+
+    def assert_crib_points(self, crib_ids, held_ids, rules=None):
+        discard_ids = crib_ids[:2]
+        # The other player holds their two discards and four more cards
+        other_ids = crib_ids[2:] + held_ids[:4]
+        cuts_of_rank = [0] * 14
+        cuts_of_suit = [0] * 4
+        for card in range(52):
+            if card not in other_ids:
+                cuts_of_rank[card % 13 + 1] += 1
+                cuts_of_suit[card // 13] += 1
+        cuts = [CARDS[card] for card in range(52) if card not in other_ids and card not in discard_ids]
+        crib = [CARDS[card] for card in crib_ids]
+        expected = sum(score_hand(crib, cut, is_crib=True, rules=rules) for cut in cuts) / len(cuts)
+        self.assertAlmostEqual(CribValues._crib_points(crib_ids, discard_ids, cuts_of_rank, cuts_of_suit, 46, rules),
+                               expected)
+
+    def test_crib_points_match_score_hand(self):
+        """Test the crib points averaged over the cuts match scoring each cut with score_hand"""
+        rng = random.Random(15)
+        for _ in range(50):
+            cards = rng.sample(range(52), 10)
+            self.assert_crib_points(cards[:4], cards[4:])
+
+    def test_crib_points_of_flushes_follow_the_rules(self):
+        """Test cribs of one suit score their flush as score_hand does, with and without rules"""
+        rng = random.Random(16)
+        no_cut_needed = Rules.STANDARD._replace(name="crib-flush", crib_flush_needs_cut=False)
+        for _ in range(20):
+            # A crib of hearts with jacks now and then, for nobs
+            crib_ids = rng.sample(range(13), 4)
+            held_ids = rng.sample([card for card in range(52) if card not in crib_ids], 6)
+            for rules in (None, Rules.STANDARD, no_cut_needed):
+                self.assert_crib_points(crib_ids, held_ids, rules)
+
+    def test_compute_values_rejects_other_deals(self):
+        """Test variants that don't discard 2 of 6 cards have no crib values"""
+        with self.assertRaises(ValueError):
+            CribValues.compute_values(samples=1, workers=1, rules=Rules.THREE_PLAYER)
+
+    def test_compute_values_is_reproducible(self):
+        """Test a small estimate gives the same values in one process or several"""
+        first = CribValues.compute_values(samples=12, seed=3, workers=1)
+        second = CribValues.compute_values(samples=12, seed=3, workers=2)
+        self.assertEqual(len(first), 2)
+        self.assertEqual(len(first[0]), 169)
+        for seat in (0, 1):
+            for a, b in zip(first[seat], second[seat]):
+                self.assertAlmostEqual(a, b)
+
+    def test_write_and_load_values(self):
+        """Test values survive a round trip through a file and are looked up by seat"""
+        values = [[index / 10 for index in range(169)], [index / 4 for index in range(169)]]
+        saved = CribValues._values
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "expected_crib.bin")
+            CribValues.write_values(path, values, samples=5)
+            try:
+                CribValues.load_values(path)
+                discard = [Card(Values.FIVE, Suits.HEARTS), Card(Values.FIVE, Suits.CLUBS)]
+                index = CribValues.KINDS.index((5, 5, False))
+                self.assertAlmostEqual(CribValues.expected_crib_value(discard, is_dealer=False), index / 10, places=5)
+                self.assertAlmostEqual(CribValues.expected_crib_value(discard, is_dealer=True), index / 4, places=5)
+            finally:
+                CribValues._values = saved
+
+            with open(path, 'wb') as file:
+                file.write(b"not a table")
+            with self.assertRaises(ValueError):
+                CribValues.load_values(path)
+
+    def test_shipped_values(self):
+        """Test the saved values are sensible: fives are the best throw, and a dealer's crib is richer"""
+        CribValues.load_values()
+        five_five = CribValues.KINDS.index((5, 5, False))
+        king_ten = CribValues.KINDS.index((10, 13, False))
+        for seat in (0, 1):
+            values = CribValues._values[seat]
+            self.assertEqual(max(range(169), key=lambda index: values[index]), five_five)
+            self.assertLess(values[king_ten], values[five_five])
+        # The pone's discards land in a crib the dealer has fed with good cards
+        self.assertGreater(sum(CribValues._values[0]), sum(CribValues._values[1]))
+
+if __name__ == '__main__':
+    unittest.main()
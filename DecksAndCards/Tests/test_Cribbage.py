@@ -1,13 +1,15 @@
 import unittest
 import sys
 import os
+import itertools
+import random
 
 # Add project root directory to path to import from DecksAndCards package
 project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 sys.path.insert(0, project_root)
 
-from DecksAndCards.Card import Card, Suits, Values
-from Cribbage import check_pairs, check_runs, check_flushes, check_nibs_and_nobs, check_15s
+from DecksAndCards.Card import Card, Suits, Values, CARDS
+from Cribbage import check_pairs, check_runs, check_flushes, check_nibs_and_nobs, check_15s, count_fifteens
 
 class TestCribbage(unittest.TestCase):
     def test_score_pairs_one_pair(self):
@@ -377,4 +379,28 @@ class TestCribbage(unittest.TestCase):
         ]
         cut = Card(Values.TEN, Suits.HEARTS)
         score = check_15s(hand, cut, 0)
-        self.assertEqual(score, 16)
\ No newline at end of file
+        self.assertEqual(score, 16)
+    
+    def test_check_15s_six_card_hand(self):
+        """Test check_15s with a 6 card hand and a cut: [5, 5, 5, 5, J, Q] and cut [K] = 32 points"""
+        hand = [
+            Card(Values.FIVE, Suits.HEARTS),
+            Card(Values.FIVE, Suits.DIAMONDS),
+            Card(Values.FIVE, Suits.CLUBS),
+            Card(Values.FIVE, Suits.SPADES),
+            Card(Values.JACK, Suits.HEARTS),
+            Card(Values.QUEEN, Suits.HEARTS)
+        ]
+        cut = Card(Values.KING, Suits.HEARTS)
+        # 4 three-five 15s plus 12 five-and-ten 15s
+        self.assertEqual(check_15s(hand, cut, 0), 32)
+    
+    def test_count_fifteens_matches_every_combination(self):
+        """Test count_fifteens against trying every combination, for 0 to 9 cards"""
+        rng = random.Random(11)
+        for num_cards in range(10):
+            for _ in range(200):
+                pips = [card.pip for card in rng.sample(CARDS, num_cards)]
+                expected = sum(1 for r in range(2, num_cards + 1)
+                               for combo in itertools.combinations(pips, r) if sum(combo) == 15)
+                self.assertEqual(count_fifteens(pips), expected, f"pips {pips}")
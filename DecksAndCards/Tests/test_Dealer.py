@@ -0,0 +1,52 @@
+import unittest
+import sys
+import os
+
+# Add project root directory to path to import from DecksAndCards package
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from DecksAndCards import Dealer
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+@unittest.skipIf(numpy is None, "NumPy is not installed")
+class TestDealer(unittest.TestCase):
+    def test_deals_are_distinct_cards(self):
+        """Test every deal is two 6 card hands and a cut, all different cards"""
+        deals = Dealer.deal(1000, seed=1)
+        self.assertEqual(deals.hands.shape, (1000, 2, 6))
+        self.assertEqual(deals.cuts.shape, (1000,))
+        cards = numpy.concatenate([deals.hands.reshape(1000, 12), deals.cuts[:, None]], axis=1)
+        self.assertTrue((numpy.sort(cards, axis=1)[:, 1:] != numpy.sort(cards, axis=1)[:, :-1]).all())
+        self.assertTrue((cards < 52).all())
+
+    def test_cards_are_evenly_dealt(self):
+        """Test each card turns up about equally often in each position"""
+        deals = Dealer.deal(52000, seed=2)
+        counts = numpy.bincount(deals.cuts, minlength=52)
+        self.assertTrue((abs(counts - 1000) < 150).all())
+        counts = numpy.bincount(deals.hands[:, 1, 5], minlength=52)
+        self.assertTrue((abs(counts - 1000) < 150).all())
+
+    def test_same_seed_same_deals_for_any_workers(self):
+        """Test a seed gives identical deals in one process or several, across chunk boundaries"""
+        num_deals = Dealer.DEALS_PER_CHUNK + 500
+        single = Dealer.deal(num_deals, seed=3, workers=1)
+        several = Dealer.deal(num_deals, seed=3, workers=2)
+        self.assertTrue((single.hands == several.hands).all())
+        self.assertTrue((single.cuts == several.cuts).all())
+        self.assertTrue((Dealer.deal(500, seed=3).hands == Dealer.deal(500, seed=3).hands).all())
+        self.assertFalse((Dealer.deal(500, seed=4).hands == Dealer.deal(500, seed=3).hands).all())
+
+    def test_no_deals(self):
+        """Test asking for no deals gives empty arrays"""
+        deals = Dealer.deal(0)
+        self.assertEqual(deals.hands.shape, (0, 2, 6))
+        self.assertEqual(deals.cuts.shape, (0,))
+
+if __name__ == '__main__':
+    unittest.main()
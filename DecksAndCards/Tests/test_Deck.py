@@ -2,13 +2,14 @@ import unittest
 import sys
 import os
 import tempfile
+import random
 
 # Add project root directory to path to import from DecksAndCards package
 project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 sys.path.insert(0, project_root)
 
-from DecksAndCards.Deck import Deck
-from DecksAndCards.Card import Card, Suits, Values
+from DecksAndCards.Deck import Deck, ReusableDeck, read_decks, read_binary_decks, write_binary_decks, find_value, find_suit
+from DecksAndCards.Card import Card, Suits, Values, CARDS
 
 class TestDeck(unittest.TestCase):
     
@@ -557,6 +558,163 @@ class TestDeck(unittest.TestCase):
         finally:
             os.unlink(temp_file)
 
+    def test_deck_from_file_spacing_and_case(self):
+        """Test that tokens with spaces and unusual case are still read"""
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False, newline='') as f:
+            f.write(" aCe , hEaRtS \n")
+            f.write("10,d\n")
+            f.write("k, Clubs\n")
+            temp_file = f.name
+        
+        try:
+            deck = Deck.from_file(temp_file)
+            self.assertEqual(deck.cards, [Card(Values.ACE, Suits.HEARTS), Card(Values.TEN, Suits.DIAMONDS),
+                                          Card(Values.KING, Suits.CLUBS)])
+        finally:
+            os.unlink(temp_file)
+    
+    def test_find_value_and_suit(self):
+        """Test the enum lookups by name or symbol, and their errors"""
+        self.assertEqual(find_value(" queen "), Values.QUEEN)
+        self.assertEqual(find_value("j"), Values.JACK)
+        self.assertEqual(find_suit("s"), Suits.SPADES)
+        with self.assertRaisesRegex(ValueError, "Invalid value: ELEVEN"):
+            find_value("eleven")
+        with self.assertRaisesRegex(ValueError, "Invalid suit: X"):
+            find_suit("x")
+    
+    def test_read_decks_blocks_and_files(self):
+        """Test reading several decks separated by empty rows, across more than one file"""
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False, newline='') as f:
+            f.write("VALUE,SUIT\nA,H\n2,H\n\n\n3,C\n")
+            first_file = f.name
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False, newline='') as f:
+            f.write("KING,SPADES\n")
+            second_file = f.name
+        
+        try:
+            decks = list(read_decks([first_file, second_file]))
+            self.assertEqual([[card.short_print() for card in deck.cards] for deck in decks],
+                             [["AH", "2H"], ["3C"], ["KS"]])
+            self.assertEqual(len(list(read_decks(first_file))), 2)
+        finally:
+            os.unlink(first_file)
+            os.unlink(second_file)
+    
+    def test_read_decks_errors_name_the_row(self):
+        """Test that a bad row in a bulk read names the file and the row"""
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.csv', delete=False, newline='') as f:
+            f.write("A,H\n\n2,Z\n")
+            temp_file = f.name
+        
+        try:
+            with self.assertRaises(ValueError) as context:
+                list(read_decks(temp_file))
+            self.assertIn("Row 3", str(context.exception))
+            self.assertIn("Invalid suit", str(context.exception))
+            self.assertIn(temp_file, str(context.exception))
+        finally:
+            os.unlink(temp_file)
+        with self.assertRaises(FileNotFoundError):
+            list(read_decks("nonexistent_file.csv"))
+    
+    def test_bytes_round_trip(self):
+        """Test that to_bytes and from_bytes keep the cards and their order"""
+        deck = Deck()
+        deck.shuffle()
+        data = deck.to_bytes()
+        self.assertEqual(len(data), 52)
+        self.assertEqual(Deck.from_bytes(data).cards, deck.cards)
+        with self.assertRaisesRegex(ValueError, "Invalid card id: 52"):
+            Deck.from_bytes(bytes([0, 52]))
+    
+    def test_binary_deck_file(self):
+        """Test writing decks to a binary file and reading them back"""
+        decks = []
+        for _ in range(3):
+            deck = Deck()
+            deck.shuffle()
+            decks.append(deck)
+        with tempfile.NamedTemporaryFile(suffix='.bin', delete=False) as f:
+            temp_file = f.name
+        
+        try:
+            self.assertEqual(write_binary_decks(temp_file, decks), 3)
+            self.assertEqual(os.path.getsize(temp_file), 3 * 52)
+            self.assertEqual([deck.cards for deck in read_binary_decks(temp_file)],
+                             [deck.cards for deck in decks])
+            
+            # A short deck can't be written, and a cut off file is reported by deck number
+            with self.assertRaisesRegex(ValueError, "Deck 1: Expected 52 cards"):
+                write_binary_decks(temp_file, [Deck(cards=[])])
+            with open(temp_file, 'wb') as f:
+                f.write(decks[0].to_bytes() + decks[1].to_bytes()[:10])
+            with self.assertRaisesRegex(ValueError, "Deck 2: Expected 52 bytes"):
+                list(read_binary_decks(temp_file))
+        finally:
+            os.unlink(temp_file)
+
+    def test_shuffle_with_injected_rng(self):
+        """Test that decks given equally seeded random number generators shuffle the same way"""
+        first = Deck(rng=random.Random(16))
+        second = Deck(rng=random.Random(16))
+        first.shuffle()
+        second.shuffle()
+        self.assertEqual(first.cards, second.cards)
+        self.assertNotEqual(first.cards, Deck().cards)
+        
+        # The injected generator is used, not the global one
+        state = random.getstate()
+        first.shuffle()
+        self.assertEqual(random.getstate(), state)
+
+    def test_draw_takes_cards_from_the_end(self):
+        """Test that draw() takes the last cards first and refuses to draw more than are left"""
+        deck = Deck()
+        last_three = deck.cards[-3:]
+        self.assertEqual(deck.draw(3), last_three[::-1])
+        self.assertEqual(len(deck.cards), 49)
+        self.assertEqual(deck.draw(0), [])
+        with self.assertRaises(IndexError):
+            deck.draw(50)
+        self.assertEqual(len(deck.cards), 49, "A failed draw should leave the deck alone")
+    
+    def test_reusable_deck_deals_every_card_once(self):
+        """Test that a reusable deck deals each card once between resets, in a new order each time"""
+        deck = ReusableDeck(rng=random.Random(17))
+        self.assertEqual(deck.draw(52), list(CARDS), "An unshuffled deck deals in default order")
+        deck.reset()
+        first = deck.draw(13) + deck.draw(39)
+        self.assertEqual(sorted(card.id for card in first), list(range(52)))
+        self.assertEqual(len(deck), 0)
+        with self.assertRaises(IndexError):
+            deck.draw()
+        deck.reset()
+        second = deck.draw(52)
+        self.assertNotEqual(first, second)
+        self.assertEqual(sorted(card.id for card in second), list(range(52)))
+    
+    def test_reusable_deck_is_reproducible(self):
+        """Test that equally seeded reusable decks deal the same cards, and reset without shuffling replays them"""
+        first = ReusableDeck(rng=random.Random(18))
+        second = ReusableDeck(rng=random.Random(18))
+        for _ in range(3):
+            first.reset()
+            second.reset()
+            self.assertEqual(first.draw(13), second.draw(13))
+        dealt = first.cards[:13]
+        first.reset(shuffle=False)
+        self.assertEqual(first.draw(13), dealt)
+    
+    def test_reusable_deck_deals_evenly(self):
+        """Test that every card is about equally likely to be dealt in a given position"""
+        deck = ReusableDeck(rng=random.Random(19))
+        counts = [0] * 52
+        for _ in range(26000):
+            deck.reset()
+            counts[deck.draw(6)[5].id] += 1
+        self.assertLess(max(counts) - min(counts), 200)
+
 if __name__ == '__main__':
     unittest.main()
 
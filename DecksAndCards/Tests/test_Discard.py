@@ -0,0 +1,103 @@
+import unittest
+import sys
+import os
+import random
+
+# Add project root directory to path to import from DecksAndCards package
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from DecksAndCards.Card import Card, Suits, Values, CARDS
+from Cribbage import score_hand
+from Discard import best_discard
+from DecksAndCards import Rules
+
+def expected_hand_value(keep, six_cards, is_dealer=True, rules=None):
+    """Averages score_hand over every cut not among the six cards"""
+    cuts = [card for card in CARDS if card not in six_cards]
+    return sum(score_hand(keep, cut, is_dealer=is_dealer, rules=rules) for cut in cuts) / len(cuts)
+
+class TestDiscard(unittest.TestCase):
+    def test_hand_values_match_score_hand(self):
+        """Test the expected hand value of every split matches scoring each cut with score_hand"""
+        rng = random.Random(11)
+        for trial in range(20):
+            six_cards = rng.sample(CARDS, 6)
+            # Only the dealer's hand counts nibs
+            is_dealer = trial % 2 == 0
+            options = best_discard(six_cards, is_dealer=is_dealer)
+            self.assertEqual(len(options), 15)
+            for option in options:
+                self.assertAlmostEqual(option.hand_value, expected_hand_value(option.keep, six_cards, is_dealer))
+                self.assertEqual(sorted(option.keep + option.discard, key=lambda card: card.id),
+                                 sorted(six_cards, key=lambda card: card.id))
+
+    def test_options_are_ranked(self):
+        """Test options come back best expected value first"""
+        rng = random.Random(12)
+        six_cards = rng.sample(CARDS, 6)
+        values = [option.expected_value for option in best_discard(six_cards, is_dealer=False)]
+        self.assertEqual(values, sorted(values, reverse=True))
+
+    def test_keeps_the_obvious_hand(self):
+        """Test 5H 5D 5C JS with KH QD to throw keeps the three fives and the jack"""
+        six_cards = [
+            Card(Values.FIVE, Suits.HEARTS),
+            Card(Values.FIVE, Suits.DIAMONDS),
+            Card(Values.FIVE, Suits.CLUBS),
+            Card(Values.JACK, Suits.SPADES),
+            Card(Values.KING, Suits.HEARTS),
+            Card(Values.QUEEN, Suits.DIAMONDS)
+        ]
+        best = best_discard(six_cards, is_dealer=True)[0]
+        self.assertEqual(set(best.keep), set(six_cards[:4]))
+
+    def test_crib_value_follows_dealer(self):
+        """Test the discards' crib value is added for the dealer and subtracted otherwise"""
+        rng = random.Random(13)
+        six_cards = rng.sample(CARDS, 6)
+        for option in best_discard(six_cards, is_dealer=True, include_crib=True):
+            self.assertAlmostEqual(option.expected_value, option.hand_value + option.crib_value)
+        for option in best_discard(six_cards, is_dealer=False, include_crib=True):
+            self.assertAlmostEqual(option.expected_value, option.hand_value - option.crib_value)
+        for option in best_discard(six_cards, is_dealer=True):
+            self.assertEqual(option.crib_value, 0)
+
+    def test_thrown_pair_of_fives_is_worth_crib_points(self):
+        """Test two fives in the crib are worth at least the pair"""
+        six_cards = [
+            Card(Values.FIVE, Suits.HEARTS),
+            Card(Values.FIVE, Suits.DIAMONDS),
+            Card(Values.ACE, Suits.CLUBS),
+            Card(Values.THREE, Suits.SPADES),
+            Card(Values.SEVEN, Suits.HEARTS),
+            Card(Values.NINE, Suits.DIAMONDS)
+        ]
+        for option in best_discard(six_cards, is_dealer=True, include_crib=True):
+            if set(option.discard) == set(six_cards[:2]):
+                self.assertGreater(option.crib_value, 2)
+
+    def test_hand_values_follow_the_rules(self):
+        """Test a variant's flush and nibs rules change the hand values as they do score_hand"""
+        rng = random.Random(12)
+        strict = Rules.STANDARD._replace(name="strict-flush", hand_flush_needs_cut=True, nibs_points=1)
+        hearts = [card for card in CARDS if card.suit_index == CARDS[0].suit_index]
+        for trial in range(10):
+            # Five hearts, so most splits keep a flush
+            six_cards = rng.sample(hearts, 5) + [rng.choice(CARDS[13:])]
+            for rules in (Rules.STANDARD, strict):
+                for option in best_discard(six_cards, is_dealer=trial % 2 == 0, rules=rules):
+                    self.assertAlmostEqual(option.hand_value,
+                                           expected_hand_value(option.keep, six_cards, trial % 2 == 0, rules))
+        with self.assertRaises(ValueError):
+            best_discard(CARDS[:6], is_dealer=True, rules=Rules.THREE_PLAYER)
+
+    def test_requires_six_distinct_cards(self):
+        """Test anything other than 6 distinct cards raises ValueError"""
+        with self.assertRaises(ValueError):
+            best_discard(CARDS[:5], is_dealer=True)
+        with self.assertRaises(ValueError):
+            best_discard(list(CARDS[:5]) + [CARDS[0]], is_dealer=True)
+
+if __name__ == '__main__':
+    unittest.main()
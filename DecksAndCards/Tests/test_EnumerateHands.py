@@ -0,0 +1,91 @@
+import unittest
+import sys
+import os
+import itertools
+import json
+import tempfile
+
+# Add project root directory to path to import from DecksAndCards package
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from DecksAndCards.Card import CARDS
+from Cribbage import score_hand
+import EnumerateHands
+
+# Only the shards for hands made from the lowest card ids are computed, which keeps the tests fast
+SMALL_TOPS = range(3, 9)
+
+class TestEnumerateHands(unittest.TestCase):
+    def test_shard_stats_match_score_hand(self):
+        """Test shard histograms and per-card totals agree with scoring each deal directly"""
+        with tempfile.TemporaryDirectory() as directory:
+            computed = EnumerateHands.compute_shards(directory, tops=SMALL_TOPS, workers=2)
+            self.assertEqual(sorted(computed), list(SMALL_TOPS))
+
+            histogram = [0] * (EnumerateHands.MAX_SCORE + 1)
+            hand_card_points = [0] * 52
+            cut_card_points = [0] * 52
+            for ids in itertools.combinations(range(max(SMALL_TOPS) + 1), 4):
+                hand = [CARDS[card] for card in ids]
+                for cut in range(52):
+                    if cut in ids:
+                        continue
+                    score = score_hand(hand, CARDS[cut], is_dealer=False)
+                    histogram[score] += 1
+                    for card in ids:
+                        hand_card_points[card] += score
+                    cut_card_points[cut] += score
+
+            totals = {"hand_histogram": [0] * len(histogram), "hand_card_points": [0] * 52, "cut_card_points": [0] * 52}
+            for top in SMALL_TOPS:
+                with open(EnumerateHands._shard_paths(directory, top)[2]) as file:
+                    stats = json.load(file)
+                for name, values in totals.items():
+                    for i, value in enumerate(stats[name]):
+                        values[i] += value
+            self.assertEqual(totals["hand_histogram"], histogram)
+            self.assertEqual(totals["hand_card_points"], hand_card_points)
+            self.assertEqual(totals["cut_card_points"], cut_card_points)
+
+    def test_finished_shards_are_skipped(self):
+        """Test a second run only computes shards that are not finished"""
+        with tempfile.TemporaryDirectory() as directory:
+            EnumerateHands.compute_shards(directory, tops=range(3, 6), workers=1)
+            self.assertEqual(EnumerateHands.compute_shards(directory, tops=SMALL_TOPS, workers=1), [8, 7, 6])
+            self.assertEqual(EnumerateHands.compute_shards(directory, tops=SMALL_TOPS, workers=1), [])
+            # A truncated shard is recomputed
+            hand_path = EnumerateHands._shard_paths(directory, 5)[0]
+            with open(hand_path, 'r+b') as file:
+                file.truncate(10)
+            self.assertFalse(EnumerateHands.is_shard_done(directory, 5))
+            self.assertEqual(EnumerateHands.compute_shards(directory, tops=SMALL_TOPS, workers=1), [5])
+
+    def test_shards_in_another_format_are_recomputed(self):
+        """Test shards without this version's marker are not finished, so merge_shards never mixes formats"""
+        with tempfile.TemporaryDirectory() as directory:
+            EnumerateHands.compute_shards(directory, tops=range(3, 6), workers=1)
+            for top, version in ((3, None), (4, EnumerateHands.SHARD_VERSION + 1)):
+                stats_path = EnumerateHands._shard_paths(directory, top)[2]
+                with open(stats_path) as file:
+                    stats = json.load(file)
+                del stats["version"]
+                if version is not None:
+                    stats["version"] = version
+                with open(stats_path, 'w') as file:
+                    json.dump(stats, file)
+                self.assertFalse(EnumerateHands.is_shard_done(directory, top))
+            self.assertTrue(EnumerateHands.is_shard_done(directory, 5))
+            with self.assertRaises(ValueError):
+                EnumerateHands.merge_shards(directory)
+            self.assertEqual(EnumerateHands.compute_shards(directory, tops=range(3, 6), workers=1), [4, 3])
+
+    def test_merge_requires_every_shard(self):
+        """Test merging before every shard is finished raises ValueError"""
+        with tempfile.TemporaryDirectory() as directory:
+            EnumerateHands.compute_shards(directory, tops=range(3, 5), workers=1)
+            with self.assertRaises(ValueError):
+                EnumerateHands.merge_shards(directory)
+
+if __name__ == '__main__':
+    unittest.main()
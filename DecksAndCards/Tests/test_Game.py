@@ -0,0 +1,80 @@
+import unittest
+import sys
+import os
+import random
+
+# Add project root directory to path to import from DecksAndCards package
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from DecksAndCards.Tests.helpers import cards
+import Game
+
+class TestGame(unittest.TestCase):
+    def test_pegging_fifteen_and_last_card(self):
+        """Test the pone leads a 5, the dealer makes 15 and takes 1 for the last card"""
+        board = Game._Scoreboard()
+        hands = [cards('10S'), cards('5H')]
+        strategies = [Game.GreedyStrategy(), Game.GreedyStrategy()]
+        self.assertFalse(Game._play_pegging(hands, 0, strategies, board, random.Random(0)))
+        self.assertEqual(board.scores, [3, 0])
+
+    def test_pegging_thirty_one_has_no_go(self):
+        """Test making 31 with the last card scores 2 and no extra point"""
+        board = Game._Scoreboard()
+        hands = [cards('KS', 'AS'), cards('KH', 'QH')]
+        strategies = [Game.GreedyStrategy(), Game.GreedyStrategy()]
+        # Pone K (10), dealer K (20, pair), pone Q (30), dealer A (31)
+        Game._play_pegging(hands, 0, strategies, board, random.Random(0))
+        self.assertEqual(board.scores, [4, 0])
+
+    def test_pegging_go(self):
+        """Test a go goes to the last player to play, and the other player leads the next count"""
+        board = Game._Scoreboard()
+        hands = [cards('KS', '9S'), cards('KH', '2H')]
+        strategies = [Game.GreedyStrategy(), Game.GreedyStrategy()]
+        # Pone K (10), dealer K (20, pair for 2), pone 2 (22), dealer 9 (31 for 2)
+        Game._play_pegging(hands, 0, strategies, board, random.Random(0))
+        self.assertEqual(board.scores, [4, 0])
+        board = Game._Scoreboard()
+        hands = [cards('KS', 'QS'), cards('KH', 'QH')]
+        # Pone K (10), dealer K (20, pair), pone Q (30), nobody can play: go to the pone.
+        # The dealer leads Q for a new count and takes the last card.
+        Game._play_pegging(hands, 0, strategies, board, random.Random(0))
+        self.assertEqual(board.scores, [3, 1])
+
+    def test_game_reaches_winning_score(self):
+        """Test a game ends with exactly one player at 121 or more"""
+        rng = random.Random(5)
+        for strategies in ([Game.RandomStrategy(), Game.RandomStrategy()],
+                           [Game.GreedyStrategy(), Game.RandomStrategy()]):
+            result = Game.play_game(strategies, rng)
+            self.assertGreaterEqual(result.scores[result.winner], Game.WINNING_SCORE)
+            self.assertLess(result.scores[1 - result.winner], Game.WINNING_SCORE)
+            self.assertGreater(result.deals, 1)
+
+    def test_run_games_independent_of_workers(self):
+        """Test the same seed gives the same results with one or several workers"""
+        one = Game.run_games(250, ["random", "random"], seed=3, workers=1)
+        several = Game.run_games(250, ["random", "random"], seed=3, workers=3)
+        self.assertEqual(one, several)
+        self.assertEqual(sum(one.wins), 250)
+        low, high = one.confidence_interval
+        self.assertLessEqual(low, one.win_rate)
+        self.assertLessEqual(one.win_rate, high)
+
+    def test_run_games_rejects_unknown_strategy(self):
+        """Test an unknown strategy name raises ValueError"""
+        with self.assertRaises(ValueError):
+            Game.run_games(10, ["random", "perfect"])
+
+    def test_wilson_interval(self):
+        """Test the interval is centred near the observed rate and narrows with more trials"""
+        low, high = Game.wilson_interval(50, 100)
+        self.assertAlmostEqual((low + high) / 2, 0.5)
+        wide = high - low
+        low, high = Game.wilson_interval(5000, 10000)
+        self.assertLess(high - low, wide)
+
+if __name__ == '__main__':
+    unittest.main()
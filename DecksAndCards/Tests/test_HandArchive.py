@@ -0,0 +1,157 @@
+import unittest
+import sys
+import os
+import random
+import tempfile
+
+# Add project root directory to path to import from DecksAndCards package
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from DecksAndCards.Card import CARDS
+from DecksAndCards.Deck import Deck
+import Cribbage
+import HandArchive
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+class TestHandEncoding(unittest.TestCase):
+    def test_round_trip(self):
+        """Test encode_hand and decode_hand give back the cards, score and flags"""
+        rng = random.Random(30)
+        for _ in range(500):
+            deal = rng.sample(CARDS, 5)
+            is_crib, is_dealer = rng.random() < 0.5, rng.random() < 0.5
+            word = HandArchive.encode_hand(deal[:4], deal[4], is_crib=is_crib, is_dealer=is_dealer)
+            self.assertLess(word, 1 << 64)
+            record = HandArchive.decode_hand(word)
+            self.assertEqual(record.hand, deal[:4])
+            self.assertIs(record.cut, deal[4])
+            self.assertEqual(record.score, Cribbage.score_hand(deal[:4], deal[4], is_crib=is_crib, is_dealer=is_dealer))
+            self.assertEqual((record.is_crib, record.is_dealer), (is_crib, is_dealer))
+
+    def test_no_cut(self):
+        """Test a hand without a cut card"""
+        record = HandArchive.decode_hand(HandArchive.encode_hand(list(CARDS[:4]), None, 12))
+        self.assertIsNone(record.cut)
+        self.assertEqual(record.score, 12)
+
+    def test_wrong_hand_size(self):
+        """Test only 4 card hands can be encoded"""
+        with self.assertRaises(ValueError):
+            HandArchive.encode_hand(list(CARDS[:5]), CARDS[10], 0)
+
+    def test_score_out_of_range(self):
+        """Test scores that don't fit in 8 bits raise ValueError rather than spilling into the flags"""
+        for score in (-1, 256, 1 << 20):
+            with self.assertRaises(ValueError):
+                HandArchive.encode_hand(list(CARDS[:4]), CARDS[10], score)
+        self.assertEqual(HandArchive.decode_hand(HandArchive.encode_hand(list(CARDS[:4]), CARDS[10], 255)).score, 255)
+
+    def test_pack_cards(self):
+        """Test cards pack into 6 bits each and unpack in order"""
+        for count in range(0, 53):
+            cards = list(CARDS[count:]) + list(CARDS[:count])
+            cards = cards[:count]
+            data = HandArchive.pack_cards(cards)
+            self.assertEqual(len(data), (count * 6 + 7) // 8)
+            self.assertEqual(HandArchive.unpack_cards(data), cards)
+        with self.assertRaises(ValueError):
+            HandArchive.unpack_cards(bytes([60]))
+
+    def test_pack_deck(self):
+        """Test a shuffled deck packs into 39 bytes and unpacks in the same order"""
+        deck = Deck(rng=random.Random(31))
+        deck.shuffle()
+        data = HandArchive.pack_deck(deck)
+        self.assertEqual(len(data), 39)
+        self.assertEqual(HandArchive.unpack_deck(data).cards, deck.cards)
+
+@unittest.skipIf(numpy is None, "NumPy is not installed")
+class TestHandArchive(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "hands.arc")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_words_match_encode_hand(self):
+        """Test the NumPy packing gives the same words as encode_hand and unpacks back"""
+        rng = random.Random(32)
+        deals = [rng.sample(range(52), 5) for _ in range(1000)]
+        hands = numpy.array([deal[:4] for deal in deals])
+        cuts = numpy.array([deal[4] for deal in deals])
+        scores = Cribbage.score_hands(hands, cuts, is_crib=True)
+        is_dealer = numpy.arange(1000) % 2 == 0
+        words = HandArchive.pack_words(hands, cuts, scores, is_crib=True, is_dealer=is_dealer)
+        expected = [HandArchive.encode_hand([CARDS[card] for card in deal[:4]], CARDS[deal[4]], int(score),
+                                            is_crib=True, is_dealer=bool(dealer))
+                    for deal, score, dealer in zip(deals, scores, is_dealer)]
+        self.assertEqual(words.tolist(), expected)
+        columns = HandArchive.unpack_words(words)
+        self.assertTrue((columns.hands == hands).all())
+        self.assertTrue((columns.cuts == cuts).all())
+        self.assertTrue((columns.scores == scores).all())
+        self.assertTrue(columns.is_crib.all())
+        self.assertTrue((columns.is_dealer == is_dealer).all())
+
+    def test_write_and_read(self):
+        """Test hands appended one at a time and as words read back in order"""
+        rng = random.Random(33)
+        deals = [rng.sample(CARDS, 5) for _ in range(300)]
+        with HandArchive.HandArchiveWriter(self.path) as writer:
+            for deal in deals[:100]:
+                writer.append(deal[:4], deal[4])
+            writer.append_words([HandArchive.encode_hand(deal[:4], deal[4], is_dealer=False) for deal in deals[100:]])
+        self.assertEqual(os.path.getsize(self.path), HandArchive._HEADER.size + 8 * 300)
+        with HandArchive.HandArchive(self.path) as archive:
+            self.assertEqual(len(archive), 300)
+            self.assertIsInstance(archive.words, numpy.memmap)
+            for index in (0, 99, 100, 299, -1):
+                deal = deals[index]
+                record = archive[index]
+                self.assertEqual(record.hand, deal[:4])
+                self.assertIs(record.cut, deal[4])
+                self.assertEqual(record.score, Cribbage.score_hand(deal[:4], deal[4], is_dealer=index < 100 and index >= 0))
+            columns = archive.columns(100, 110)
+            self.assertEqual(columns.hands.tolist(), [[card.id for card in deal[:4]] for deal in deals[100:110]])
+            self.assertFalse(columns.is_dealer.any())
+            # A slice decodes each hand in it
+            self.assertEqual([record.hand for record in archive[98:102]], [deal[:4] for deal in deals[98:102]])
+            self.assertEqual(archive[98:102][2], archive[100])
+
+    def test_pack_words_rejects_large_scores(self):
+        """Test pack_words checks its scores fit in 8 bits, as encode_hand does"""
+        with self.assertRaises(ValueError):
+            HandArchive.pack_words([[0, 1, 2, 3], [4, 5, 6, 7]], [8, 9], [12, 300])
+        with self.assertRaises(ValueError):
+            HandArchive.pack_words([[0, 1, 2, 3]], [8], [-1])
+
+    def test_write_archive(self):
+        """Test write_archive and an empty archive"""
+        hands = numpy.array([[4, 17, 30, 10]])
+        self.assertEqual(HandArchive.write_archive(self.path, hands, [43], [29]), 1)
+        with HandArchive.HandArchive(self.path) as archive:
+            self.assertEqual(archive[0].score, 29)
+        HandArchive.write_archive(self.path, numpy.zeros((0, 4), dtype=numpy.uint8), [], [])
+        with HandArchive.HandArchive(self.path) as archive:
+            self.assertEqual(len(archive), 0)
+
+    def test_rejects_other_files(self):
+        """Test files that are not whole hand archives raise ValueError"""
+        with open(self.path, 'wb') as file:
+            file.write(b"not an archive at all")
+        with self.assertRaises(ValueError):
+            HandArchive.HandArchive(self.path)
+        HandArchive.write_archive(self.path, numpy.array([[0, 1, 2, 3]]), [4], [5])
+        with open(self.path, 'ab') as file:
+            file.write(b"\0")
+        with self.assertRaises(ValueError):
+            HandArchive.HandArchive(self.path)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+import unittest
+import sys
+import os
+import random
+import tempfile
+
+# Add project root directory to path to import from DecksAndCards package
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from DecksAndCards.Canonical import canonicalize, canonical_key
+from DecksAndCards.Card import CARDS
+from DecksAndCards.Tests.helpers import cards
+from Cribbage import score_hand
+import HandStrength
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+def average_over_cuts(hand):
+    cuts = [card for card in CARDS if card not in hand]
+    return sum(score_hand(hand, cut, is_dealer=False) for cut in cuts) / len(cuts)
+
+class TestHandStrength(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.index = HandStrength.get_index()
+
+    def test_canonical_hands(self):
+        """Test every 4 card hand is counted once, under its canonical form"""
+        hands = HandStrength.canonical_hands()
+        self.assertEqual(len(hands), 16432)
+        self.assertEqual(sum(weight for _, weight in hands), 270725)
+        self.assertEqual(len(self.index), len(hands))
+        self.assertEqual(self.index.num_hands, 270725)
+        self.assertEqual(list(self.index.keys), sorted(self.index.keys))
+
+    def test_score_chunk_matches_score_hand(self):
+        """Test the points added up over the cuts match scoring each cut"""
+        hands = [(0, 1, 2, 3), (4, 17, 30, 36), (3, 9, 10, 12)]
+        totals = HandStrength._score_chunk(hands)
+        for hand_ids, total in zip(hands, totals):
+            self.assertAlmostEqual(total / 48, average_over_cuts([CARDS[card] for card in hand_ids]))
+
+    def test_expected_value_matches_score_hand(self):
+        """Test the saved expected values match averaging score_hand over the cuts, for any suits"""
+        rng = random.Random(60)
+        for _ in range(50):
+            hand = rng.sample(CARDS, 4)
+            self.assertAlmostEqual(HandStrength.expected_value(hand), average_over_cuts(hand))
+            self.assertEqual(self.index.expected_value(hand), self.index.expected_value(canonicalize(hand)[0]))
+
+    def test_percentile_counts_weaker_hands(self):
+        """Test a percentile is the share of every hand with a lower expected value"""
+        rng = random.Random(61)
+        for _ in range(20):
+            total = self.index.expected_value(rng.sample(CARDS, 4)) * 48
+            below = sum(weight for other, weight in zip(self.index.totals, self.index.weights) if other < total)
+            self.assertAlmostEqual(self.index.percentile_of_total(total), 100 * below / 270725)
+        # 5-5-5-J is the best hand and 2-4-8-K nothing special
+        self.assertGreater(HandStrength.percentile(cards('5H', '5C', '5D', 'JS')), 99.99)
+        self.assertLess(HandStrength.percentile(cards('2C', '4D', '8H', 'KS')), 50)
+        self.assertEqual(self.index.percentile_of_total(0), 0)
+        self.assertEqual(self.index.percentile_of_total(10000), 100)
+
+    def test_rejects_other_hands(self):
+        """Test hands that are not 4 different cards raise ValueError"""
+        for hand in (cards('5H', '5C', '5D'), cards('5H', '5C', '5D', 'JS', 'KS'), cards('5H', '5H', '5D', 'JS')):
+            with self.assertRaises(ValueError):
+                self.index.percentile(hand)
+
+    @unittest.skipIf(numpy is None, "NumPy is not installed")
+    def test_bulk_queries_match_scalar(self):
+        """Test the array queries match looking hands up one at a time"""
+        rng = random.Random(62)
+        hands = [rng.sample(CARDS, 4) for _ in range(500)]
+        hand_ids = numpy.array([[card.id for card in hand] for hand in hands])
+        self.assertEqual(self.index.percentiles(hand_ids).tolist(), [self.index.percentile(hand) for hand in hands])
+        self.assertEqual(HandStrength.percentiles(hand_ids).tolist(), [self.index.percentile(hand) for hand in hands])
+        self.assertEqual(self.index.expected_values(hand_ids).tolist(), [self.index.expected_value(hand) for hand in hands])
+        with self.assertRaises(ValueError):
+            self.index.percentiles(numpy.array([[0, 0, 1, 2]]))
+        with self.assertRaises(ValueError):
+            self.index.percentiles(numpy.array([[0, 1, 2]]))
+
+    @unittest.skipIf(numpy is None, "NumPy is not installed")
+    def test_bulk_queries_reject_unknown_card_ids(self):
+        """Test card ids outside 0-51 raise ValueError rather than IndexError"""
+        for hand in ([0, 1, 2, 52], [-1, 1, 2, 3], [0, 1, 2, 1000]):
+            with self.assertRaises(ValueError):
+                self.index.percentiles(numpy.array([hand]))
+            with self.assertRaises(ValueError):
+                self.index.expected_values(numpy.array([hand]))
+
+    def test_write_and_load_round_trip(self):
+        """Test an index written and loaded again answers the same, and other files are rejected"""
+        # A small index of two canonical hands: 2 hands of total 10 and 6 of total 30
+        keys = [canonical_key(cards('AH', '2H', '3H', '4H')), canonical_key(cards('AH', '2H', '3H', '4D'))]
+        index = HandStrength.StrengthIndex(keys, [10, 30], [2, 6])
+        self.assertEqual(index.percentile(cards('AS', '2S', '3S', '4C')), 25.0)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "strength.bin")
+            HandStrength.write_index(path, index)
+            try:
+                loaded = HandStrength.load_index(path)
+                self.assertIs(HandStrength.get_index(), loaded)
+                self.assertEqual((list(loaded.keys), list(loaded.totals), list(loaded.weights)), (keys, [10, 30], [2, 6]))
+                self.assertEqual(loaded.percentile(cards('AS', '2S', '3S', '4C')), 25.0)
+                self.assertEqual(loaded.percentile(cards('AD', '2D', '3D', '4D')), 0.0)
+                with open(path, 'wb') as file:
+                    file.write(b"not an index" * 10)
+                with self.assertRaises(ValueError):
+                    HandStrength.load_index(path)
+            finally:
+                HandStrength.load_index()
+
+if __name__ == '__main__':
+    unittest.main()
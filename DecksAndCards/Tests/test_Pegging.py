@@ -0,0 +1,130 @@
+import unittest
+import sys
+import os
+import random
+
+# Add project root directory to path to import from DecksAndCards package
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from DecksAndCards.Card import Card, Suits, Values, CARDS
+from Pegging import PlayState
+
+def reference_points(pile):
+    """Scores the last card of a pile by looking back over the whole pile"""
+    count = sum(card.pip for card in pile)
+    points = 2 if count in (15, 31) else 0
+    same_rank = 1
+    while same_rank < len(pile) and pile[-1 - same_rank].rank == pile[-1].rank:
+        same_rank += 1
+    points += same_rank * (same_rank - 1)
+    for length in range(len(pile), 2, -1):
+        ranks = [card.rank for card in pile[-length:]]
+        if len(set(ranks)) == length and max(ranks) - min(ranks) == length - 1:
+            points += length
+            break
+    return points
+
+def play_all(cards):
+    """Plays the cards in order and returns the points for each"""
+    state = PlayState()
+    return [state.play(card) for card in cards]
+
+class TestPegging(unittest.TestCase):
+    def test_fifteen(self):
+        """Test 10, 5 scores 2 for the 15"""
+        self.assertEqual(play_all([Card(Values.TEN, Suits.HEARTS), Card(Values.FIVE, Suits.CLUBS)]), [0, 2])
+
+    def test_thirty_one_resets_count(self):
+        """Test K, Q, 8, 3 scores 2 for 31 and the count starts again"""
+        state = PlayState()
+        points = [state.play(card) for card in [Card(Values.KING, Suits.HEARTS), Card(Values.QUEEN, Suits.CLUBS),
+                                                Card(Values.EIGHT, Suits.SPADES), Card(Values.THREE, Suits.HEARTS)]]
+        self.assertEqual(points, [0, 0, 0, 2])
+        self.assertEqual(state.count, 0)
+        self.assertEqual(state.go(), 0)
+
+    def test_pair_trips_and_quads(self):
+        """Test 4 sevens in a row score 2, 6 and 12"""
+        sevens = [Card(Values.SEVEN, suit) for suit in Suits]
+        self.assertEqual(play_all(sevens), [0, 2, 6, 12])
+
+    def test_pair_broken_by_other_card(self):
+        """Test 6, 2, 6 is not a pair"""
+        self.assertEqual(play_all([Card(Values.SIX, Suits.HEARTS), Card(Values.TWO, Suits.CLUBS),
+                                   Card(Values.SIX, Suits.SPADES)]), [0, 0, 0])
+
+    def test_pair_royal_making_fifteen(self):
+        """Test 5, 5, 5 scores a pair, then a pair royal and 15"""
+        fives = [Card(Values.FIVE, suit) for suit in (Suits.HEARTS, Suits.CLUBS, Suits.SPADES)]
+        self.assertEqual(play_all(fives), [0, 2, 8])
+
+    def test_run_out_of_order(self):
+        """Test 4, 6, 5 is a run of 3 (and 15), and 3 more makes a run of 4"""
+        cards = [Card(Values.FOUR, Suits.HEARTS), Card(Values.SIX, Suits.CLUBS),
+                 Card(Values.FIVE, Suits.SPADES), Card(Values.THREE, Suits.DIAMONDS)]
+        self.assertEqual(play_all(cards), [0, 0, 5, 4])
+
+    def test_run_broken_by_repeat(self):
+        """Test 4, 4, 5, 6 only scores the run of the top 3"""
+        cards = [Card(Values.FOUR, Suits.HEARTS), Card(Values.FOUR, Suits.CLUBS),
+                 Card(Values.FIVE, Suits.SPADES), Card(Values.SIX, Suits.SPADES)]
+        self.assertEqual(play_all(cards), [0, 2, 0, 3])
+
+    def test_run_of_face_cards(self):
+        """Test J, K, Q is a run; K, A, 2 is not (aces are low)"""
+        self.assertEqual(play_all([Card(Values.JACK, Suits.HEARTS), Card(Values.KING, Suits.CLUBS),
+                                   Card(Values.QUEEN, Suits.SPADES)]), [0, 0, 3])
+        self.assertEqual(play_all([Card(Values.KING, Suits.HEARTS), Card(Values.ACE, Suits.CLUBS),
+                                   Card(Values.TWO, Suits.SPADES)]), [0, 0, 0])
+
+    def test_go_and_last_card(self):
+        """Test go scores 1 and starts a new count, and scores nothing on an empty count"""
+        state = PlayState()
+        state.play(Card(Values.KING, Suits.HEARTS))
+        state.play(Card(Values.QUEEN, Suits.HEARTS))
+        self.assertEqual(state.go(), 1)
+        self.assertEqual(state.count, 0)
+        self.assertEqual(state.go(), 0)
+        # Runs and pairs do not carry over into the new count
+        self.assertEqual(state.play(Card(Values.QUEEN, Suits.CLUBS)), 0)
+
+    def test_cannot_go_over_thirty_one(self):
+        """Test playing past 31 raises ValueError and leaves the state unchanged"""
+        state = PlayState()
+        for card in [Card(Values.KING, Suits.HEARTS), Card(Values.QUEEN, Suits.HEARTS), Card(Values.NINE, Suits.HEARTS)]:
+            state.play(card)
+        self.assertFalse(state.can_play(Card(Values.THREE, Suits.CLUBS)))
+        with self.assertRaises(ValueError):
+            state.play(Card(Values.THREE, Suits.CLUBS))
+        self.assertEqual(state.count, 29)
+
+    def test_points_if_played_does_not_change_state(self):
+        """Test previewing a play matches playing it, and copies are independent"""
+        state = PlayState()
+        state.play(Card(Values.FOUR, Suits.HEARTS))
+        state.play(Card(Values.SIX, Suits.HEARTS))
+        preview = state.points_if_played(Card(Values.FIVE, Suits.HEARTS))
+        copy = state.copy()
+        self.assertEqual(copy.play(Card(Values.FIVE, Suits.HEARTS)), preview)
+        self.assertEqual(state.count, 10)
+        self.assertEqual(state.play(Card(Values.FIVE, Suits.HEARTS)), preview)
+
+    def test_matches_scanning_the_pile(self):
+        """Test incremental scoring matches looking back over the whole pile for random plays"""
+        rng = random.Random(8)
+        for _ in range(2000):
+            deck = list(CARDS)
+            rng.shuffle(deck)
+            state = PlayState()
+            pile = []
+            for card in deck:
+                if not state.can_play(card):
+                    break
+                pile.append(card)
+                self.assertEqual(state.play(card), reference_points(pile))
+                if state.count == 0:
+                    pile = []
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,198 @@
+import unittest
+import sys
+import os
+import random
+import tempfile
+
+# Add project root directory to path to import from DecksAndCards package
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from DecksAndCards.Card import CARDS
+from DecksAndCards import Dealer
+from DecksAndCards.Tests.helpers import cards
+import Cribbage
+from DecksAndCards import Rules
+import ScoreTable
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Hands of 3 and a crib of 2, small enough to build tables for in a test
+SMALL = Rules.STANDARD._replace(name="small", cards_dealt=4, discards=1)
+
+class TestRules(unittest.TestCase):
+    def test_variant_sizes(self):
+        """Test the hand, crib and deal sizes of each variant"""
+        sizes = {rules.name: (rules.hand_size, rules.crib_size, rules.cards_per_deal) for rules in Rules.VARIANTS.values()}
+        self.assertEqual(sizes, {"six-card": (4, 4, 13), "five-card": (3, 4, 11), "three-player": (4, 4, 17)})
+        for rules in Rules.VARIANTS.values():
+            self.assertIs(Rules.validate(rules), rules)
+
+    def test_validate(self):
+        """Test unplayable rules raise ValueError"""
+        for rules in (Rules.STANDARD._replace(players=1), Rules.STANDARD._replace(discards=6),
+                      Rules.STANDARD._replace(players=4, cards_dealt=13)):
+            with self.assertRaises(ValueError):
+                Rules.validate(rules)
+
+    def test_table_key(self):
+        """Test the table key only changes with rules that change the tables"""
+        key = Rules.table_key(Rules.STANDARD)
+        self.assertEqual(Rules.table_key(Rules.STANDARD._replace(name="other", nibs_points=0, winning_score=61)), key)
+        self.assertEqual(Rules.table_key(Rules.THREE_PLAYER), key)
+        self.assertNotEqual(Rules.table_key(Rules.FIVE_CARD), key)
+        self.assertNotEqual(Rules.table_key(Rules.STANDARD._replace(hand_flush_needs_cut=True)), key)
+        self.assertEqual(len(key), 12)
+
+class TestVariantScoring(unittest.TestCase):
+    def test_standard_rules_match_default(self):
+        """Test scoring with the standard rules gives the same scores as without rules"""
+        rng = random.Random(50)
+        for _ in range(1000):
+            deal = rng.sample(CARDS, 5)
+            for is_crib, is_dealer in ((False, True), (False, False), (True, True)):
+                self.assertEqual(Cribbage.score_hand(deal[:4], deal[4], is_crib, is_dealer, rules=Rules.STANDARD),
+                                 Cribbage.score_hand(deal[:4], deal[4], is_crib, is_dealer))
+
+    def test_five_card_flushes(self):
+        """Test a 3 card hand flushes for 3, or 4 with the cut, and its 4 card crib only with the cut"""
+        hand = cards('2H', '6H', '10H')
+        self.assertEqual(Cribbage.score_hand(hand, cards('KS')[0], rules=Rules.FIVE_CARD), 3)
+        self.assertEqual(Cribbage.score_hand(hand, cards('KH')[0], rules=Rules.FIVE_CARD), 4)
+        crib = cards('2H', '6H', '10H', 'QH')
+        self.assertEqual(Cribbage.score_hand(crib, cards('KS')[0], is_crib=True, rules=Rules.FIVE_CARD), 0)
+        self.assertEqual(Cribbage.score_hand(crib, cards('KH')[0], is_crib=True, rules=Rules.FIVE_CARD), 5)
+
+    def test_flush_and_nibs_rules(self):
+        """Test hands that need the cut for a flush, and variants without nibs"""
+        strict = Rules.STANDARD._replace(hand_flush_needs_cut=True, nibs_points=0)
+        self.assertEqual(Cribbage.score_hand(cards('2H', '6H', '10H', 'QH'), cards('KS')[0], rules=strict), 0)
+        self.assertEqual(Cribbage.score_hand(cards('2H', '6H', '10H', 'QH'), cards('KH')[0], rules=strict), 5)
+        # A jack cut scores nibs for the dealer only when the rules give points for it
+        self.assertEqual(Cribbage.score_hand(cards('AS', '2D', '7C', '9H'), cards('JH')[0], rules=strict), 0)
+        self.assertEqual(Cribbage.score_hand(cards('AS', '2D', '7C', '9H'), cards('JH')[0], rules=Rules.FIVE_CARD), 2)
+
+    def test_breakdown_matches_score_hand(self):
+        """Test score_breakdown with rules adds up to score_hand with the same rules"""
+        rng = random.Random(51)
+        strict = Rules.FIVE_CARD._replace(hand_flush_needs_cut=True, nibs_points=1)
+        for _ in range(1000):
+            deal = rng.sample(CARDS, 5)
+            for rules, size in ((Rules.FIVE_CARD, 3), (strict, 3), (strict, 4)):
+                breakdown = Cribbage.score_breakdown(deal[:size], deal[4], rules=rules)
+                self.assertEqual(breakdown.total, Cribbage.score_hand(deal[:size], deal[4], rules=rules))
+
+    @unittest.skipIf(numpy is None, "NumPy is not installed")
+    def test_batch_matches_scalar(self):
+        """Test the batch scorer follows the rules like score_hand"""
+        rng = random.Random(52)
+        strict = Rules.FIVE_CARD._replace(hand_flush_needs_cut=True, crib_flush_needs_cut=False, nibs_points=1)
+        # Suited deals so flushes come up often
+        deals = [rng.sample(CARDS[:13], 4) + [rng.choice(CARDS)] for _ in range(300)]
+        deals += [rng.sample(CARDS, 5) for _ in range(300)]
+        deals = [deal for deal in deals if deal[4] not in deal[:4]]
+        for rules in (Rules.FIVE_CARD, strict):
+            for size in (3, 4):
+                hands = numpy.array([[card.id for card in deal[:size]] for deal in deals])
+                cuts = numpy.array([deal[4].id for deal in deals])
+                for is_crib, is_dealer in ((False, True), (True, True)):
+                    expected = [Cribbage.score_hand(deal[:size], deal[4], is_crib, is_dealer, rules=rules) for deal in deals]
+                    scores = Cribbage.score_hands(hands, cuts, is_crib=is_crib, is_dealer=is_dealer, rules=rules)
+                    self.assertEqual(scores.tolist(), expected)
+
+class TestVariantTables(unittest.TestCase):
+    def tearDown(self):
+        Cribbage.disable_score_tables()
+
+    def test_interrupted_build_leaves_no_tables(self):
+        """Test a build that stops partway leaves no table for variant_tables to take as finished"""
+        score_block = ScoreTable.score_block
+        blocks = []
+
+        def failing_score_block(*args):
+            blocks.append(args)
+            if len(blocks) == 5:
+                raise KeyboardInterrupt
+            return score_block(*args)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = ScoreTable.variant_directory(directory, SMALL)
+            ScoreTable.score_block = failing_score_block
+            try:
+                with self.assertRaises(KeyboardInterrupt):
+                    ScoreTable.variant_tables(directory, SMALL)
+            finally:
+                ScoreTable.score_block = score_block
+            for name in (ScoreTable.HAND_TABLE_NAME, ScoreTable.CRIB_TABLE_NAME):
+                self.assertFalse(os.path.exists(os.path.join(path, name)))
+            # The next call builds the tables in full
+            hand_table, crib_table = ScoreTable.load_tables(ScoreTable.variant_tables(directory, SMALL))
+            hand_table.close()
+            crib_table.close()
+
+    def test_tables_built_once_per_variant(self):
+        """Test a variant's tables are built under its key, found again, and used by score_hand"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = ScoreTable.variant_tables(directory, SMALL)
+            self.assertEqual(path, os.path.join(directory, Rules.table_key(SMALL)))
+            hand_path = os.path.join(path, ScoreTable.HAND_TABLE_NAME)
+            built = os.path.getmtime(hand_path)
+            self.assertEqual(ScoreTable.variant_tables(directory, SMALL), path)
+            self.assertEqual(os.path.getmtime(hand_path), built)
+
+            hand_table, crib_table = ScoreTable.load_tables(path)
+            self.assertEqual((hand_table.num_cards, crib_table.num_cards), (3, 2))
+            self.assertEqual(hand_table.table_key, Rules.table_key(SMALL))
+            rng = random.Random(53)
+            deals = [rng.sample(CARDS, 4) for _ in range(300)]
+            try:
+                for deal in deals:
+                    self.assertEqual(hand_table.lookup(deal[:3], deal[3]),
+                                     Cribbage.score_hand(deal[:3], deal[3], is_dealer=False, rules=SMALL))
+                    self.assertEqual(crib_table.lookup(deal[:2], deal[3]),
+                                     Cribbage.score_hand(deal[:2], deal[3], is_crib=True, rules=SMALL))
+            finally:
+                hand_table.close()
+                crib_table.close()
+
+            default = Cribbage.score_hand(cards('AH', '2H', '3H'), cards('JH')[0])
+            Cribbage.enable_score_tables(path)
+            self.assertEqual([Cribbage.score_hand(deal[:3], deal[3], rules=SMALL) for deal in deals],
+                             [Cribbage.score_breakdown(deal[:3], deal[3], rules=SMALL).total for deal in deals])
+            # 2 for 2-3-J, 3 for the run, 4 for the flush and 2 for nibs
+            jacks = cards('AH', '2H', '3H')
+            self.assertEqual(Cribbage.score_hand(jacks, cards('JH')[0], rules=SMALL), 11)
+            # The tables are only used for the rules they were built for
+            self.assertEqual(Cribbage.score_hand(jacks, cards('JH')[0]), default)
+
+    def test_standard_tables_stay_in_directory(self):
+        """Test the standard rules' tables go straight in the directory"""
+        self.assertEqual(ScoreTable.variant_directory("tables", Rules.STANDARD), "tables")
+        self.assertEqual(ScoreTable.variant_directory("tables", Rules.THREE_PLAYER), "tables")
+        self.assertNotEqual(ScoreTable.variant_directory("tables", Rules.FIVE_CARD), "tables")
+
+@unittest.skipIf(numpy is None, "NumPy is not installed")
+class TestVariantDealing(unittest.TestCase):
+    def test_three_player_deals(self):
+        """Test three player deals give three hands of 5, a crib card and a cut, all different"""
+        deals = Dealer.deal(1000, seed=5, rules=Rules.THREE_PLAYER)
+        self.assertEqual(deals.hands.shape, (1000, 3, 5))
+        self.assertEqual(deals.crib_cards.shape, (1000, 1))
+        self.assertEqual(deals.cuts.shape, (1000,))
+        dealt = numpy.concatenate([deals.hands.reshape(1000, 15), deals.crib_cards, deals.cuts[:, None]], axis=1)
+        self.assertTrue(all(len(set(row)) == 17 for row in dealt.tolist()))
+
+    def test_standard_deals_unchanged(self):
+        """Test the standard rules deal exactly what dealing without rules does"""
+        plain = Dealer.deal(500, seed=6)
+        standard = Dealer.deal(500, seed=6, rules=Rules.STANDARD)
+        self.assertTrue((plain.hands == standard.hands).all())
+        self.assertTrue((plain.cuts == standard.cuts).all())
+        self.assertEqual(standard.crib_cards.shape, (500, 0))
+        self.assertEqual(Dealer.deal(10, rules=Rules.FIVE_CARD).hands.shape, (10, 2, 5))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import unittest
+import sys
+import os
+import io
+import json
+import random
+
+# Add project root directory to path to import from DecksAndCards package
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from DecksAndCards.Card import CARDS
+import ScorePipeline
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+def run(text, input_format, **kwargs):
+    """Scores text with score_stream and returns the output text"""
+    outfile = io.StringIO()
+    ScorePipeline.score_stream(io.StringIO(text), outfile, input_format, **kwargs)
+    return outfile.getvalue()
+
+def random_csv(num_lines, seed):
+    rng = random.Random(seed)
+    lines = []
+    for _ in range(num_lines):
+        cards = rng.sample(CARDS, 5)
+        fields = []
+        for card in cards:
+            token = card.short_print()
+            fields.extend([token[:-1], token[-1]])
+        fields.append(rng.choice(["hand", "crib"]))
+        lines.append(",".join(fields) + "\n")
+    return "".join(lines)
+
+class TestScorePipeline(unittest.TestCase):
+    def test_csv_scores(self):
+        """Test CSV rows get a score column, with the crib flush rule for crib rows"""
+        text = ("5,H,5,C,5,D,J,S,5,S\n"
+                "2,H,4,H,6,H,8,H,KING,CLUBS,hand\n"
+                "2,H,4,H,6,H,8,H,KING,CLUBS,crib\n")
+        output = run(text, "csv", use_batch=False)
+        self.assertEqual(output, "5,H,5,C,5,D,J,S,5,S,29\n"
+                                 "2,H,4,H,6,H,8,H,KING,CLUBS,hand,4\n"
+                                 "2,H,4,H,6,H,8,H,KING,CLUBS,crib,0\n")
+
+    def test_csv_header_and_blank_lines(self):
+        """Test a header row is kept with a score column and blank lines are dropped"""
+        text = "value,suit,value,suit,value,suit,value,suit,cut value,cut suit\n\n5,H,5,C,5,D,J,S,5,S\n"
+        output = run(text, "csv", use_batch=False)
+        self.assertEqual(output.splitlines(), ["value,suit,value,suit,value,suit,value,suit,cut value,cut suit,score",
+                                               "5,H,5,C,5,D,J,S,5,S,29"])
+
+    def test_ndjson_scores(self):
+        """Test NDJSON records accept short tokens and [value, suit] pairs"""
+        text = ('{"hand": ["5H", "5C", "5D", "JS"], "cut": "5S"}\n'
+                '{"hand": [["2", "H"], ["4", "H"], ["6", "H"], ["8", "H"]], "cut": "KC", "crib": true}\n')
+        records = [json.loads(line) for line in run(text, "ndjson", use_batch=False).splitlines()]
+        self.assertEqual([record["score"] for record in records], [29, 0])
+        self.assertEqual(records[1]["crib"], True)
+
+    def test_ndjson_dealer_and_crib_nibs(self):
+        """Test nibs only counts for the dealer's hand, not the pone's hand or the crib"""
+        hand = '"hand": ["2H", "3C", "4D", "6S"], "cut": "JC"'
+        text = ("{" + hand + "}\n"
+                "{" + hand + ', "dealer": false}\n'
+                "{" + hand + ', "crib": true}\n')
+        records = [json.loads(line) for line in run(text, "ndjson", use_batch=False).splitlines()]
+        self.assertEqual([record["score"] for record in records], [9, 7, 7])
+        if numpy is not None:
+            self.assertEqual(run(text, "ndjson", use_batch=True), run(text, "ndjson", use_batch=False))
+
+    def test_errors_name_the_line(self):
+        """Test a bad record raises a ValueError with its line number"""
+        text = "5,H,5,C,5,D,J,S,5,S\n5,H,5,C,5,D,J,S,5,X\n"
+        with self.assertRaisesRegex(ValueError, "Line 2: Invalid suit"):
+            run(text, "csv", use_batch=False)
+        with self.assertRaisesRegex(ValueError, "Line 1: Expected 4 hand cards"):
+            run('{"hand": ["5H"], "cut": "5S"}\n', "ndjson", use_batch=False)
+
+    def test_chunks_keep_line_numbers(self):
+        """Test line numbers carry across chunks and past a header"""
+        text = "VALUE,SUIT\n" + "5,H,5,C,5,D,J,S,5,S\n" * 4 + "bad\n"
+        with self.assertRaisesRegex(ValueError, "Line 6:"):
+            run(text, "csv", chunk_size=2, use_batch=False)
+
+    @unittest.skipIf(numpy is None, "NumPy is not installed")
+    def test_batch_matches_scalar(self):
+        """Test the NumPy batch scorer gives the same output as scoring one hand at a time"""
+        text = random_csv(2000, seed=9)
+        self.assertEqual(run(text, "csv", chunk_size=300, use_batch=True),
+                         run(text, "csv", chunk_size=300, use_batch=False))
+
+    def test_workers_keep_order(self):
+        """Test scoring in worker processes writes the same output in the same order"""
+        text = random_csv(500, seed=10)
+        self.assertEqual(run(text, "csv", chunk_size=50, workers=2, use_batch=False),
+                         run(text, "csv", chunk_size=50, use_batch=False))
+
+if __name__ == '__main__':
+    unittest.main()
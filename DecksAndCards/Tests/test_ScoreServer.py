@@ -0,0 +1,224 @@
+import unittest
+import sys
+import os
+import asyncio
+import gc
+import json
+import random
+import tempfile
+
+# Add project root directory to path to import from DecksAndCards package
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from DecksAndCards.Card import CARDS
+import Cribbage
+import ScoreServer
+
+def _token(card):
+    return f"{card.value.value[2]}{card.suit.value[2]}"
+
+def _request(cards, flag=""):
+    return f"{' '.join(_token(card) for card in cards[:4])} / {_token(cards[4])} {flag}".strip()
+
+class TestParseRequest(unittest.TestCase):
+    def test_parse(self):
+        """Test a request line gives the hand, cut and flags"""
+        hand, cut_card, is_crib, is_dealer = ScoreServer.parse_request("5H 5C 5D JS / 5S")
+        self.assertEqual(Cribbage.score_hand(hand, cut_card, is_crib, is_dealer), 29)
+        self.assertEqual(ScoreServer.parse_request("5H 5C 5D JS / 5S crib")[2:], (True, True))
+        self.assertEqual(ScoreServer.parse_request("5H 5C 5D JS / 5S pone")[2:], (False, False))
+
+    def test_invalid_requests(self):
+        """Test malformed lines raise ValueError"""
+        for line in ("5H 5C 5D JS 5S", "5H 5C 5D / 5S", "5H 5C 5D JS / 5S XX", "5H 5C 5D JS /",
+                     "5H 5C 5D 1S / 5S", "5H 5C 5D 5H / 5S"):
+            with self.subTest(line=line):
+                with self.assertRaises(ValueError):
+                    ScoreServer.parse_request(line)
+
+class TestScoreServer(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.batcher = ScoreServer.ScoreBatcher(max_batch_size=32, max_delay=0.005)
+        await self.batcher.start()
+        self.server = await ScoreServer.start_server(self.batcher, port=0)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def asyncTearDown(self):
+        self.server.close()
+        await self.server.wait_closed()
+        await self.batcher.close()
+
+    async def _ask(self, lines):
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.port)
+        writer.write("".join(line + "\n" for line in lines).encode())
+        await writer.drain()
+        replies = [(await reader.readline()).decode().strip() for _ in lines]
+        writer.close()
+        await writer.wait_closed()
+        return replies
+
+    async def test_concurrent_clients_are_batched(self):
+        """Test requests from many connections are scored correctly and together"""
+        rng = random.Random(20)
+        deals = [rng.sample(CARDS, 5) for _ in range(64)]
+        replies = await asyncio.gather(*(self._ask([_request(deal)]) for deal in deals))
+        self.assertEqual([int(reply[0]) for reply in replies],
+                         [Cribbage.score_hand(deal[:4], deal[4]) for deal in deals])
+        self.assertEqual(self.batcher.requests, 64)
+        self.assertLess(self.batcher.batches, 64)
+        self.assertLessEqual(max(self.batcher._batch_sizes), 32)
+
+    async def test_pipelined_replies_keep_order(self):
+        """Test many lines from one connection are answered in order, with errors in place"""
+        rng = random.Random(21)
+        deals = [rng.sample(CARDS, 5) for _ in range(300)]
+        flags = ["", "crib", "pone"]
+        lines = [_request(deal, flags[i % 3]) for i, deal in enumerate(deals)]
+        lines.insert(10, "not a hand")
+        replies = await self._ask(lines)
+        self.assertTrue(replies.pop(10).startswith("error:"))
+        expected = [Cribbage.score_hand(deal[:4], deal[4], is_crib=i % 3 == 1, is_dealer=i % 3 != 2)
+                    for i, deal in enumerate(deals)]
+        self.assertEqual([int(reply) for reply in replies], expected)
+
+    async def test_stats(self):
+        """Test the stats line reports requests, batches and latency percentiles"""
+        await self._ask(["5H 5C 5D JS / 5S"] * 5)
+        stats = json.loads((await self._ask(["stats"]))[0])
+        self.assertEqual(stats["requests"], 5)
+        self.assertGreaterEqual(stats["batches"], 1)
+        self.assertLessEqual(stats["p50_ms"], stats["p99_ms"])
+        self.assertIn("batch_p99_ms", stats)
+
+class TestScoreBatcher(unittest.IsolatedAsyncioTestCase):
+    async def test_backpressure(self):
+        """Test that callers wait for room once max_pending requests are queued, and all finish"""
+        batcher = ScoreServer.ScoreBatcher(max_batch_size=4, max_delay=0.001, max_pending=8, use_batch=False)
+        await batcher.start()
+        try:
+            rng = random.Random(22)
+            deals = [rng.sample(CARDS, 5) for _ in range(100)]
+            tasks = [asyncio.ensure_future(batcher.score(deal[:4], deal[4])) for deal in deals]
+            await asyncio.sleep(0)
+            self.assertLessEqual(batcher._queue.qsize(), 8)
+            scores = await asyncio.gather(*tasks)
+        finally:
+            await batcher.close()
+        self.assertEqual(scores, [Cribbage.score_hand(deal[:4], deal[4]) for deal in deals])
+        self.assertGreaterEqual(batcher.batches, 25)
+
+    async def test_numpy_batches_match(self):
+        """Test batches big enough for the NumPy scorer give the same scores"""
+        try:
+            import numpy
+        except ImportError:
+            self.skipTest("NumPy is not installed")
+        batcher = ScoreServer.ScoreBatcher(max_batch_size=256, max_delay=0.05, use_batch=True)
+        await batcher.start()
+        try:
+            rng = random.Random(23)
+            deals = [rng.sample(CARDS, 5) for _ in range(200)]
+            scores = await asyncio.gather(*(batcher.score(deal[:4], deal[4], is_crib=True) for deal in deals))
+        finally:
+            await batcher.close()
+        self.assertEqual(scores, [Cribbage.score_hand(deal[:4], deal[4], is_crib=True) for deal in deals])
+        self.assertEqual(batcher.batches, 1)
+
+    async def test_close_fails_batch_in_flight(self):
+        """Test closing fails the requests in the batch being collected, and later requests"""
+        # The batch waits a long time for more requests, so it is still being collected at close
+        batcher = ScoreServer.ScoreBatcher(max_batch_size=100, max_delay=60, use_batch=False)
+        await batcher.start()
+        rng = random.Random(24)
+        deals = [rng.sample(CARDS, 5) for _ in range(3)]
+        tasks = [asyncio.ensure_future(batcher.score(deal[:4], deal[4])) for deal in deals]
+        for _ in range(5):
+            await asyncio.sleep(0)
+        self.assertEqual(len(batcher._batch), 3)
+        await batcher.close()
+        results = await asyncio.wait_for(asyncio.gather(*tasks, return_exceptions=True), 1)
+        self.assertTrue(all(isinstance(result, ConnectionError) for result in results))
+        with self.assertRaises(ConnectionError):
+            await batcher.score(deals[0][:4], deals[0][4])
+
+    async def test_close_fails_callers_waiting_for_room(self):
+        """Test callers blocked on a full queue fail when the batcher closes"""
+        batcher = ScoreServer.ScoreBatcher(max_pending=2, use_batch=False)
+        await batcher.start()
+        # Stop taking requests off the queue, so it fills up
+        batcher._task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await batcher._task
+        rng = random.Random(25)
+        deals = [rng.sample(CARDS, 5) for _ in range(6)]
+        tasks = [asyncio.ensure_future(batcher.score(deal[:4], deal[4])) for deal in deals]
+        for _ in range(5):
+            await asyncio.sleep(0)
+        self.assertEqual(batcher._queue.qsize(), 2)
+        await batcher.close()
+        results = await asyncio.wait_for(asyncio.gather(*tasks, return_exceptions=True), 1)
+        self.assertTrue(all(isinstance(result, ConnectionError) for result in results))
+
+    async def test_close_racing_a_put_leaves_nothing_behind(self):
+        """Test close landing just as a waiting caller gets room leaves no unretrieved errors or pending tasks"""
+        loop = asyncio.get_running_loop()
+        reported = []
+        loop.set_exception_handler(lambda loop, context: reported.append(context["message"]))
+        rng = random.Random(26)
+        # Room is made, then close runs after the waiting put has had this many turns of the loop
+        for turns in range(4):
+            batcher = ScoreServer.ScoreBatcher(max_pending=1, use_batch=False)
+            await batcher.start()
+            batcher._task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await batcher._task
+            deals = [rng.sample(CARDS, 5) for _ in range(3)]
+            tasks = [asyncio.ensure_future(batcher.score(deal[:4], deal[4])) for deal in deals]
+            for _ in range(5):
+                await asyncio.sleep(0)
+            _, future, _ = batcher._queue.get_nowait()
+            future.set_result(0)
+            for _ in range(turns):
+                await asyncio.sleep(0)
+            await batcher.close()
+            results = await asyncio.wait_for(asyncio.gather(*tasks, return_exceptions=True), 1)
+            self.assertEqual(results[0], 0)
+            self.assertTrue(all(isinstance(result, ConnectionError) for result in results[1:]))
+            self.assertEqual(asyncio.all_tasks(), {asyncio.current_task()})
+            del tasks, future
+            gc.collect()
+        self.assertEqual(reported, [])
+
+    async def test_failed_batch_keeps_batcher_running(self):
+        """Test an error scoring a batch fails only that batch's requests"""
+        batcher = ScoreServer.ScoreBatcher(max_batch_size=1, max_delay=0, use_batch=False)
+        await batcher.start()
+        try:
+            with self.assertRaises(Exception):
+                await asyncio.wait_for(batcher.score(None, None), 1)
+            self.assertEqual(await asyncio.wait_for(batcher.score(*ScoreServer.parse_request("5H 5C 5D JS / 5S")[:2]), 1), 29)
+        finally:
+            await batcher.close()
+
+    @unittest.skipIf(not hasattr(asyncio, "start_unix_server"), "Unix sockets are not available")
+    async def test_unix_socket(self):
+        """Test serving over a Unix socket"""
+        batcher = ScoreServer.ScoreBatcher()
+        await batcher.start()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "score.sock")
+            server = await ScoreServer.start_server(batcher, path=path)
+            try:
+                reader, writer = await asyncio.open_unix_connection(path)
+                writer.write(b"5H 5C 5D JS / 5S\n")
+                self.assertEqual(await reader.readline(), b"29\n")
+                writer.close()
+                await writer.wait_closed()
+            finally:
+                server.close()
+                await server.wait_closed()
+                await batcher.close()
+
+if __name__ == '__main__':
+    unittest.main()
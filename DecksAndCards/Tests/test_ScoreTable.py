@@ -0,0 +1,163 @@
+import unittest
+import sys
+import os
+import itertools
+import tempfile
+
+# Add project root directory to path to import from DecksAndCards package
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from DecksAndCards.Card import Card, Suits, Values, card_id, card_from_id
+import Cribbage
+import ScoreTable
+
+# Only hands made from the lowest card ids are built, which keeps the tests fast
+SMALL_TOP = 8
+
+def write_small_tables(directory):
+    """Writes full-size tables where only hands with every card id below SMALL_TOP are filled in"""
+    hand_path = os.path.join(directory, ScoreTable.HAND_TABLE_NAME)
+    crib_path = os.path.join(directory, ScoreTable.CRIB_TABLE_NAME)
+    with open(hand_path, 'wb') as hand_file, open(crib_path, 'wb') as crib_file:
+        ScoreTable.write_header(hand_file, is_crib=False)
+        ScoreTable.write_header(crib_file, is_crib=True)
+        for top in range(3, SMALL_TOP):
+            hand_scores, crib_scores = ScoreTable.score_block(top)
+            hand_file.write(hand_scores)
+            crib_file.write(crib_scores)
+        size = ScoreTable._HEADER.size + ScoreTable.TABLE_SIZE
+        hand_file.truncate(size)
+        crib_file.truncate(size)
+
+class TestScoreTable(unittest.TestCase):
+    def test_card_id_round_trip(self):
+        """Test card_id gives every card in the deck a distinct id that card_from_id reverses"""
+        ids = set()
+        for suit in Suits:
+            for value in Values:
+                card = card_from_id(card_id(Card(value, suit)))
+                self.assertEqual((card.value, card.suit), (value, suit))
+                ids.add(card_id(card))
+        self.assertEqual(ids, set(range(52)))
+
+    def test_table_index_is_unique_and_dense(self):
+        """Test every small hand and cut maps to its own entry, with no gaps"""
+        indexes = set()
+        for ids in itertools.combinations(range(SMALL_TOP), 4):
+            hand = [card_from_id(i) for i in ids]
+            for cut in range(52):
+                if cut not in ids:
+                    indexes.add(ScoreTable.table_index(hand, card_from_id(cut)))
+        expected_count = len(list(itertools.combinations(range(SMALL_TOP), 4))) * ScoreTable.CUTS_PER_HAND
+        self.assertEqual(indexes, set(range(expected_count)))
+
+    def test_table_index_ignores_hand_order(self):
+        """Test the index does not depend on the order of the cards in the hand"""
+        hand = [card_from_id(i) for i in (40, 3, 17, 29)]
+        cut = card_from_id(51)
+        index = ScoreTable.table_index(hand, cut)
+        for order in itertools.permutations(hand):
+            self.assertEqual(ScoreTable.table_index(list(order), cut), index)
+
+    def test_table_index_rejects_uncovered_hands(self):
+        """Test hands the table cannot hold return None"""
+        hand = [card_from_id(i) for i in (0, 1, 2, 3)]
+        self.assertIsNone(ScoreTable.table_index(hand, None))
+        self.assertIsNone(ScoreTable.table_index(hand[:3], card_from_id(10)))
+        self.assertIsNone(ScoreTable.table_index(hand, card_from_id(2)))
+        self.assertIsNone(ScoreTable.table_index([hand[0]] * 2 + hand[2:], card_from_id(10)))
+
+    def test_lookup_matches_score_hand(self):
+        """Test looked up hand and crib scores match the scoring functions"""
+        with tempfile.TemporaryDirectory() as directory:
+            write_small_tables(directory)
+            hand_table, crib_table = ScoreTable.load_tables(directory)
+            try:
+                for ids in itertools.combinations(range(SMALL_TOP), 4):
+                    hand = [card_from_id(i) for i in ids]
+                    for cut in range(52):
+                        if cut in ids:
+                            continue
+                        cut_card = card_from_id(cut)
+                        # The tables leave out nibs
+                        self.assertEqual(hand_table.lookup(hand, cut_card),
+                                         Cribbage.score_hand(hand, cut_card, is_dealer=False))
+                        self.assertEqual(crib_table.lookup(hand, cut_card),
+                                         Cribbage.score_hand(hand, cut_card, is_crib=True))
+            finally:
+                hand_table.close()
+                crib_table.close()
+
+    def test_score_hand_uses_enabled_tables(self):
+        """Test score_hand reads from the tables once enabled and falls back for other hands"""
+        with tempfile.TemporaryDirectory() as directory:
+            write_small_tables(directory)
+            Cribbage.enable_score_tables(directory)
+            try:
+                # 2H 3H 4H 5H with 6H is 14 points; the table answers since every id is small
+                hand = [card_from_id(i) for i in (1, 2, 3, 4)]
+                self.assertEqual(Cribbage.score_hand(hand, card_from_id(5)), 14)
+                # High cards are not built into the test table, so that entry reads as 0
+                high_hand = [card_from_id(i) for i in (4, 17, 30, 43)]
+                self.assertEqual(Cribbage.score_hand(high_hand, card_from_id(50)), 0)
+                # Hands outside the table are still scored by the functions
+                self.assertEqual(Cribbage.score_hand(high_hand[:3], card_from_id(50)), 14)
+            finally:
+                Cribbage.disable_score_tables()
+            self.assertEqual(Cribbage.score_hand(high_hand, card_from_id(50)), 28)
+
+    def test_enabled_tables_follow_crib_and_dealer(self):
+        """Test table lookups add nibs only for the dealer's hand and use the crib table for cribs"""
+        # 2H 3H 4H 5H with JH: a 5 card flush, and nibs for the dealer
+        hand = [card_from_id(i) for i in (1, 2, 3, 4)]
+        cut_card = card_from_id(10)
+        modes = [(False, True), (False, False), (True, True)]
+        expected = [Cribbage.score_hand(hand, cut_card, is_crib=is_crib, is_dealer=is_dealer) for is_crib, is_dealer in modes]
+        with tempfile.TemporaryDirectory() as directory:
+            write_small_tables(directory)
+            Cribbage.enable_score_tables(directory)
+            try:
+                scores = [Cribbage.score_hand(hand, cut_card, is_crib=is_crib, is_dealer=is_dealer) for is_crib, is_dealer in modes]
+            finally:
+                Cribbage.disable_score_tables()
+        self.assertEqual(scores, expected)
+        self.assertEqual(scores[0] - scores[1], 2)
+
+    def test_instrumentation_counts_table_lookups(self):
+        """Test instrumented scoring counts table lookups and gives the same scores"""
+        hand = [card_from_id(i) for i in (1, 2, 3, 4)]
+        cut_card = card_from_id(10)
+        modes = [(False, True), (False, False), (True, True)]
+        with tempfile.TemporaryDirectory() as directory:
+            write_small_tables(directory)
+            Cribbage.enable_score_tables(directory)
+            Cribbage.reset_instrumentation()
+            try:
+                expected = [Cribbage.score_hand(hand, cut_card, is_crib=is_crib, is_dealer=is_dealer) for is_crib, is_dealer in modes]
+                with Cribbage.instrumentation():
+                    scores = [Cribbage.score_hand(hand, cut_card, is_crib=is_crib, is_dealer=is_dealer) for is_crib, is_dealer in modes]
+                    # Too few cards for the table, so scored by the functions
+                    Cribbage.score_hand(hand[:3], cut_card)
+                snapshot = Cribbage.instrumentation_snapshot()
+            finally:
+                Cribbage.disable_score_tables()
+                Cribbage.reset_instrumentation()
+        self.assertEqual(scores, expected)
+        self.assertEqual(snapshot['table_lookup'].calls, 4)
+        self.assertEqual(snapshot['score_hand'].calls, 4)
+        self.assertEqual(snapshot['score_ranks'].calls, 1)
+
+    def test_load_rejects_other_files(self):
+        """Test a file that is not a score table raises ValueError"""
+        with tempfile.NamedTemporaryFile(suffix='.bin', delete=False) as f:
+            f.write(b"not a table" * 10)
+            temp_file = f.name
+        try:
+            with self.assertRaises(ValueError):
+                ScoreTable.ScoreTable(temp_file)
+        finally:
+            os.unlink(temp_file)
+
+if __name__ == '__main__':
+    unittest.main()
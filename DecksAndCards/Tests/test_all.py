@@ -11,7 +11,7 @@ project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(_
 sys.path.insert(0, project_root)
 
 # Import all test modules
-from DecksAndCards.Tests import test_Card, test_Deck, test_Cribbage, test_full_hand_scoring
+from DecksAndCards.Tests import test_Card, test_Deck, test_Cribbage, test_full_hand_scoring, test_ScoreTable, test_Canonical, test_batch_scoring, test_Discard, test_EnumerateHands, test_Game, test_Pegging, test_ScorePipeline, test_CribValues, test_Dealer, test_Benchmark, test_ScoreServer, test_HandArchive, test_incremental_scoring, test_Rules, test_import_time, test_HandStrength
 
 def create_test_suite():
     """Create a test suite containing all tests"""
@@ -23,6 +23,23 @@ def create_test_suite():
     suite.addTests(loader.loadTestsFromModule(test_Deck))
     suite.addTests(loader.loadTestsFromModule(test_Cribbage))
     suite.addTests(loader.loadTestsFromModule(test_full_hand_scoring))
+    suite.addTests(loader.loadTestsFromModule(test_ScoreTable))
+    suite.addTests(loader.loadTestsFromModule(test_Canonical))
+    suite.addTests(loader.loadTestsFromModule(test_batch_scoring))
+    suite.addTests(loader.loadTestsFromModule(test_Discard))
+    suite.addTests(loader.loadTestsFromModule(test_EnumerateHands))
+    suite.addTests(loader.loadTestsFromModule(test_Game))
+    suite.addTests(loader.loadTestsFromModule(test_Pegging))
+    suite.addTests(loader.loadTestsFromModule(test_ScorePipeline))
+    suite.addTests(loader.loadTestsFromModule(test_CribValues))
+    suite.addTests(loader.loadTestsFromModule(test_Dealer))
+    suite.addTests(loader.loadTestsFromModule(test_Benchmark))
+    suite.addTests(loader.loadTestsFromModule(test_ScoreServer))
+    suite.addTests(loader.loadTestsFromModule(test_HandArchive))
+    suite.addTests(loader.loadTestsFromModule(test_incremental_scoring))
+    suite.addTests(loader.loadTestsFromModule(test_Rules))
+    suite.addTests(loader.loadTestsFromModule(test_import_time))
+    suite.addTests(loader.loadTestsFromModule(test_HandStrength))
     
     return suite
 
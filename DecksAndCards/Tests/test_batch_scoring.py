@@ -0,0 +1,136 @@
+import unittest
+import sys
+import os
+import itertools
+import random
+
+# Add project root directory to path to import from DecksAndCards package
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from DecksAndCards.Card import CARDS
+from Cribbage import score_hand, score_hands
+import ScoreTable
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+def reference_score(hand_ids, cut_id, is_crib=False, is_dealer=True):
+    """Scores card ids with the scalar scorer"""
+    return score_hand([CARDS[card] for card in hand_ids], CARDS[cut_id], is_crib=is_crib, is_dealer=is_dealer)
+
+def every_rank_multiset():
+    """
+    Returns (hand ids, cut id) for every multiset of 5 ranks, using a different suit for each
+    repeat of a rank. The cut takes each position in turn so every rank shows up as the cut.
+    """
+    deals = []
+    for ranks in itertools.combinations_with_replacement(range(13), 5):
+        # There are only 4 cards of each rank
+        if any(ranks.count(rank) > 4 for rank in ranks):
+            continue
+        used = {}
+        ids = []
+        for rank in ranks:
+            suit = used.get(rank, 0)
+            used[rank] = suit + 1
+            ids.append(suit * 13 + rank)
+        for cut_position in range(5):
+            deals.append((ids[:cut_position] + ids[cut_position + 1:], ids[cut_position]))
+    return deals
+
+@unittest.skipIf(numpy is None, "NumPy is not installed")
+class TestBatchScoring(unittest.TestCase):
+    def assert_parity(self, deals, is_crib=False, is_dealer=True):
+        hands = numpy.array([hand for hand, _ in deals])
+        cuts = numpy.array([cut for _, cut in deals])
+        scores = score_hands(hands, cuts, is_crib=is_crib, is_dealer=is_dealer)
+        self.assertEqual(scores.shape, (len(deals),))
+        for (hand, cut), score in zip(deals, scores.tolist()):
+            self.assertEqual(score, reference_score(hand, cut, is_crib, is_dealer),
+                             f"Failed for hand {hand} with cut {cut}")
+
+    def test_parity_over_every_rank_multiset(self):
+        """Test 15s, pairs and runs match score_hand for every possible set of 5 ranks"""
+        self.assert_parity(every_rank_multiset())
+
+    def test_parity_over_every_small_hand(self):
+        """Test every hand from the first 12 cards, with every cut, in hand and crib mode"""
+        deals = [(list(hand), cut) for hand in itertools.combinations(range(12), 4)
+                 for cut in range(52) if cut not in hand]
+        self.assert_parity(deals)
+        self.assert_parity(deals, is_crib=True)
+
+    def test_parity_over_random_hands(self):
+        """Test random hands, which mix every suit pattern"""
+        rng = random.Random(4)
+        deals = []
+        for _ in range(20000):
+            ids = rng.sample(range(52), 5)
+            deals.append((ids[:4], ids[4]))
+        self.assert_parity(deals)
+        self.assert_parity(deals, is_dealer=False)
+        self.assert_parity(deals, is_crib=True)
+
+    def test_parity_over_other_hand_sizes(self):
+        """Test hands of 3, 5 and 6 cards, whose cribs never score a flush without rules"""
+        rng = random.Random(5)
+        for size in (3, 5, 6):
+            deals = []
+            for _ in range(5000):
+                # Mostly hearts, so flushes come up often
+                ids = rng.sample(range(13), size + 1) if rng.random() < 0.5 else rng.sample(range(52), size + 1)
+                deals.append((ids[:size], ids[size]))
+            with self.subTest(size=size):
+                self.assert_parity(deals)
+                self.assert_parity(deals, is_dealer=False)
+                self.assert_parity(deals, is_crib=True)
+
+    def test_known_hands(self):
+        """Test the best hand (29) and flush and nobs edge cases"""
+        # 5H 5D 5C JS with 5S: 29
+        # 2H 4H 6H 8H with 10D: a 4 card flush in the hand only
+        # JH 2C 3D 9S with 4H: nobs
+        hands = [[4, 17, 30, 49], [1, 3, 5, 7], [10, 27, 15, 47]]
+        cuts = [43, 22, 3]
+        self.assertEqual(score_hands(hands, cuts).tolist(),
+                         [reference_score(hand, cut) for hand, cut in zip(hands, cuts)])
+        self.assertEqual(score_hands(hands, cuts).tolist()[0], 29)
+
+    def test_empty_input(self):
+        """Test scoring no hands returns an empty array"""
+        self.assertEqual(len(score_hands(numpy.zeros((0, 4), dtype=int), numpy.zeros(0, dtype=int))), 0)
+
+    def test_mismatched_shapes_raise(self):
+        """Test hands and cuts of different lengths raise ValueError"""
+        with self.assertRaises(ValueError):
+            score_hands([[0, 1, 2, 3]], [4, 5])
+
+# Scoring all 13 million hand and cut pairs takes about half a minute, so it only runs when asked
+SLOW_TESTS = bool(os.environ.get("CRIBBAGE_SLOW_TESTS"))
+
+@unittest.skipIf(numpy is None, "NumPy is not installed")
+@unittest.skipUnless(SLOW_TESTS, "Set CRIBBAGE_SLOW_TESTS=1 to score every hand")
+class TestBatchScoringEveryHand(unittest.TestCase):
+    def test_parity_over_every_hand_and_cut(self):
+        """Test every 4 card hand with every cut against the score table, in hand and crib mode"""
+        for top in range(3, 52):
+            hand_scores, crib_scores = ScoreTable.score_block(top)
+            # The block's hands, each followed by its cuts in increasing order
+            hands = numpy.array(list(ScoreTable.block_hands(top)), dtype=numpy.int64)
+            not_in_hand = numpy.ones((len(hands), 52), dtype=bool)
+            not_in_hand[numpy.arange(len(hands))[:, None], hands] = False
+            rows, cuts = numpy.nonzero(not_in_hand)
+            # The table leaves out nibs, which only the dealer scores
+            for is_crib, expected in ((False, hand_scores), (True, crib_scores)):
+                scores = score_hands(hands[rows], cuts, is_crib=is_crib, is_dealer=False)
+                mismatches = numpy.flatnonzero(scores != numpy.frombuffer(expected, dtype=numpy.uint8))
+                if len(mismatches):
+                    row = mismatches[0]
+                    self.fail(f"Failed for hand {hands[rows[row]].tolist()} with cut {cuts[row]} "
+                              f"(is_crib={is_crib}): {scores[row]} != {expected[row]}")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,13 +1,17 @@
 import unittest
 import sys
 import os
+import random
+import io
+from concurrent.futures import ThreadPoolExecutor
 
 # Add project root directory to path to import from DecksAndCards package
 project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 sys.path.insert(0, project_root)
 
-from DecksAndCards.Card import Card, Suits, Values
-from Cribbage import score_hand
+from DecksAndCards.Card import Card, Suits, Values, CARDS
+from Cribbage import score_hand, score_breakdown, check_15s, check_pairs, check_runs, check_flushes, check_nibs_and_nobs, configure_rank_cache, rank_cache_info, clear_rank_cache, RANK_CACHE_SIZE
+import Cribbage
 
 def parse_card_string(card_str):
     """
@@ -138,5 +142,188 @@ class TestFullHandScoring(unittest.TestCase):
         score = score_hand(hand, cut)
         self.assertEqual(score, 29)
 
+class TestRankCache(unittest.TestCase):
+    """
+    Test cases for the cache of 15s, pairs and runs points used by score_hand.
+    """
+    
+    def setUp(self):
+        configure_rank_cache()
+    
+    def tearDown(self):
+        configure_rank_cache()
+    
+    def test_same_ranks_hit_the_cache(self):
+        """Test that hands with the same ranks in other suits and orders are scored once"""
+        hand = [parse_card_string('5H'), parse_card_string('5S'), parse_card_string('5D'), parse_card_string('JC')]
+        self.assertEqual(score_hand(hand, parse_card_string('5C')), 29)
+        other_suits = [parse_card_string('JC'), parse_card_string('5C'), parse_card_string('5D'), parse_card_string('5H')]
+        # No nobs this time
+        self.assertEqual(score_hand(other_suits, parse_card_string('5S')), 28)
+        info = rank_cache_info()
+        self.assertEqual((info.hits, info.misses, info.maxsize, info.currsize), (1, 1, RANK_CACHE_SIZE, 1))
+        
+        clear_rank_cache()
+        self.assertEqual(rank_cache_info().currsize, 0)
+        self.assertEqual(rank_cache_info().hits, 0)
+    
+    def test_cache_is_bounded(self):
+        """Test that the least recently used ranks are dropped once the cache is full"""
+        configure_rank_cache(2)
+        cut = parse_card_string('KS')
+        hands = [[parse_card_string(value + 'H') for value in values]
+                 for values in (['A', '2', '3', '4'], ['5', '6', '7', '8'], ['9', '10', 'J', 'Q'])]
+        for hand in hands:
+            score_hand(hand, cut)
+        self.assertEqual(rank_cache_info().currsize, 2)
+        # The first hand was dropped, the last is still there
+        score_hand(hands[0], cut)
+        score_hand(hands[2], cut)
+        self.assertEqual(rank_cache_info().misses, 4)
+        self.assertEqual(rank_cache_info().hits, 1)
+    
+    def test_disabled_cache_gives_same_scores(self):
+        """Test that turning the cache off changes no scores"""
+        rng = random.Random(12)
+        deals = [rng.sample(CARDS, 5) for _ in range(300)]
+        cached = [score_hand(deal[:4], deal[4]) for deal in deals]
+        configure_rank_cache(0)
+        self.assertEqual([score_hand(deal[:4], deal[4]) for deal in deals], cached)
+        self.assertEqual(rank_cache_info().currsize, 0)
+    
+    def test_cache_from_several_threads(self):
+        """Test that scoring from several threads gives the same scores and counts every call"""
+        rng = random.Random(13)
+        deals = [rng.sample(CARDS, 5) for _ in range(2000)]
+        configure_rank_cache(0)
+        expected = [score_hand(deal[:4], deal[4]) for deal in deals]
+        configure_rank_cache(64)
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            scores = list(executor.map(lambda deal: score_hand(deal[:4], deal[4]), deals))
+        self.assertEqual(scores, expected)
+        info = rank_cache_info()
+        self.assertEqual(info.hits + info.misses, len(deals))
+        self.assertLessEqual(info.currsize, 64)
+
+class TestScoreBreakdown(unittest.TestCase):
+    """
+    Test cases for the points from each category returned by score_breakdown.
+    """
+    
+    def test_breakdown_of_29_hand(self):
+        """Hand: 5H 5S 5D JC, Cut: 5C, Expected: 16 for 15s, 12 for pairs and 1 for nobs"""
+        hand = [parse_card_string('5H'), parse_card_string('5S'), parse_card_string('5D'), parse_card_string('JC')]
+        breakdown = score_breakdown(hand, parse_card_string('5C'))
+        self.assertEqual(breakdown, (16, 12, 0, 0, 1, 0, 29))
+        self.assertEqual(breakdown.nobs, 1)
+        self.assertEqual(breakdown.total, 29)
+    
+    def test_breakdown_of_crib(self):
+        """Hand: 2H 3H 4H 6H, Cut: JD, Expected: two 15s and a run of 3; flush and nibs only for the dealer's hand"""
+        hand = [parse_card_string('2H'), parse_card_string('3H'), parse_card_string('4H'), parse_card_string('6H')]
+        cut = parse_card_string('JD')
+        self.assertEqual(score_breakdown(hand, cut), (4, 0, 3, 4, 0, 2, 13))
+        self.assertEqual(score_breakdown(hand, cut, is_dealer=False), (4, 0, 3, 4, 0, 0, 11))
+        self.assertEqual(score_breakdown(hand, cut, is_crib=True), (4, 0, 3, 0, 0, 0, 7))
+    
+    def test_breakdown_of_crib_without_cut(self):
+        """Crib: 2H 3H 4H 6H 9H, no cut, Expected: the 5 card flush scores 5, as it does in score_hand"""
+        crib = [parse_card_string(card) for card in ('2H', '3H', '4H', '6H', '9H')]
+        breakdown = score_breakdown(crib, None, is_crib=True)
+        self.assertEqual(breakdown.flush, 5)
+        self.assertEqual(breakdown.total, score_hand(crib, None, is_crib=True))
+        # A 4 card crib without a cut scores no flush
+        self.assertEqual(score_breakdown(crib[:4], None, is_crib=True).flush, 0)
+    
+    def test_breakdown_matches_checkers(self):
+        """Test every category against its check_* function on random hands and cribs"""
+        rng = random.Random(14)
+        for _ in range(2000):
+            deal = rng.sample(CARDS, 5)
+            hand, cut = deal[:4], deal[4]
+            for is_crib, is_dealer in ((False, True), (False, False), (True, True)):
+                breakdown = score_breakdown(hand, cut, is_crib=is_crib, is_dealer=is_dealer)
+                self.assertEqual(breakdown.fifteens, check_15s(hand, cut, 0))
+                self.assertEqual(breakdown.pairs, check_pairs(hand, cut, 0))
+                self.assertEqual(breakdown.runs, check_runs(hand, cut, 0))
+                self.assertEqual(breakdown.flush, check_flushes(hand, cut, 0, is_crib=is_crib))
+                self.assertEqual(breakdown.nobs + breakdown.nibs,
+                                 check_nibs_and_nobs(hand, cut, 0, is_dealer=is_dealer and not is_crib))
+                self.assertEqual(breakdown.total, sum(breakdown[:-1]))
+                self.assertEqual(breakdown.total, score_hand(hand, cut, is_crib=is_crib, is_dealer=is_dealer))
+
+class TestInstrumentation(unittest.TestCase):
+    """
+    Test cases for the call counts and timings of score_hand's stages.
+    """
+    
+    def setUp(self):
+        Cribbage.disable_instrumentation()
+        Cribbage.reset_instrumentation()
+    
+    def tearDown(self):
+        Cribbage.disable_instrumentation()
+        Cribbage.reset_instrumentation()
+    
+    def test_nothing_counted_while_disabled(self):
+        """Test that scoring without instrumentation leaves the counters at 0"""
+        score_hand([parse_card_string(card) for card in ('5H', '5C', '5D', 'JS')], parse_card_string('5S'))
+        self.assertTrue(all(counter == (0, 0) for counter in Cribbage.instrumentation_snapshot().values()))
+    
+    def test_counts_every_stage(self):
+        """Test that each stage is counted once per hand and the scores don't change"""
+        rng = random.Random(15)
+        deals = [rng.sample(CARDS, 5) for _ in range(500)]
+        expected = [score_hand(deal[:4], deal[4], is_crib=i % 3 == 0, is_dealer=i % 2 == 0) for i, deal in enumerate(deals)]
+        with Cribbage.instrumentation():
+            scores = [score_hand(deal[:4], deal[4], is_crib=i % 3 == 0, is_dealer=i % 2 == 0) for i, deal in enumerate(deals)]
+        self.assertEqual(scores, expected)
+        snapshot = Cribbage.instrumentation_snapshot()
+        self.assertEqual(set(snapshot), set(Cribbage.INSTRUMENTED_STAGES))
+        for stage in ('score_hand', 'score_ranks', 'check_flushes', 'check_nibs_and_nobs'):
+            self.assertEqual(snapshot[stage].calls, len(deals))
+            self.assertGreater(snapshot[stage].nanoseconds, 0)
+        self.assertEqual(snapshot['table_lookup'].calls, 0)
+        # The whole call takes at least as long as its stages
+        stages = sum(snapshot[stage].nanoseconds for stage in ('score_ranks', 'check_flushes', 'check_nibs_and_nobs'))
+        self.assertGreaterEqual(snapshot['score_hand'].nanoseconds, stages)
+    
+    def test_context_manager_restores_state(self):
+        """Test that the with block turns instrumentation off again only if it was off"""
+        hand = [parse_card_string(card) for card in ('AH', '2H', '3H', '4H')]
+        cut = parse_card_string('KS')
+        with Cribbage.instrumentation():
+            score_hand(hand, cut)
+        score_hand(hand, cut)
+        self.assertEqual(Cribbage.instrumentation_snapshot()['score_hand'].calls, 1)
+        Cribbage.enable_instrumentation()
+        with Cribbage.instrumentation():
+            score_hand(hand, cut)
+        score_hand(hand, cut)
+        self.assertEqual(Cribbage.instrumentation_snapshot()['score_hand'].calls, 3)
+        Cribbage.reset_instrumentation()
+        self.assertEqual(Cribbage.instrumentation_snapshot()['score_hand'], (0, 0))
+    
+    def test_counts_from_several_threads(self):
+        """Test that no calls are lost when several threads score at once"""
+        rng = random.Random(16)
+        deals = [rng.sample(CARDS, 5) for _ in range(2000)]
+        with Cribbage.instrumentation():
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                list(executor.map(lambda deal: score_hand(deal[:4], deal[4]), deals))
+        self.assertEqual(Cribbage.instrumentation_snapshot()['score_hand'].calls, len(deals))
+    
+    def test_export(self):
+        """Test the exposition text has a calls and a nanoseconds line for every stage"""
+        with Cribbage.instrumentation():
+            score_hand([parse_card_string(card) for card in ('5H', '5C', '5D', 'JS')], parse_card_string('5S'))
+        file = io.StringIO()
+        text = Cribbage.export_instrumentation(file)
+        self.assertEqual(file.getvalue(), text)
+        self.assertIn('cribbage_stage_calls_total{stage="score_hand"} 1\n', text)
+        self.assertIn('# TYPE cribbage_stage_nanoseconds_total counter\n', text)
+        samples = [line for line in text.splitlines() if not line.startswith('#')]
+        self.assertEqual(len(samples), 2 * len(Cribbage.INSTRUMENTED_STAGES))
+
 if __name__ == '__main__':
     unittest.main()
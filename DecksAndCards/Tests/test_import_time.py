@@ -0,0 +1,70 @@
+import unittest
+import sys
+import os
+import subprocess
+import tempfile
+
+# Add project root directory to path to import from DecksAndCards package
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+# Most milliseconds "import Cribbage" may take in a fresh interpreter with its bytecode cached.
+# Loading NumPy or multiprocessing on import would each go well over it. Wall-clock times depend
+# on the machine and how busy it is, so the budget is only checked when asked for.
+IMPORT_BUDGET_MS = 15
+TIMING_TESTS = bool(os.environ.get("CRIBBAGE_TIMING_TESTS"))
+# Modules that must only be imported by the code paths that need them
+HEAVY_MODULES = ['numpy', 'concurrent.futures', 'multiprocessing', 'threading', 'contextlib',
+                 'hashlib', 'csv', 're', 'argparse', 'ScoreTable']
+
+class TestImportTime(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # Bytecode goes in a temporary directory, so it is cached even when writing it is turned off
+        cls._pycache = tempfile.TemporaryDirectory()
+        cls.env = dict(os.environ)
+        cls.env.pop('PYTHONDONTWRITEBYTECODE', None)
+        cls.env['PYTHONPYCACHEPREFIX'] = cls._pycache.name
+        cls.run_python("import Cribbage, main, ScoreTable")
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._pycache.cleanup()
+
+    @classmethod
+    def run_python(cls, code, *options):
+        result = subprocess.run([sys.executable, *options, "-c", code], cwd=project_root, env=cls.env,
+                                capture_output=True, text=True, check=True)
+        return result
+
+    def import_ms(self, module):
+        """Returns the best of a few cumulative import times of module, in milliseconds"""
+        times = []
+        for _ in range(3):
+            result = self.run_python(f"import {module}", "-X", "importtime")
+            for line in result.stderr.splitlines():
+                fields = line.split("|")
+                if len(fields) == 3 and fields[2].strip() == module:
+                    times.append(int(fields[1]) / 1000)
+        self.assertEqual(len(times), 3)
+        return min(times)
+
+    def test_import_skips_heavy_modules(self):
+        """Test importing Cribbage and the command line game leave the heavy modules unloaded"""
+        for module in ("Cribbage", "main"):
+            code = f"import sys, {module}; print(' '.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+            self.assertEqual(self.run_python(code).stdout.strip(), "", module)
+
+    def test_heavy_modules_load_when_needed(self):
+        """Test the lazily imported modules still load when a code path uses them"""
+        code = ("import sys, Cribbage; from DecksAndCards import Rules; Rules.table_key(Rules.FIVE_CARD); "
+                "print('hashlib' in sys.modules)")
+        self.assertEqual(self.run_python(code).stdout.strip(), "True")
+
+    @unittest.skipUnless(TIMING_TESTS, "Set CRIBBAGE_TIMING_TESTS=1 to time imports")
+    def test_import_within_budget(self):
+        """Test importing Cribbage stays within the startup budget"""
+        self.assertLess(self.import_ms("Cribbage"), IMPORT_BUDGET_MS)
+
+if __name__ == '__main__':
+    unittest.main()
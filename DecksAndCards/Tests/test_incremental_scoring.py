@@ -0,0 +1,136 @@
+import unittest
+import sys
+import os
+import random
+
+# Add project root directory to path to import from DecksAndCards package
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from DecksAndCards.Card import CARDS
+from Cribbage import score_hand, IncrementalScorer
+from DecksAndCards import Rules
+
+MODES = [(False, True), (False, False), (True, True)]
+
+class TestIncrementalScorer(unittest.TestCase):
+    def test_base_score(self):
+        """Test the starting score matches score_hand, with and without a cut"""
+        rng = random.Random(40)
+        for _ in range(500):
+            cards = rng.sample(CARDS, 6)
+            for size in (3, 4, 5):
+                for is_crib, is_dealer in MODES:
+                    for cut in (cards[5], None):
+                        scorer = IncrementalScorer(cards[:size], cut, is_crib=is_crib, is_dealer=is_dealer)
+                        self.assertEqual(scorer.score, score_hand(cards[:size], cut, is_crib=is_crib, is_dealer=is_dealer))
+
+    def test_29_hand(self):
+        """Test swapping cards in and out of the best hand"""
+        cards = {card.short_print(): card for card in CARDS}
+        scorer = IncrementalScorer([cards['5H'], cards['5C'], cards['5D'], cards['JS']], cards['5S'])
+        self.assertEqual(scorer.score, 29)
+        # The jack of clubs loses nobs
+        self.assertEqual(scorer.replace_delta(cards['JS'], cards['JC']), -1)
+        # Cutting the jack of spades instead: nibs, but the 5 of spades was worth 14
+        self.assertEqual(scorer.cut_delta(cards['JS']), score_hand([cards['5H'], cards['5C'], cards['5D'], cards['JS']], cards['JS']) - 29)
+        self.assertEqual(scorer.remove(cards['5H']), score_hand([cards['5C'], cards['5D'], cards['JS']], cards['5S']))
+        self.assertEqual(scorer.add(cards['5H']), 29)
+
+    def test_deltas_match_score_hand(self):
+        """Test every kind of change against scoring the changed hand from scratch"""
+        rng = random.Random(41)
+        for _ in range(300):
+            cards = rng.sample(CARDS, 7)
+            hand, cut, other = cards[:4], cards[4], cards[5]
+            for is_crib, is_dealer in MODES:
+                scorer = IncrementalScorer(hand, cut, is_crib=is_crib, is_dealer=is_dealer)
+                base = scorer.score
+
+                def expected(new_hand, new_cut):
+                    return score_hand(new_hand, new_cut, is_crib=is_crib, is_dealer=is_dealer) - base
+
+                self.assertEqual(scorer.add_delta(other), expected(hand + [other], cut))
+                self.assertEqual(scorer.cut_delta(other), expected(hand, other))
+                self.assertEqual(scorer.cut_delta(None), expected(hand, None))
+                for i, card in enumerate(hand):
+                    self.assertEqual(scorer.remove_delta(card), expected(hand[:i] + hand[i + 1:], cut))
+                    self.assertEqual(scorer.replace_delta(card, other), expected(hand[:i] + [other] + hand[i + 1:], cut))
+                # Asking about changes leaves the hand as it was
+                self.assertEqual(scorer.score, base)
+                self.assertEqual(scorer.hand, hand)
+
+    def test_every_cut(self):
+        """Test trying each of the 48 cuts for a 4 card hand with no cut"""
+        rng = random.Random(42)
+        for _ in range(50):
+            hand = rng.sample(CARDS, 4)
+            scorer = IncrementalScorer(hand, None)
+            for cut in CARDS:
+                if cut not in hand:
+                    self.assertEqual(scorer.score + scorer.cut_delta(cut), score_hand(hand, cut))
+
+    def test_changes_in_sequence(self):
+        """Test a long run of kept changes stays in step with score_hand"""
+        rng = random.Random(43)
+        for is_crib, is_dealer in MODES:
+            cards = rng.sample(CARDS, 5)
+            hand, cut = cards[:4], cards[4]
+            scorer = IncrementalScorer(hand, cut, is_crib=is_crib, is_dealer=is_dealer)
+            for _ in range(500):
+                unused = [card for card in CARDS if card not in hand and card is not cut]
+                action = rng.randrange(4)
+                if action == 0 and len(hand) < 6:
+                    card = rng.choice(unused)
+                    hand = hand + [card]
+                    score = scorer.add(card)
+                elif action == 1 and len(hand) > 2:
+                    card = rng.choice(hand)
+                    hand = [held for held in hand if held is not card]
+                    score = scorer.remove(card)
+                elif action == 2:
+                    old, new = rng.choice(hand), rng.choice(unused)
+                    hand = [new if held is old else held for held in hand]
+                    score = scorer.replace(old, new)
+                else:
+                    cut = rng.choice(unused + [None])
+                    score = scorer.set_cut(cut)
+                self.assertEqual(score, score_hand(hand, cut, is_crib=is_crib, is_dealer=is_dealer))
+                self.assertEqual(sorted(card.id for card in scorer.hand), sorted(card.id for card in hand))
+
+    def test_variant_rules(self):
+        """Test scores and deltas follow a variant's flush and nibs rules"""
+        rng = random.Random(44)
+        no_cut_needed = Rules.STANDARD._replace(name="loose-flush", hand_flush_needs_cut=False,
+                                                crib_flush_needs_cut=False, nibs_points=0)
+        hearts = [card for card in CARDS if card.suit_index == CARDS[0].suit_index]
+        for _ in range(200):
+            # Mostly one suit, so flushes come up often
+            cards = rng.sample(hearts, 6) if rng.random() < 0.5 else rng.sample(CARDS, 6)
+            other = rng.choice([card for card in CARDS if card not in cards])
+            for rules in (Rules.STANDARD, Rules.FIVE_CARD, no_cut_needed):
+                for size in (3, 4, 5):
+                    hand = cards[:size]
+                    for is_crib, is_dealer in MODES:
+                        for cut in (cards[5], None):
+                            scorer = IncrementalScorer(hand, cut, is_crib=is_crib, is_dealer=is_dealer, rules=rules)
+
+                            def expected(new_hand, new_cut):
+                                return score_hand(new_hand, new_cut, is_crib=is_crib, is_dealer=is_dealer, rules=rules)
+
+                            self.assertEqual(scorer.score, expected(hand, cut))
+                            self.assertEqual(scorer.score + scorer.cut_delta(other), expected(hand, other))
+                            self.assertEqual(scorer.score + scorer.replace_delta(hand[0], other),
+                                             expected([other] + hand[1:], cut))
+
+    def test_card_not_in_hand(self):
+        """Test removing or replacing a card that is not in the hand raises ValueError"""
+        scorer = IncrementalScorer(list(CARDS[:4]), CARDS[4])
+        with self.assertRaises(ValueError):
+            scorer.remove_delta(CARDS[10])
+        with self.assertRaises(ValueError):
+            scorer.replace(CARDS[4], CARDS[10])
+        self.assertEqual(len(scorer.hand), 4)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+# This file contains functions for choosing which 2 of 6 dealt cards to discard into the crib
+
+from collections import namedtuple
+from operator import attrgetter, mul
+import itertools
+import Cribbage
+
+# One way to split six cards, with its expected points averaged over the 46 possible cuts.
+# crib_value is the expected crib points of the discards (0 unless asked for); it counts
+# for the player when they are the dealer and against them otherwise.
+DiscardOption = namedtuple('DiscardOption', ['keep', 'discard', 'hand_value', 'crib_value', 'expected_value'])
+
+# Each way to split 6 cards, as (positions kept, positions discarded)
+_SPLITS = [(keep, tuple(i for i in range(6) if i not in keep)) for keep in itertools.combinations(range(6), 4)]
+_expected_value = attrgetter('expected_value')
+
+# For a sorted tuple of kept ranks, the 15s, pairs and runs points with a cut of each rank (1-13)
+_points_by_cut_rank = {}
+
+def rank_points_by_cut(ranks):
+    """Returns the 15s, pairs and runs points of a sorted tuple of ranks with a cut of each rank (1-13)"""
+    points = _points_by_cut_rank.get(ranks)
+    if points is None:
+        points = [Cribbage.score_ranks(ranks + (cut_rank,)) for cut_rank in range(1, 14)]
+        _points_by_cut_rank[ranks] = points
+    return points
+
+def best_discard(six_cards, is_dealer, include_crib=False, crib_value=None, rules=None):
+    """
+    Ranks every way to keep 4 of 6 cards by the points expected from the kept hand over the
+    46 cuts that are still unseen. Hands are scored the same way as Cribbage.score_hand with
+    the same is_dealer and rules, so nibs only counts for the dealer.
+
+    Args:
+        six_cards: the 6 dealt cards
+        is_dealer: whether the player owns the crib
+        include_crib: also count the points the discards are expected to make in the crib
+        crib_value: function given (discard, is_dealer) that returns the expected crib points
+                    of the discards (default: CribValues.expected_crib_value, which is
+                    for standard rules)
+        rules: the Rules of a variant where players keep 4 of 6 cards, for its hand flush
+               and nibs rules (default: standard rules)
+
+    Returns:
+        list: DiscardOption for each of the 15 splits, best expected_value first
+
+    Raises:
+        ValueError: If six_cards is not 6 distinct cards, or the rules don't keep 4 of 6
+    """
+    if len(six_cards) != 6 or len(set(six_cards)) != 6:
+        raise ValueError("best_discard needs 6 distinct cards")
+    if rules is not None and (rules.cards_dealt, rules.hand_size) != (6, 4):
+        raise ValueError(f"best_discard keeps 4 of 6 cards, not {rules.hand_size} of {rules.cards_dealt}")
+    if include_crib and crib_value is None:
+        import CribValues
+        crib_value = CribValues.expected_crib_value
+
+    # How many of the 46 unseen cards have each rank and each suit
+    cuts_of_rank = [4] * 13
+    cuts_of_suit = [13] * 4
+    ranks = []
+    suits = []
+    for card in six_cards:
+        cuts_of_rank[card.rank - 1] -= 1
+        cuts_of_suit[card.suit_index] -= 1
+        ranks.append(card.rank)
+        suits.append(card.suit_index)
+    num_cuts = 46
+    # Nibs: the dealer gets 2 points when the cut is a jack
+    nibs_points = (2 if rules is None else rules.nibs_points) * cuts_of_rank[10] if is_dealer else 0
+    # A 4 card flush scores 4 when the cut doesn't match, unless the rules need it to
+    unmatched_flush = 0 if rules is not None and rules.hand_flush_needs_cut else 4
+    # Nobs: 1 point for each cut of the same suit as a kept jack
+    nobs = [cuts_of_suit[suit] if rank == 11 else 0 for rank, suit in zip(ranks, suits)]
+
+    options = []
+    for keep_positions, (first, second) in _SPLITS:
+        a, b, c, d = keep_positions
+        # 15s, pairs and runs, weighted by how many cuts have each rank
+        points = rank_points_by_cut(tuple(sorted((ranks[a], ranks[b], ranks[c], ranks[d]))))
+        total = nibs_points + sum(map(mul, cuts_of_rank, points)) + nobs[a] + nobs[b] + nobs[c] + nobs[d]
+        # Flush: 5 points for each cut of the same suit, and unmatched_flush for the rest
+        suit = suits[a]
+        if suits[b] == suit and suits[c] == suit and suits[d] == suit:
+            total += 5 * cuts_of_suit[suit] + unmatched_flush * (num_cuts - cuts_of_suit[suit])
+        hand_value = total / num_cuts
+
+        keep = [six_cards[a], six_cards[b], six_cards[c], six_cards[d]]
+        discard = [six_cards[first], six_cards[second]]
+        discard_value = crib_value(discard, is_dealer) if include_crib else 0.0
+        expected_value = hand_value + discard_value if is_dealer else hand_value - discard_value
+        options.append(DiscardOption(keep, discard, hand_value, discard_value, expected_value))
+
+    options.sort(key=_expected_value, reverse=True)
+    return options
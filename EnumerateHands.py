@@ -0,0 +1,199 @@
+# This file enumerates every 4 card hand with every cut (C(52,4) x 48 = 12,994,800 deals),
+# scores each one as a hand and as a crib, and summarizes the results. Nibs is left out,
+# since it goes to the dealer whatever their hand.
+#
+# The work is split into shards by the highest card id in the hand, the same blocks the
+# score tables are laid out in, and shards run in parallel worker processes. Each finished
+# shard is saved on its own, so an interrupted run picks up where it left off.
+#
+# Output directory:
+#   shards/               one hand, crib and stats file per shard
+#   hand_scores.bin       hand score column, one byte per deal in table order
+#   crib_scores.bin       crib score column, same order
+#   summary.json          score histograms and average points per card
+#
+# The two score columns use the score table format, so the output directory can be
+# passed straight to Cribbage.enable_score_tables.
+#
+# Usage:  python EnumerateHands.py <directory> [--workers N]
+
+from DecksAndCards.Card import CARDS
+from math import comb
+import argparse
+import json
+import os
+import sys
+import time
+import ScoreTable
+
+TOPS = range(3, 52)
+MAX_SCORE = 29
+SHARD_DIRECTORY = "shards"
+# Kept in each shard's stats file. Shards written with another version (or none, from before
+# there was one) hold different columns, so they are computed again rather than merged.
+SHARD_VERSION = 1
+SUMMARY_NAME = "summary.json"
+
+def _shard_paths(directory, top):
+    base = os.path.join(directory, SHARD_DIRECTORY, f"shard_{top:02d}")
+    return base + ".hand", base + ".crib", base + ".json"
+
+def _write_atomically(path, data, mode='wb'):
+    # Write to a temporary name first so a killed run never leaves a partial shard behind
+    temporary_path = path + ".tmp"
+    with open(temporary_path, mode) as file:
+        file.write(data)
+    os.replace(temporary_path, path)
+
+def _shard_stats(top, hand_scores, crib_scores):
+    """Histograms and per-card point totals for one shard"""
+    stats = {"version": SHARD_VERSION}
+    for name, scores in (("hand", hand_scores), ("crib", crib_scores)):
+        stats[name + "_histogram"] = [scores.count(score) for score in range(MAX_SCORE + 1)]
+
+    # Points summed over the deals that hold each card in the hand, and that cut each card
+    hand_card_points = [0] * 52
+    cut_card_points = [0] * 52
+    position = 0
+    for ids in ScoreTable.block_hands(top):
+        scores = hand_scores[position:position + ScoreTable.CUTS_PER_HAND]
+        hand_total = sum(scores)
+        for card in ids:
+            hand_card_points[card] += hand_total
+        cuts = [card for card in range(52) if card not in ids]
+        for cut, score in zip(cuts, scores):
+            cut_card_points[cut] += score
+        position += ScoreTable.CUTS_PER_HAND
+    stats["hand_card_points"] = hand_card_points
+    stats["cut_card_points"] = cut_card_points
+    return stats
+
+def compute_shard(directory, top):
+    """Scores one shard and saves its score columns and stats. Returns the top card id."""
+    hand_path, crib_path, stats_path = _shard_paths(directory, top)
+    hand_scores, crib_scores = ScoreTable.score_block(top)
+    _write_atomically(hand_path, hand_scores)
+    _write_atomically(crib_path, crib_scores)
+    # The stats file is written last and marks the shard as finished
+    _write_atomically(stats_path, json.dumps(_shard_stats(top, hand_scores, crib_scores)), mode='w')
+    return top
+
+def is_shard_done(directory, top):
+    """Whether a shard was fully written by an earlier run, in this version's format"""
+    hand_path, crib_path, stats_path = _shard_paths(directory, top)
+    size = ScoreTable.block_start(top + 1) - ScoreTable.block_start(top)
+    if not (os.path.exists(stats_path)
+            and os.path.exists(hand_path) and os.path.getsize(hand_path) == size
+            and os.path.exists(crib_path) and os.path.getsize(crib_path) == size):
+        return False
+    try:
+        with open(stats_path) as file:
+            stats = json.load(file)
+    except ValueError:
+        return False
+    return isinstance(stats, dict) and stats.get("version") == SHARD_VERSION
+
+def compute_shards(directory, tops=TOPS, workers=None, progress=None):
+    """
+    Computes every shard in tops that is not already finished, in parallel.
+
+    Args:
+        directory: output directory
+        tops: highest card ids of the shards to compute
+        workers: number of worker processes (default: one per CPU)
+        progress: optional callable given each top card id as its shard finishes
+
+    Returns:
+        list: top card ids of the shards computed by this call
+    """
+    os.makedirs(os.path.join(directory, SHARD_DIRECTORY), exist_ok=True)
+    pending = [top for top in tops if not is_shard_done(directory, top)]
+    # Largest shards first so no worker is left with a big one at the end
+    pending.sort(reverse=True)
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for top in executor.map(compute_shard, [directory] * len(pending), pending):
+            if progress is not None:
+                progress(top)
+    return pending
+
+def merge_shards(directory):
+    """
+    Joins the finished shards into the score columns, in table order, and writes the summary.
+
+    Raises:
+        ValueError: If any shard is missing
+    """
+    missing = [top for top in TOPS if not is_shard_done(directory, top)]
+    if missing:
+        raise ValueError(f"Shards not finished: {missing}")
+
+    hand_histogram = [0] * (MAX_SCORE + 1)
+    crib_histogram = [0] * (MAX_SCORE + 1)
+    hand_card_points = [0] * 52
+    cut_card_points = [0] * 52
+    with open(os.path.join(directory, ScoreTable.HAND_TABLE_NAME) + ".tmp", 'wb') as hand_file, \
+         open(os.path.join(directory, ScoreTable.CRIB_TABLE_NAME) + ".tmp", 'wb') as crib_file:
+        ScoreTable.write_header(hand_file, is_crib=False)
+        ScoreTable.write_header(crib_file, is_crib=True)
+        for top in TOPS:
+            hand_path, crib_path, stats_path = _shard_paths(directory, top)
+            with open(hand_path, 'rb') as file:
+                hand_file.write(file.read())
+            with open(crib_path, 'rb') as file:
+                crib_file.write(file.read())
+            with open(stats_path) as file:
+                stats = json.load(file)
+            for totals, shard_totals in ((hand_histogram, stats["hand_histogram"]),
+                                         (crib_histogram, stats["crib_histogram"]),
+                                         (hand_card_points, stats["hand_card_points"]),
+                                         (cut_card_points, stats["cut_card_points"])):
+                for i, value in enumerate(shard_totals):
+                    totals[i] += value
+    for name in (ScoreTable.HAND_TABLE_NAME, ScoreTable.CRIB_TABLE_NAME):
+        os.replace(os.path.join(directory, name) + ".tmp", os.path.join(directory, name))
+
+    # Each card is in C(51,3) hands, each with 48 cuts, and is the cut for C(51,4) hands
+    deals_per_hand_card = comb(51, 3) * ScoreTable.CUTS_PER_HAND
+    deals_per_cut_card = comb(51, 4)
+    summary = {
+        "deals": ScoreTable.TABLE_SIZE,
+        "hand_histogram": hand_histogram,
+        "crib_histogram": crib_histogram,
+        "hand_average": _average(hand_histogram),
+        "crib_average": _average(crib_histogram),
+        "average_hand_points_holding_card": {
+            CARDS[card].short_print(): points / deals_per_hand_card for card, points in enumerate(hand_card_points)
+        },
+        "average_hand_points_with_cut": {
+            CARDS[card].short_print(): points / deals_per_cut_card for card, points in enumerate(cut_card_points)
+        },
+    }
+    _write_atomically(os.path.join(directory, SUMMARY_NAME), json.dumps(summary, indent=2), mode='w')
+    return summary
+
+def _average(histogram):
+    return sum(score * count for score, count in enumerate(histogram)) / sum(histogram)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score every 4 card hand with every cut card")
+    parser.add_argument("directory", help="output directory (re-run with the same one to resume)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per CPU)")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    done = [0]
+    remaining = len([top for top in TOPS if not is_shard_done(args.directory, top)])
+
+    def progress(top):
+        done[0] += 1
+        print(f"Shard {top:02d} done ({done[0]}/{remaining}, {time.perf_counter() - start:.1f}s)", file=sys.stderr)
+
+    compute_shards(args.directory, workers=args.workers, progress=progress)
+    summary = merge_shards(args.directory)
+    print(f"Scored {summary['deals']} deals in {time.perf_counter() - start:.1f}s: "
+          f"average hand {summary['hand_average']:.3f}, average crib {summary['crib_average']:.3f}")
+
+if __name__ == "__main__":
+    main()
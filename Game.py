@@ -0,0 +1,217 @@
+# This file contains a headless two player game of cribbage, played to 121 points by
+# pluggable strategies, and a runner that plays many games across processes.
+#
+# Usage:  python Game.py --games 10000 --workers 4 --seed 1 greedy random
+
+from collections import namedtuple
+from DecksAndCards.Deck import ReusableDeck
+from math import sqrt
+from Pegging import PlayState
+import argparse
+import random
+import time
+import Cribbage
+import Discard
+
+WINNING_SCORE = 121
+
+# Games are handed to worker processes in chunks; each chunk has its own seeded random
+# number generator, so results only depend on the seed, never on the number of workers.
+GAMES_PER_CHUNK = 100
+
+GameResult = namedtuple('GameResult', ['winner', 'scores', 'deals'])
+MatchResult = namedtuple('MatchResult', ['games', 'wins', 'win_rate', 'confidence_interval', 'average_deals'])
+
+class RandomStrategy:
+    """Discards and plays random cards"""
+    def discard(self, hand, is_dealer, rng):
+        """Returns the 2 cards from the 6 card hand to put in the crib"""
+        return rng.sample(hand, 2)
+
+    def play(self, playable, state, rng):
+        """
+        Returns the card to play from playable, the cards that keep the count at 31 or under.
+        state is the Pegging.PlayState of the current count.
+        """
+        return rng.choice(playable)
+
+class GreedyStrategy:
+    """Keeps the hand with the best expected score and plays for the most points right away"""
+    def discard(self, hand, is_dealer, rng):
+        return Discard.best_discard(hand, is_dealer, include_crib=True)[0].discard
+
+    def play(self, playable, state, rng):
+        def preference(card):
+            new_count = state.count + card.pip
+            # Most points first, then avoid leaving 5 or 21 for a 15 or 31, then shed high cards
+            return (state.points_if_played(card), new_count not in (5, 21), card.pip)
+        return max(playable, key=preference)
+
+STRATEGIES = {
+    "random": RandomStrategy,
+    "greedy": GreedyStrategy,
+}
+
+class _Scoreboard:
+    def __init__(self):
+        self.scores = [0, 0]
+        self.winner = None
+
+    def add(self, player, points):
+        """Adds points to a player; returns True once someone has won"""
+        self.scores[player] += points
+        if self.scores[player] >= WINNING_SCORE and self.winner is None:
+            self.winner = player
+        return self.winner is not None
+
+def _play_pegging(hands, dealer, strategies, board, rng):
+    """Plays out the pegging. Returns True if the game was won during it."""
+    hands = [list(hand) for hand in hands]
+    turn = 1 - dealer
+    state = PlayState()
+    last_player = None
+    while hands[0] or hands[1]:
+        # Cards that keep the count at 31 or under (as PlayState.can_play, inlined for speed)
+        room = 31 - state.count
+        hand = hands[turn]
+        playable = [card for card in hand if card.pip <= room]
+        if playable:
+            card = strategies[turn].play(playable, state, rng)
+            # Cards are shared objects, so the played card is found by identity
+            for position, held in enumerate(hand):
+                if held is card:
+                    del hand[position]
+                    break
+            else:
+                raise ValueError(f"{card.short_print()} is not in the hand")
+            last_player = turn
+            # Making 31 scores 2 and starts the next count
+            if board.add(turn, state.play(card)):
+                return True
+        elif not any(card.pip <= room for card in hands[1 - turn]):
+            # Neither player can play: a go for whoever played last, then start a new count
+            if board.add(last_player, state.go()):
+                return True
+            turn = last_player
+        turn = 1 - turn
+    # One for the last card, unless it made 31
+    return board.add(last_player, state.go())
+
+def play_game(strategies, rng):
+    """
+    Plays one game between two strategies until one reaches 121 points.
+
+    Args:
+        strategies: a pair of strategy objects with discard and play methods
+        rng: random.Random used for shuffling and passed to the strategies
+
+    Returns:
+        GameResult: the winning player (0 or 1), both final scores and the number of deals
+    """
+    board = _Scoreboard()
+    dealer = rng.randrange(2)
+    deals = 0
+    deck = ReusableDeck(rng=rng)
+    while True:
+        deals += 1
+        deck.reset()
+        hands = [deck.draw(6), deck.draw(6)]
+        crib = []
+        for player in (0, 1):
+            discard = strategies[player].discard(hands[player], player == dealer, rng)
+            discarded = {card.id for card in discard}
+            hands[player] = [card for card in hands[player] if card.id not in discarded]
+            crib.extend(discard)
+
+        cut_card = deck.draw()[0]
+        pone = 1 - dealer
+        # His heels: 2 for the dealer when the cut is a jack
+        if cut_card.rank == 11 and board.add(dealer, 2):
+            break
+        if _play_pegging(hands, dealer, strategies, board, rng):
+            break
+        # The show: the pone counts first, then the dealer's hand, then the crib.
+        # Nibs was already pegged at the cut, so no hand counts it again.
+        if board.add(pone, Cribbage.score_hand(hands[pone], cut_card, is_dealer=False)):
+            break
+        if board.add(dealer, Cribbage.score_hand(hands[dealer], cut_card, is_dealer=False)):
+            break
+        if board.add(dealer, Cribbage.score_hand(crib, cut_card, is_crib=True)):
+            break
+        dealer = pone
+    return GameResult(board.winner, tuple(board.scores), deals)
+
+def _play_chunk(strategy_names, seed, chunk, num_games):
+    """Plays a chunk of games in a worker; returns (wins for each player, total deals)"""
+    rng = random.Random(f"{seed}:{chunk}")
+    strategies = [STRATEGIES[name]() for name in strategy_names]
+    wins = [0, 0]
+    deals = 0
+    for _ in range(num_games):
+        result = play_game(strategies, rng)
+        wins[result.winner] += 1
+        deals += result.deals
+    return wins, deals
+
+def wilson_interval(successes, trials, z=1.96):
+    """Returns the Wilson score interval for a proportion (95% by default)"""
+    if trials == 0:
+        return (0.0, 1.0)
+    p = successes / trials
+    denominator = 1 + z * z / trials
+    centre = (p + z * z / (2 * trials)) / denominator
+    margin = z * sqrt(p * (1 - p) / trials + z * z / (4 * trials * trials)) / denominator
+    return (centre - margin, centre + margin)
+
+def run_games(num_games, strategy_names, seed=0, workers=None):
+    """
+    Plays many independent games between two strategies, spread over worker processes.
+
+    Args:
+        num_games: number of games to play
+        strategy_names: pair of names from STRATEGIES
+        seed: results are reproducible for a seed, whatever the number of workers
+        workers: number of worker processes (default: one per CPU)
+
+    Returns:
+        MatchResult: wins for each player, player 0's win rate with its 95% confidence interval,
+                     and the average number of deals per game
+    """
+    for name in strategy_names:
+        if name not in STRATEGIES:
+            raise ValueError(f"Unknown strategy: {name}")
+    chunks = [(chunk, min(GAMES_PER_CHUNK, num_games - start))
+              for chunk, start in enumerate(range(0, num_games, GAMES_PER_CHUNK))]
+    wins = [0, 0]
+    deals = 0
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(_play_chunk, [tuple(strategy_names)] * len(chunks), [seed] * len(chunks),
+                               [chunk for chunk, _ in chunks], [size for _, size in chunks])
+        for chunk_wins, chunk_deals in results:
+            wins[0] += chunk_wins[0]
+            wins[1] += chunk_wins[1]
+            deals += chunk_deals
+    win_rate = wins[0] / num_games if num_games else 0.0
+    average_deals = deals / num_games if num_games else 0.0
+    return MatchResult(num_games, tuple(wins), win_rate, wilson_interval(wins[0], num_games), average_deals)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play cribbage strategies against each other")
+    parser.add_argument("strategies", nargs=2, choices=sorted(STRATEGIES), help="strategy for player 0 and player 1")
+    parser.add_argument("--games", type=int, default=1000, help="number of games to play")
+    parser.add_argument("--seed", type=int, default=0, help="seed for reproducible results")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per CPU)")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    result = run_games(args.games, args.strategies, seed=args.seed, workers=args.workers)
+    elapsed = time.perf_counter() - start
+    low, high = result.confidence_interval
+    print(f"{args.strategies[0]} vs {args.strategies[1]}: {result.wins[0]}-{result.wins[1]} over {result.games} games")
+    print(f"{args.strategies[0]} win rate: {result.win_rate:.4f} (95% CI {low:.4f}-{high:.4f})")
+    print(f"{result.average_deals:.2f} deals per game, {result.games / elapsed:.0f} games/s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+# This file contains a compact binary format for archiving scored hands: one 64-bit word per
+# hand, memory-mapped for reading, so the N-th hand is found without reading the rest of the file.
+#
+# Each word (little-endian) holds card ids (see Card.id) in 6 bits each:
+#   bits  0-23  the 4 hand cards, the first card in the lowest bits
+#   bits 24-29  the cut card (63 for no cut)
+#   bits 32-39  the score
+#   bit  40     scored as the crib
+#   bit  41     scored as the dealer's (so including nibs)
+# The other bits are 0. The file starts with a header of (magic, format version, 0, number
+# of hands), then the words.
+#
+# pack_cards and unpack_cards store any list of cards, such as a Deck, in 6 bits per card.
+#
+# Reading and writing arrays of words requires NumPy; single hands can be packed without it.
+
+from collections import namedtuple
+from DecksAndCards.Card import CARDS
+from DecksAndCards.Deck import Deck
+import array
+import os
+import struct
+import sys
+import Cribbage
+
+# Header is (magic, format version, reserved, number of hands)
+_MAGIC = b"CRIBARC\0"
+_VERSION = 1
+_HEADER = struct.Struct("<8sIIQ")
+
+CARD_BITS = 6
+CARD_MASK = (1 << CARD_BITS) - 1
+# Card id stored for a missing cut, and to pad packed cards to a whole byte
+NO_CARD = CARD_MASK
+HAND_SIZE = 4
+CUT_SHIFT = HAND_SIZE * CARD_BITS
+SCORE_SHIFT = 32
+# Scores are stored in 8 bits
+SCORE_MASK = 0xFF
+CRIB_BIT = 1 << 40
+DEALER_BIT = 1 << 41
+# Hands the writer buffers before writing them out
+_WRITE_BUFFER = 65536
+
+# One decoded word
+HandRecord = namedtuple('HandRecord', ['hand', 'cut', 'score', 'is_crib', 'is_dealer'])
+# Many decoded words as NumPy arrays: hands (N, 4) and cuts (N,) of card ids (NO_CARD for no
+# cut), scores (N,), and is_crib and is_dealer (N,) booleans
+HandColumns = namedtuple('HandColumns', ['hands', 'cuts', 'scores', 'is_crib', 'is_dealer'])
+
+def encode_hand(hand, cut_card, score=None, is_crib=False, is_dealer=True):
+    """
+    Packs a 4 card hand, its cut card (or None) and its score into one 64-bit word.
+    The score defaults to Cribbage.score_hand with the same is_crib and is_dealer.
+
+    Raises:
+        ValueError: If the hand is not 4 cards, or the score doesn't fit in 8 bits (0-255)
+    """
+    if len(hand) != HAND_SIZE:
+        raise ValueError(f"Expected {HAND_SIZE} hand cards, got {len(hand)}")
+    if score is None:
+        score = Cribbage.score_hand(hand, cut_card, is_crib=is_crib, is_dealer=is_dealer)
+    elif not 0 <= score <= SCORE_MASK:
+        raise ValueError(f"Score {score} doesn't fit in 8 bits")
+    word = 0
+    for position, card in enumerate(hand):
+        word |= card.id << (position * CARD_BITS)
+    word |= (NO_CARD if cut_card is None else cut_card.id) << CUT_SHIFT
+    word |= score << SCORE_SHIFT
+    if is_crib:
+        word |= CRIB_BIT
+    if is_dealer:
+        word |= DEALER_BIT
+    return word
+
+def decode_hand(word):
+    """Unpacks a word written by encode_hand into a HandRecord of Cards"""
+    word = int(word)
+    hand = [CARDS[(word >> (position * CARD_BITS)) & CARD_MASK] for position in range(HAND_SIZE)]
+    cut = (word >> CUT_SHIFT) & CARD_MASK
+    return HandRecord(hand, None if cut == NO_CARD else CARDS[cut], (word >> SCORE_SHIFT) & SCORE_MASK,
+                      bool(word & CRIB_BIT), bool(word & DEALER_BIT))
+
+def pack_words(hands, cuts, scores, is_crib=False, is_dealer=True):
+    """
+    Packs arrays of hands into words with NumPy: the array form of encode_hand.
+
+    Args:
+        hands: (N, 4) card ids
+        cuts: (N,) card ids, NO_CARD for no cut
+        scores: (N,) scores
+        is_crib, is_dealer: a flag for every hand, or an (N,) array of flags
+
+    Returns:
+        numpy.ndarray: (N,) little-endian uint64 words
+
+    Raises:
+        ValueError: If the shapes don't match, or a score doesn't fit in 8 bits (0-255)
+    """
+    import numpy as np
+
+    hands = np.asarray(hands, dtype=np.uint64)
+    cuts = np.asarray(cuts, dtype=np.uint64)
+    if hands.ndim != 2 or hands.shape[1] != HAND_SIZE or cuts.shape != (len(hands),):
+        raise ValueError(f"Expected hands of shape (N, {HAND_SIZE}) and cuts of shape (N,), got {hands.shape} and {cuts.shape}")
+    scores = np.asarray(scores)
+    if scores.size and (scores.min() < 0 or scores.max() > SCORE_MASK):
+        raise ValueError("Scores don't fit in 8 bits")
+    words = cuts << np.uint64(CUT_SHIFT)
+    for position in range(HAND_SIZE):
+        words |= hands[:, position] << np.uint64(position * CARD_BITS)
+    words |= np.asarray(scores, dtype=np.uint64) << np.uint64(SCORE_SHIFT)
+    words |= np.where(np.asarray(is_crib, dtype=bool), np.uint64(CRIB_BIT), np.uint64(0))
+    words |= np.where(np.asarray(is_dealer, dtype=bool), np.uint64(DEALER_BIT), np.uint64(0))
+    return words.astype('<u8', copy=False)
+
+def unpack_words(words):
+    """Unpacks an array of words into HandColumns with NumPy: the array form of decode_hand"""
+    import numpy as np
+
+    words = np.asarray(words, dtype=np.uint64)
+    hands = np.empty((len(words), HAND_SIZE), dtype=np.uint8)
+    for position in range(HAND_SIZE):
+        hands[:, position] = (words >> np.uint64(position * CARD_BITS)) & np.uint64(CARD_MASK)
+    cuts = ((words >> np.uint64(CUT_SHIFT)) & np.uint64(CARD_MASK)).astype(np.uint8)
+    scores = ((words >> np.uint64(SCORE_SHIFT)) & np.uint64(SCORE_MASK)).astype(np.uint8)
+    return HandColumns(hands, cuts, scores, (words & np.uint64(CRIB_BIT)) != 0,
+                       (words & np.uint64(DEALER_BIT)) != 0)
+
+def pack_cards(cards):
+    """Packs cards into bytes, 6 bits per card in order; the last byte is padded with NO_CARD bits"""
+    value = 0
+    for position, card in enumerate(cards):
+        value |= card.id << (position * CARD_BITS)
+    num_bits = len(cards) * CARD_BITS
+    num_bytes = (num_bits + 7) // 8
+    value |= ((1 << (num_bytes * 8 - num_bits)) - 1) << num_bits
+    return value.to_bytes(num_bytes, 'little')
+
+def unpack_cards(data):
+    """
+    Unpacks cards packed by pack_cards.
+
+    Raises:
+        ValueError: If a 6 bit field is not a card id
+    """
+    value = int.from_bytes(data, 'little')
+    cards = []
+    for position in range(len(data) * 8 // CARD_BITS):
+        card = (value >> (position * CARD_BITS)) & CARD_MASK
+        if card == NO_CARD:
+            break
+        if card >= len(CARDS):
+            raise ValueError(f"Invalid card id: {card}")
+        cards.append(CARDS[card])
+    return cards
+
+def pack_deck(deck):
+    """Packs a Deck's cards, top card last as in Deck.cards, into 6 bits per card (39 bytes for a full deck)"""
+    return pack_cards(deck.cards)
+
+def unpack_deck(data):
+    """Creates a new Deck from bytes written by pack_deck"""
+    return Deck(cards=unpack_cards(data))
+
+class HandArchiveWriter:
+    """
+    Writes a hand archive, a hand at a time or as arrays of words. Use it in a with block, or
+    call close, which writes the final count of hands into the header.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        self._file = open(path, 'wb')
+        self._file.write(_HEADER.pack(_MAGIC, _VERSION, 0, 0))
+        self._buffer = array.array('Q')
+
+    def append(self, hand, cut_card, score=None, is_crib=False, is_dealer=True):
+        """Adds one hand (see encode_hand)"""
+        self._buffer.append(encode_hand(hand, cut_card, score, is_crib=is_crib, is_dealer=is_dealer))
+        if len(self._buffer) >= _WRITE_BUFFER:
+            self._flush()
+
+    def append_words(self, words):
+        """Adds an array of words from pack_words"""
+        import numpy as np
+
+        self._flush()
+        words = np.ascontiguousarray(words, dtype='<u8')
+        self._file.write(words.tobytes())
+        self.count += len(words)
+
+    def _flush(self):
+        if self._buffer:
+            if sys.byteorder == 'big':
+                self._buffer.byteswap()
+            self._file.write(self._buffer.tobytes())
+            self.count += len(self._buffer)
+            self._buffer = array.array('Q')
+
+    def close(self):
+        if self._file.closed:
+            return
+        self._flush()
+        self._file.seek(0)
+        self._file.write(_HEADER.pack(_MAGIC, _VERSION, 0, self.count))
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+class HandArchive:
+    """
+    A read-only hand archive. words is a NumPy uint64 array memory-mapped over the file, so
+    slices of it are views rather than copies, and archive[n] decodes the N-th hand without
+    reading any other (archive[start:stop] decodes a list of them). Requires NumPy.
+    """
+    def __init__(self, path):
+        import numpy as np
+
+        with open(path, 'rb') as file:
+            header = file.read(_HEADER.size)
+        if len(header) != _HEADER.size:
+            raise ValueError(f"Not a hand archive: {path}")
+        magic, version, _, count = _HEADER.unpack(header)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError(f"Not a hand archive (or an outdated one): {path}")
+        if os.path.getsize(path) != _HEADER.size + 8 * count:
+            raise ValueError(f"Hand archive has the wrong size: {path}")
+        self.path = path
+        if count:
+            self.words = np.memmap(path, dtype='<u8', mode='r', offset=_HEADER.size, shape=(count,))
+        else:
+            # An empty file region cannot be mapped
+            self.words = np.zeros(0, dtype='<u8')
+
+    def __len__(self):
+        return len(self.words)
+
+    def __getitem__(self, index):
+        """Returns the HandRecord of the N-th hand, or a list of them for a slice"""
+        if isinstance(index, slice):
+            return [decode_hand(word) for word in self.words[index]]
+        return decode_hand(self.words[index])
+
+    def columns(self, start=0, stop=None):
+        """Returns HandColumns for the hands from start up to stop (default: the end)"""
+        return unpack_words(self.words[start:stop])
+
+    def close(self):
+        """Drops the mapping; views of words taken earlier keep the file mapped until they go"""
+        self.words = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+def write_archive(path, hands, cuts, scores, is_crib=False, is_dealer=True):
+    """Writes arrays of hands (see pack_words) to a new archive; returns the number of hands"""
+    with HandArchiveWriter(path) as writer:
+        writer.append_words(pack_words(hands, cuts, scores, is_crib=is_crib, is_dealer=is_dealer))
+    return writer.count
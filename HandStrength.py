@@ -0,0 +1,268 @@
+# This file contains the hand strength index: how a 4 card keep compares with every other 4
+# card hand, so a keep can be shown as "in the top X% of hands".
+#
+# A hand's strength is its expected score over the 48 possible cuts, without nibs (which the
+# dealer scores whatever they keep). Renaming suits never changes a score, so the index holds
+# one entry per suit-canonical hand (see DecksAndCards.Canonical): 16,432 of them, each weighted
+# by how many of the 270,725 hands share its canonical form. The expected values are
+# precomputed in parallel worker processes and saved in a small binary file that the index is
+# loaded from the first time it is used.
+#
+# Rebuild the file with:  python HandStrength.py [--workers N]
+
+from bisect import bisect_left
+from DecksAndCards.Canonical import canonical_ids, canonical_key, canonicalize_array, orbit_size
+from DecksAndCards.Card import CARDS
+import array
+import itertools
+import os
+import struct
+import sys
+import time
+import Cribbage
+
+HAND_STRENGTH_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "hand_strength.bin")
+
+# Header is (magic, format version, number of canonical hands); then, for each canonical hand
+# in order of canonical_key, its key (uint32), then each hand's total points over every cut
+# (uint16), then how many hands share its canonical form (uint8)
+_MAGIC = b"CRIBPCT\0"
+_VERSION = 1
+_HEADER = struct.Struct("<8sII")
+
+HAND_SIZE = 4
+CUTS_PER_HAND = 52 - HAND_SIZE
+# Canonical hands are scored in worker processes this many at a time
+HANDS_PER_CHUNK = 1024
+
+# The index in HAND_STRENGTH_PATH, set by load_index
+_index = None
+
+class StrengthIndex:
+    """
+    The expected score of every canonical 4 card hand and the sorted distribution of expected
+    scores over all 4 card hands. Looking up a hand takes two binary searches.
+
+    Args:
+        keys: canonical_key of each canonical hand, in increasing order
+        totals: each hand's points summed over its 48 cuts
+        weights: how many hands share each canonical form
+    """
+    def __init__(self, keys, totals, weights):
+        self.keys = array.array('I', keys)
+        self.totals = array.array('H', totals)
+        self.weights = array.array('B', weights)
+        if not len(self.keys) == len(self.totals) == len(self.weights):
+            raise ValueError("Expected a total and a weight for every key")
+        # The distinct totals in increasing order, and how many hands have a smaller total than
+        # each of them; the last entry of hands_below is every hand
+        counts = {}
+        for total, weight in zip(self.totals, self.weights):
+            counts[total] = counts.get(total, 0) + weight
+        self.distinct_totals = sorted(counts)
+        self.hands_below = list(itertools.accumulate((counts[total] for total in self.distinct_totals), initial=0))
+        self.num_hands = self.hands_below[-1]
+        # NumPy copies for the bulk queries, made the first time they are used
+        self._arrays = None
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _total(self, hand):
+        key = canonical_key(hand)
+        position = bisect_left(self.keys, key)
+        if len(hand) != HAND_SIZE or position == len(self.keys) or self.keys[position] != key:
+            raise ValueError("Expected a hand of 4 different cards")
+        return self.totals[position]
+
+    def expected_value(self, hand):
+        """Returns the points a 4 card hand is expected to score, averaged over the cuts"""
+        return self._total(hand) / CUTS_PER_HAND
+
+    def percentile(self, hand):
+        """
+        Returns the percentage of 4 card hands with a lower expected score than this one.
+        A hand at the 85th percentile is in the top 15% of hands.
+
+        Raises:
+            ValueError: If hand is not 4 different cards
+        """
+        return self.percentile_of_total(self._total(hand))
+
+    def percentile_of_total(self, total):
+        """Returns the percentage of hands whose points over all the cuts add up to less than total"""
+        return 100 * self.hands_below[bisect_left(self.distinct_totals, total)] / self.num_hands
+
+    def _numpy_arrays(self):
+        import numpy as np
+
+        if self._arrays is None:
+            self._arrays = (np.frombuffer(self.keys, dtype=np.uint32).astype(np.int64),
+                            np.frombuffer(self.totals, dtype=np.uint16),
+                            np.array(self.distinct_totals, dtype=np.uint16),
+                            np.array(self.hands_below, dtype=np.float64))
+        return self._arrays
+
+    def _bulk_totals(self, hands):
+        import numpy as np
+
+        hands = np.asarray(hands)
+        if hands.ndim != 2 or hands.shape[1] != HAND_SIZE:
+            raise ValueError(f"Expected hands of shape (N, {HAND_SIZE}), got {hands.shape}")
+        if not ((hands >= 0) & (hands < 52)).all():
+            raise ValueError("Expected card ids from 0 to 51")
+        keys, totals, _, _ = self._numpy_arrays()
+        canonical_hands, _ = canonicalize_array(hands)
+        # Packed like canonical_key: the missing cut (63), then each card in 6 bits
+        hand_keys = np.full(len(hands), 63, dtype=np.int64)
+        for position in range(HAND_SIZE):
+            hand_keys = (hand_keys << 6) | canonical_hands[:, position]
+        positions = np.minimum(np.searchsorted(keys, hand_keys), len(keys) - 1)
+        if not (keys[positions] == hand_keys).all():
+            raise ValueError("Expected hands of 4 different card ids")
+        return totals[positions]
+
+    def expected_values(self, hands):
+        """The array form of expected_value, for an (N, 4) array of card ids. Requires NumPy."""
+        return self._bulk_totals(hands) / CUTS_PER_HAND
+
+    def percentiles(self, hands):
+        """
+        The array form of percentile, for an (N, 4) array of card ids. Requires NumPy.
+
+        Returns:
+            numpy.ndarray: (N,) percentages
+        """
+        import numpy as np
+
+        _, _, distinct_totals, hands_below = self._numpy_arrays()
+        positions = np.searchsorted(distinct_totals, self._bulk_totals(hands))
+        return 100 * hands_below[positions] / self.num_hands
+
+def canonical_hands():
+    """
+    Returns every canonical 4 card hand as a sorted tuple of card ids, with how many hands
+    share its canonical form. canonical_key puts the first card in the highest bits, so the
+    hands are in order of their keys.
+
+    Returns:
+        list: (hand ids, weight) pairs
+    """
+    hands = []
+    for hand in itertools.combinations(range(52), HAND_SIZE):
+        if canonical_ids(hand)[0] == hand:
+            hands.append((hand, orbit_size(hand)))
+    return hands
+
+def _score_chunk(hands):
+    """Each hand's points without nibs, summed over every cut"""
+    totals = []
+    for hand_ids in hands:
+        hand = [CARDS[card] for card in hand_ids]
+        totals.append(sum(Cribbage.score_hand(hand, cut, is_dealer=False)
+                          for cut in CARDS if cut.id not in hand_ids))
+    return totals
+
+def compute_index(workers=None, progress=None):
+    """
+    Scores every canonical hand with every cut.
+
+    Args:
+        workers: number of worker processes (default: one per CPU)
+        progress: optional callable given the number of hands done after each chunk
+
+    Returns:
+        StrengthIndex
+    """
+    hands = canonical_hands()
+    chunks = [[hand for hand, _ in hands[start:start + HANDS_PER_CHUNK]]
+              for start in range(0, len(hands), HANDS_PER_CHUNK)]
+    totals = []
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for chunk_totals in executor.map(_score_chunk, chunks):
+            totals.extend(chunk_totals)
+            if progress is not None:
+                progress(len(totals))
+    keys = [canonical_key([CARDS[card] for card in hand]) for hand, _ in hands]
+    return StrengthIndex(keys, totals, [weight for _, weight in hands])
+
+def write_index(path, index):
+    """Writes a StrengthIndex for load_index"""
+    with open(path, 'wb') as file:
+        file.write(_HEADER.pack(_MAGIC, _VERSION, len(index)))
+        for values in (index.keys, index.totals, index.weights):
+            values = array.array(values.typecode, values)
+            if sys.byteorder == 'big':
+                values.byteswap()
+            file.write(values.tobytes())
+
+def load_index(path=HAND_STRENGTH_PATH):
+    """
+    Loads the index written by write_index, and makes it the one the module functions use.
+
+    Raises:
+        ValueError: If the file is not a hand strength file
+    """
+    global _index
+    with open(path, 'rb') as file:
+        data = file.read()
+    if len(data) < _HEADER.size:
+        raise ValueError(f"Not a hand strength file: {path}")
+    magic, version, count = _HEADER.unpack_from(data, 0)
+    if magic != _MAGIC or version != _VERSION:
+        raise ValueError(f"Not a hand strength file (or an outdated one): {path}")
+    if len(data) != _HEADER.size + 7 * count:
+        raise ValueError(f"Hand strength file has the wrong size: {path}")
+    columns = []
+    offset = _HEADER.size
+    for typecode, size in (('I', 4), ('H', 2), ('B', 1)):
+        values = array.array(typecode, data[offset:offset + size * count])
+        if sys.byteorder == 'big':
+            values.byteswap()
+        columns.append(values)
+        offset += size * count
+    _index = StrengthIndex(*columns)
+    return _index
+
+def get_index():
+    """Returns the index, loading it from HAND_STRENGTH_PATH the first time"""
+    if _index is None:
+        load_index()
+    return _index
+
+def expected_value(hand):
+    """Returns the points a 4 card hand is expected to score, averaged over the cuts"""
+    return get_index().expected_value(hand)
+
+def percentile(hand):
+    """Returns the percentage of 4 card hands with a lower expected score (see StrengthIndex.percentile)"""
+    return get_index().percentile(hand)
+
+def percentiles(hands):
+    """Returns the percentile of each hand in an (N, 4) array of card ids. Requires NumPy."""
+    return get_index().percentiles(hands)
+
+def main(argv=None):
+    # Only the command line needs argparse
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Precompute the expected score of every 4 card hand")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per CPU)")
+    parser.add_argument("--output", default=HAND_STRENGTH_PATH, help="file to write")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+
+    def progress(done):
+        print(f"{done} hands ({time.perf_counter() - start:.1f}s)", file=sys.stderr)
+
+    index = compute_index(workers=args.workers, progress=progress)
+    write_index(args.output, index)
+    print(f"Wrote {args.output}: {len(index)} canonical hands, average expected score "
+          f"{sum(total * weight for total, weight in zip(index.totals, index.weights)) / index.num_hands / CUTS_PER_HAND:.3f}",
+          file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+# This file contains scoring for the play (pegging): 15s, 31s, pairs, runs, go and last card.
+#
+# PlayState holds one count (the cards played since the count was last reset) in a
+# compact form. Each card played updates it from the previous state instead of looking
+# back over the cards already played:
+#   - pairs only need the top card's rank and how many cards in a row share it
+#   - runs only need the cards on top of the pile with no repeated rank (a repeat breaks
+#     every longer run), kept as a bitmask of ranks for each depth
+
+# Points for 2, 3 or 4 cards of the same rank played in a row
+PAIR_POINTS = (0, 0, 2, 6, 12)
+
+class PlayState:
+    """The state of one count during the play"""
+    __slots__ = ('count', 'num_cards', 'top_rank', 'same_rank', '_masks')
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Starts a new count at 0"""
+        self.count = 0
+        self.num_cards = 0
+        self.top_rank = 0
+        self.same_rank = 0
+        # _masks[k - 1] is a bitmask of the ranks of the top k cards, for every k where
+        # the top k cards have no repeated rank
+        self._masks = ()
+
+    def copy(self):
+        """Returns an independent copy, for trying out plays"""
+        state = PlayState.__new__(PlayState)
+        state.count = self.count
+        state.num_cards = self.num_cards
+        state.top_rank = self.top_rank
+        state.same_rank = self.same_rank
+        state._masks = self._masks
+        return state
+
+    def can_play(self, card):
+        """Whether the card can be played without going over 31"""
+        return self.count + card.pip <= 31
+
+    def points_if_played(self, card):
+        """Returns the points the card would score if played now, without playing it"""
+        return self._next(card)[0]
+
+    def play(self, card):
+        """
+        Plays a card and returns the points it scores.
+        Making 31 scores 2 and starts a new count.
+
+        Raises:
+            ValueError: If the card would take the count over 31
+        """
+        if not self.can_play(card):
+            raise ValueError(f"Cannot play {card.short_print()} on a count of {self.count}")
+        points, same_rank, masks = self._next(card)
+        self.count += card.pip
+        self.num_cards += 1
+        self.top_rank = card.rank
+        self.same_rank = same_rank
+        self._masks = masks
+        if self.count == 31:
+            self.reset()
+        return points
+
+    def go(self):
+        """
+        Ends the count when neither player can play (or the last card has been played).
+        Returns the 1 point for the go or last card, or 0 if the count had just made 31.
+        """
+        points = 1 if self.count > 0 else 0
+        self.reset()
+        return points
+
+    def _next(self, card):
+        rank = card.rank
+        count = self.count + card.pip
+        points = 2 if count == 15 or count == 31 else 0
+
+        same_rank = self.same_rank + 1 if rank == self.top_rank else 1
+        points += PAIR_POINTS[same_rank]
+
+        # Extend each run candidate by the new card. Candidates are nested, so the first one
+        # that already holds this rank, and every deeper one, now has a repeat and is dropped.
+        bit = 1 << rank
+        masks = [bit]
+        for mask in self._masks:
+            if mask & bit:
+                break
+            masks.append(mask | bit)
+        # The longest candidate whose ranks are consecutive is a run
+        for length in range(len(masks), 2, -1):
+            mask = masks[length - 1]
+            lowest = mask // (mask & -mask)
+            if lowest & (lowest + 1) == 0:
+                points += length
+                break
+        return points, same_rank, tuple(masks)
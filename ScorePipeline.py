@@ -0,0 +1,257 @@
+# This file streams hands from a CSV or NDJSON file, scores them in fixed-size chunks
+# and writes each record back out with its score, so memory use does not grow with the
+# size of the input.
+#
+# CSV rows hold value, suit pairs (the same tokens Deck.deck_from_file reads) for the 4
+# hand cards and then the cut card, optionally followed by a crib flag:
+#     5,H,5,C,5,D,J,S,5,S
+#     ACE,HEARTS,2,H,3,H,4,H,KING,CLUBS,crib
+# and are written back with the score as an extra column.
+#
+# CSV hands are scored as the dealer's, so include nibs, and cribs never do.
+#
+# NDJSON lines hold an object with "hand" (4 cards), "cut" and optional "crib" and "dealer"
+# flags (dealer defaults to true). Cards are short tokens like "5H" and "10D", or [value, suit] pairs:
+#     {"hand": ["5H", "5C", "5D", "JS"], "cut": "5S"}
+# and are written back with a "score" field added.
+#
+# Usage:  python ScorePipeline.py hands.csv scores.csv [--workers 4] [--chunk-size 65536]
+
+from collections import deque
+from DecksAndCards.Deck import card_from_tokens, parse_card_token
+import argparse
+import csv
+import itertools
+import json
+import sys
+import time
+import Cribbage
+
+DEFAULT_CHUNK_SIZE = 65536
+CSV_HEADERS = ['VALUE', 'VALUES', 'CARD_VALUE', 'RANK', 'HAND']
+CRIB_FLAGS = {'CRIB': True, 'TRUE': True, '1': True, 'YES': True,
+              'HAND': False, 'FALSE': False, '0': False, 'NO': False, '': False}
+
+def _parse_csv_line(line):
+    row = next(csv.reader([line]))
+    if len(row) not in (10, 11):
+        raise ValueError(f"Expected 10 columns (value, suit for 4 cards and the cut) and an optional crib flag, got {len(row)}")
+    cards = [card_from_tokens(row[i], row[i + 1]) for i in range(0, 10, 2)]
+    is_crib = _parse_crib_flag(row[10]) if len(row) == 11 else False
+    return cards[:4], cards[4], is_crib, True
+
+def _parse_ndjson_line(line):
+    record = json.loads(line)
+    if not isinstance(record, dict) or "hand" not in record or "cut" not in record:
+        raise ValueError("Expected an object with 'hand' and 'cut'")
+    hand = [_parse_json_card(card) for card in record["hand"]]
+    if len(hand) != 4:
+        raise ValueError(f"Expected 4 hand cards, got {len(hand)}")
+    is_crib = record.get("crib", False)
+    if not isinstance(is_crib, bool):
+        is_crib = _parse_crib_flag(str(is_crib))
+    is_dealer = record.get("dealer", True)
+    if not isinstance(is_dealer, bool):
+        raise ValueError(f"Invalid dealer flag: {is_dealer!r}")
+    return hand, _parse_json_card(record["cut"]), is_crib, is_dealer
+
+def _parse_json_card(card):
+    if isinstance(card, str):
+        return parse_card_token(card)
+    if isinstance(card, list) and len(card) == 2:
+        return card_from_tokens(str(card[0]), str(card[1]))
+    raise ValueError(f"Invalid card: {card!r}")
+
+def _parse_crib_flag(flag):
+    try:
+        return CRIB_FLAGS[flag.strip().upper()]
+    except KeyError:
+        raise ValueError(f"Invalid crib flag: {flag}") from None
+
+def _format_csv_line(line, score):
+    return line.rstrip("\r\n") + f",{score}\n"
+
+def _format_ndjson_line(line, score):
+    record = json.loads(line)
+    record["score"] = score
+    return json.dumps(record) + "\n"
+
+_FORMATS = {
+    "csv": (_parse_csv_line, _format_csv_line),
+    "ndjson": (_parse_ndjson_line, _format_ndjson_line),
+}
+
+def score_records(records, use_batch):
+    """
+    Scores a list of (hand, cut, is_crib, is_dealer) records, each hand 4 cards, with the
+    NumPy batch scorer (see Cribbage.score_hands) when use_batch is set.
+
+    Returns:
+        list: the score of each record
+    """
+    if use_batch:
+        import numpy as np
+        scores = np.zeros(len(records), dtype=np.uint8)
+        for is_crib, is_dealer in set((record[2], record[3]) for record in records):
+            rows = [i for i, record in enumerate(records) if record[2] == is_crib and record[3] == is_dealer]
+            hands = np.array([[card.id for card in records[i][0]] for i in rows])
+            cuts = np.array([records[i][1].id for i in rows])
+            scores[rows] = Cribbage.score_hands(hands, cuts, is_crib=is_crib, is_dealer=is_dealer)
+        return scores.tolist()
+    return [Cribbage.score_hand(hand, cut, is_crib=is_crib, is_dealer=is_dealer)
+            for hand, cut, is_crib, is_dealer in records]
+
+def score_chunk(lines, input_format, first_line_number, use_batch):
+    """
+    Scores a chunk of input lines. Blank lines are dropped.
+
+    Returns:
+        tuple: (the output text for the chunk, number of records scored)
+
+    Raises:
+        ValueError: If a line cannot be parsed, naming its line number
+    """
+    parse, format_line = _FORMATS[input_format]
+    kept = []
+    records = []
+    for line_number, line in enumerate(lines, start=first_line_number):
+        if not line.strip():
+            continue
+        try:
+            records.append(parse(line))
+        except ValueError as e:
+            raise ValueError(f"Line {line_number}: {str(e)}")
+        kept.append(line)
+    scores = score_records(records, use_batch)
+    return "".join(format_line(line, score) for line, score in zip(kept, scores)), len(records)
+
+def _chunks(lines, chunk_size, line_number):
+    """Yields (lines, first line number) for each chunk of lines"""
+    chunk = []
+    for line in lines:
+        if not chunk:
+            first_line_number = line_number
+        chunk.append(line)
+        line_number += 1
+        if len(chunk) == chunk_size:
+            yield chunk, first_line_number
+            chunk = []
+    if chunk:
+        yield chunk, first_line_number
+
+def _numpy_available():
+    try:
+        import numpy
+    except ImportError:
+        return False
+    return True
+
+def _init_worker(table_directory):
+    if table_directory is not None:
+        Cribbage.enable_score_tables(table_directory)
+
+def score_stream(infile, outfile, input_format, chunk_size=DEFAULT_CHUNK_SIZE, workers=0,
+                 use_batch=None, table_directory=None, report=None):
+    """
+    Scores every record read from infile and writes it, with its score, to outfile.
+    At most a few chunks are held in memory at once, whatever the size of the input.
+
+    Args:
+        infile, outfile: text files
+        input_format: 'csv' or 'ndjson'
+        chunk_size: number of lines scored together
+        workers: number of worker processes; 0 scores in this process
+        use_batch: use the NumPy batch scorer (default: when NumPy is installed)
+        table_directory: precomputed score tables for the scalar scorer (see Cribbage.enable_score_tables)
+        report: optional callable given (records so far, seconds so far) after each chunk
+
+    Returns:
+        tuple: (number of records scored, seconds taken)
+    """
+    if input_format not in _FORMATS:
+        raise ValueError(f"Unknown format: {input_format}")
+    if use_batch is None:
+        use_batch = _numpy_available()
+    start = time.perf_counter()
+    total = 0
+
+    def write(result):
+        nonlocal total
+        text, count = result
+        outfile.write(text)
+        total += count
+        if report is not None:
+            report(total, time.perf_counter() - start)
+
+    # A CSV header row is passed through with a score column added
+    first_line_number = 1
+    first_line = infile.readline()
+    if input_format == "csv" and first_line.split(",", 1)[0].strip().upper() in CSV_HEADERS:
+        outfile.write(_format_csv_line(first_line, "score"))
+        first_line = ""
+        first_line_number = 2
+    lines = itertools.chain([first_line] if first_line else [], infile)
+    chunks = _chunks(lines, chunk_size, first_line_number)
+    if workers == 0:
+        _init_worker(table_directory)
+        for lines, first_line_number in chunks:
+            write(score_chunk(lines, input_format, first_line_number, use_batch))
+    else:
+        # Keep a bounded number of chunks in flight and write them back in input order
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(table_directory,)) as executor:
+            pending = deque()
+            for lines, first_line_number in chunks:
+                pending.append(executor.submit(score_chunk, lines, input_format, first_line_number, use_batch))
+                if len(pending) >= 2 * workers:
+                    write(pending.popleft().result())
+            while pending:
+                write(pending.popleft().result())
+    return total, time.perf_counter() - start
+
+def _guess_format(path):
+    if path.endswith((".ndjson", ".jsonl", ".json")):
+        return "ndjson"
+    return "csv"
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score hands from a CSV or NDJSON file")
+    parser.add_argument("input", help="input file, or - for stdin")
+    parser.add_argument("output", help="output file, or - for stdout")
+    parser.add_argument("--format", choices=sorted(_FORMATS), help="input format (default: from the file extension)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="lines scored together")
+    parser.add_argument("--workers", type=int, default=0, help="worker processes (default: score in this process)")
+    parser.add_argument("--scalar", action="store_true", help="score hands one at a time instead of with NumPy")
+    parser.add_argument("--tables", help="directory of precomputed score tables for the scalar scorer")
+    args = parser.parse_args(argv)
+
+    input_format = args.format or _guess_format(args.input)
+    infile = sys.stdin if args.input == "-" else open(args.input, 'r', newline='')
+    outfile = sys.stdout if args.output == "-" else open(args.output, 'w', newline='')
+    last_report = [0.0]
+
+    def report(records, seconds):
+        if seconds - last_report[0] >= 1.0:
+            last_report[0] = seconds
+            print(f"{records} records, {records / seconds:.0f} records/s", file=sys.stderr)
+
+    try:
+        records, seconds = score_stream(infile, outfile, input_format, chunk_size=args.chunk_size,
+                                        workers=args.workers, use_batch=False if args.scalar else None,
+                                        table_directory=args.tables, report=report)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if infile is not sys.stdin:
+            infile.close()
+        if outfile is not sys.stdout:
+            outfile.close()
+    rate = records / seconds if seconds else 0.0
+    print(f"Scored {records} records in {seconds:.2f}s ({rate:.0f} records/s)", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,340 @@
+# This file contains an asyncio server that scores hands for game servers over a local TCP or
+# Unix socket. Requests that arrive together are scored together in small batches.
+#
+# Each request is one line: the 4 hand cards, a slash, the cut card and optionally "crib"
+# (score as the crib) or "pone" (score without nibs). Hands are the dealer's by default.
+#     5H 5C 5D JS / 5S
+#     2H 3H 4H 6H / JD crib
+# Each reply is one line: the score, or "error: <reason>". Replies come back in the order the
+# requests were sent, so a client can send many lines before reading any replies.
+# The line "stats" replies with the batching and latency statistics as JSON.
+#
+# Requests wait at most max_delay for others to join their batch, and a batch holds at most
+# max_batch_size requests. Once max_pending requests are waiting to be scored, connections
+# stop being read until there is room, so clients are slowed down rather than memory growing.
+#
+# Usage:  python ScoreServer.py [--port 7121] [--unix /tmp/cribbage.sock] [--max-batch-size 256]
+
+from collections import deque
+import argparse
+import asyncio
+import json
+import sys
+import time
+import ScorePipeline
+
+DEFAULT_PORT = 7121
+DEFAULT_MAX_BATCH_SIZE = 256
+# Seconds the first request of a batch waits for others to join it
+DEFAULT_MAX_DELAY = 0.002
+DEFAULT_MAX_PENDING = 4096
+# Batches at least this big are scored with NumPy when it is installed; the fixed cost of the
+# array operations makes smaller batches quicker to score one hand at a time
+BATCH_SCORER_THRESHOLD = 64
+# Replies a connection may have waiting before it stops reading requests
+CONNECTION_PIPELINE = 256
+# Request latencies and batch sizes kept for the statistics
+STATS_WINDOW = 10000
+FLAGS = {"crib": (True, True), "pone": (False, False)}
+
+def parse_request(line):
+    """
+    Parses a request line such as '5H 5C 5D JS / 5S crib'.
+
+    Returns:
+        tuple: (hand, cut card, is_crib, is_dealer)
+
+    Raises:
+        ValueError: If the line is not a valid request
+    """
+    hand_part, slash, cut_part = line.partition("/")
+    if not slash:
+        raise ValueError("Expected 4 cards, '/' and the cut card")
+    hand = [ScorePipeline.parse_card_token(token) for token in hand_part.split()]
+    if len(hand) != 4:
+        raise ValueError(f"Expected 4 hand cards, got {len(hand)}")
+    cut_tokens = cut_part.split()
+    if not 1 <= len(cut_tokens) <= 2:
+        raise ValueError("Expected the cut card and an optional 'crib' or 'pone'")
+    cut_card = ScorePipeline.parse_card_token(cut_tokens[0])
+    is_crib, is_dealer = False, True
+    if len(cut_tokens) == 2:
+        if cut_tokens[1].lower() not in FLAGS:
+            raise ValueError(f"Invalid flag: {cut_tokens[1]}")
+        is_crib, is_dealer = FLAGS[cut_tokens[1].lower()]
+    if len(set([card.id for card in hand] + [cut_card.id])) != 5:
+        raise ValueError("The same card appears twice")
+    return hand, cut_card, is_crib, is_dealer
+
+def _percentile(sorted_values, percentile):
+    # Nearest rank
+    index = max(0, -(-len(sorted_values) * percentile // 100) - 1)
+    return sorted_values[int(index)]
+
+class ScoreBatcher:
+    """
+    Collects score requests from many coroutines and scores them in batches.
+    Must be started (and closed) from the event loop that calls score.
+    """
+    def __init__(self, max_batch_size=DEFAULT_MAX_BATCH_SIZE, max_delay=DEFAULT_MAX_DELAY,
+                 max_pending=DEFAULT_MAX_PENDING, use_batch=None):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self.max_pending = max_pending
+        if use_batch is None:
+            try:
+                import numpy
+                use_batch = True
+            except ImportError:
+                use_batch = False
+        self.use_batch = use_batch
+        self.batches = 0
+        self.requests = 0
+        # Seconds from each request being queued to its score being ready
+        self._latencies = deque(maxlen=STATS_WINDOW)
+        self._batch_sizes = deque(maxlen=STATS_WINDOW)
+        # Seconds each batch took to score
+        self._batch_times = deque(maxlen=STATS_WINDOW)
+        self._queue = None
+        self._task = None
+        # The requests taken off the queue for the batch being collected or scored
+        self._batch = []
+        self._closing = False
+        # Set by close, to wake callers waiting for room in the queue
+        self._closed = None
+
+    async def start(self):
+        self._queue = asyncio.Queue(maxsize=self.max_pending)
+        self._closing = False
+        self._closed = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        """
+        Stops scoring. Requests that are queued or in the batch being collected fail with
+        ConnectionError, as do callers waiting for room and any later calls to score.
+        """
+        self._closing = True
+        if self._closed is not None:
+            self._closed.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        pending = self._batch
+        self._batch = []
+        while self._queue is not None and not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        for _, future, _ in pending:
+            if not future.done():
+                future.set_exception(ConnectionError("Score server closed"))
+
+    async def score(self, hand, cut_card, is_crib=False, is_dealer=True):
+        """
+        Returns the score of a 4 card hand, as Cribbage.score_hand would, once its batch is scored.
+
+        Raises:
+            ConnectionError: If the batcher is closed before the hand is scored
+        """
+        if self._closing:
+            raise ConnectionError("Score server closed")
+        if self._task is None:
+            raise RuntimeError("ScoreBatcher is not started")
+        future = asyncio.get_running_loop().create_future()
+        request = ((hand, cut_card, is_crib, is_dealer), future, time.perf_counter())
+        if self._queue.full():
+            # Wait for room while max_pending requests are already queued, unless close comes first
+            put = asyncio.ensure_future(self._queue.put(request))
+            closed = asyncio.ensure_future(self._closed.wait())
+            try:
+                await asyncio.wait((put, closed), return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                put.cancel()
+                closed.cancel()
+                # Let the cancellations finish, so neither is left pending
+                await asyncio.gather(put, closed, return_exceptions=True)
+        else:
+            self._queue.put_nowait(request)
+        # A request queued after close drained the queue would never be scored
+        if self._closing:
+            # close may have failed the request already; retrieve its error so asyncio doesn't report it
+            if future.done():
+                future.exception()
+            else:
+                future.cancel()
+            raise ConnectionError("Score server closed")
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            # Kept on self so close can fail the requests if it cancels the batch being collected
+            batch = self._batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_delay
+            while len(batch) < self.max_batch_size:
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            # A failure only fails this batch's requests; the batcher keeps running
+            try:
+                self._score_batch(batch)
+            except Exception as e:
+                # The traceback runs through this task's frame; a caller clearing its frames
+                # (as unittest's assertRaises does) would close the task
+                e = e.with_traceback(None)
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            self._batch = []
+
+    def _score_batch(self, batch):
+        records = [record for record, _, _ in batch]
+        start = time.perf_counter()
+        scores = ScorePipeline.score_records(records, self.use_batch and len(records) >= BATCH_SCORER_THRESHOLD)
+        now = time.perf_counter()
+        for (_, future, queued), score in zip(batch, scores):
+            # The caller may have given up waiting
+            if not future.done():
+                future.set_result(score)
+            self._latencies.append(now - queued)
+        self.batches += 1
+        self.requests += len(batch)
+        self._batch_sizes.append(len(batch))
+        self._batch_times.append(now - start)
+
+    def stats(self, percentiles=(50, 90, 99)):
+        """
+        Returns the batching statistics: total batches and requests, the average size of recent
+        batches, and percentiles in milliseconds of recent request latencies (p50_ms, ...) and of
+        the time recent batches took to score (batch_p50_ms, ...).
+        """
+        latencies = sorted(self._latencies)
+        batch_times = sorted(self._batch_times)
+        result = {
+            "batches": self.batches,
+            "requests": self.requests,
+            "average_batch_size": sum(self._batch_sizes) / len(self._batch_sizes) if self._batch_sizes else 0.0,
+            "pending": self._queue.qsize() if self._queue is not None else 0,
+        }
+        for percentile in percentiles:
+            result[f"p{percentile}_ms"] = _percentile(latencies, percentile) * 1000 if latencies else 0.0
+        for percentile in percentiles:
+            result[f"batch_p{percentile}_ms"] = _percentile(batch_times, percentile) * 1000 if batch_times else 0.0
+        return result
+
+async def _handle_connection(batcher, reader, writer):
+    # Replies are awaited and written in request order by a separate task, so the reader can
+    # keep collecting requests that will be batched together. Once CONNECTION_PIPELINE replies
+    # are waiting, the reader stops until the client reads some.
+    replies = asyncio.Queue(maxsize=CONNECTION_PIPELINE)
+    closed = False
+
+    async def write_replies():
+        nonlocal closed
+        while True:
+            reply = await replies.get()
+            if reply is None:
+                return
+            if isinstance(reply, asyncio.Future):
+                try:
+                    reply = str(await reply)
+                except Exception as e:
+                    reply = f"error: {e}"
+            # Keep taking replies after the client goes away so the reader never blocks
+            if closed:
+                continue
+            try:
+                writer.write(reply.encode() + b"\n")
+                await writer.drain()
+            except ConnectionError:
+                closed = True
+
+    async def score_line(line):
+        return await batcher.score(*parse_request(line))
+
+    writer_task = asyncio.create_task(write_replies())
+    try:
+        while not closed:
+            try:
+                data = await reader.readline()
+            except (ConnectionError, ValueError):
+                # Reset, or a line longer than the stream's limit
+                break
+            if not data:
+                break
+            line = data.decode(errors="replace").strip()
+            if not line:
+                continue
+            if line.lower() == "stats":
+                await replies.put(json.dumps(batcher.stats()))
+                continue
+            await replies.put(asyncio.ensure_future(score_line(line)))
+        await replies.put(None)
+        await writer_task
+    finally:
+        writer_task.cancel()
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
+
+async def start_server(batcher, host="127.0.0.1", port=DEFAULT_PORT, path=None):
+    """
+    Starts serving score requests with a started ScoreBatcher, on a Unix socket if path is
+    given, otherwise on TCP (port 0 picks a free port).
+
+    Returns:
+        asyncio.Server
+    """
+    def handle(reader, writer):
+        return _handle_connection(batcher, reader, writer)
+
+    if path is not None:
+        return await asyncio.start_unix_server(handle, path=path)
+    return await asyncio.start_server(handle, host, port)
+
+async def _serve(args):
+    batcher = ScoreBatcher(max_batch_size=args.max_batch_size, max_delay=args.max_delay_ms / 1000,
+                           max_pending=args.max_pending, use_batch=False if args.scalar else None)
+    await batcher.start()
+    server = await start_server(batcher, args.host, args.port, args.unix)
+    where = args.unix or ", ".join(str(sock.getsockname()) for sock in server.sockets)
+    print(f"Scoring hands on {where}", file=sys.stderr)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await batcher.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve hand scores over a local socket")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="TCP port to listen on")
+    parser.add_argument("--unix", help="listen on this Unix socket path instead of TCP")
+    parser.add_argument("--max-batch-size", type=int, default=DEFAULT_MAX_BATCH_SIZE, help="most requests scored together")
+    parser.add_argument("--max-delay-ms", type=float, default=DEFAULT_MAX_DELAY * 1000,
+                        help="longest a request waits for others to join its batch")
+    parser.add_argument("--max-pending", type=int, default=DEFAULT_MAX_PENDING,
+                        help="requests waiting to be scored before connections stop being read")
+    parser.add_argument("--scalar", action="store_true", help="score hands one at a time instead of with NumPy")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
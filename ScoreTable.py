@@ -0,0 +1,235 @@
+# This file contains the precomputed score tables, which hold the score of every
+# 4 card hand with every cut card so scoring becomes a single lookup.
+#
+# Each table is a flat array of one byte per (hand, cut). A hand is indexed by the
+# combinatorial rank of its sorted card ids, and the cut by its position among
+# the cards left over, so every (hand, cut) pair maps to exactly one entry.
+#
+# Nibs is left out of the scores, since only the dealer's hand scores it; score_hand
+# adds it on lookup.
+#
+# Tables are built for the rules of a variant (see Rules), which decide the number of cards
+# in the hand and crib and how flushes score. Standard six-card tables go straight in the
+# directory; other variants go in a subdirectory named by their Rules.table_key, so the
+# tables for each variant are built once and found again by the hash of its rules.
+#
+# Build the tables once with:  python ScoreTable.py <directory> [--variant five-card]
+
+from math import comb
+import Cribbage
+import mmap
+import os
+import struct
+from DecksAndCards import Rules
+
+HAND_TABLE_NAME = "hand_scores.bin"
+CRIB_TABLE_NAME = "crib_scores.bin"
+
+# Header is (magic, format version, is_crib, cards in each hand, Rules.table_key)
+_MAGIC = b"CRIBTBL\0"
+# Version 2 stopped including nibs in the scores; version 3 added the number of cards and the rules
+_VERSION = 3
+_HEADER = struct.Struct("<8sIII12s")
+
+# Sizes for standard 4 card hands
+CUTS_PER_HAND = 48
+NUM_HANDS = comb(52, 4)
+TABLE_SIZE = NUM_HANDS * CUTS_PER_HAND
+
+# Binomial coefficients used to rank a sorted hand: C(n, k) for k = 1..6
+_BINOMIALS = [[comb(n, k) for n in range(52)] for k in range(7)]
+
+def table_size(num_cards):
+    """Returns the number of entries in a table of num_cards card hands"""
+    return comb(52, num_cards) * (52 - num_cards)
+
+def table_index(hand, cut_card, num_cards=4):
+    """
+    Returns the table entry for a hand of num_cards distinct cards and a cut card that is not in the hand.
+    Returns None for anything else (other hand sizes, no cut, repeated cards), which the tables do not cover.
+    """
+    if len(hand) != num_cards or cut_card is None:
+        return None
+    cut = cut_card.id
+    if num_cards == 4:
+        a, b, c, d = sorted(card.id for card in hand)
+        if a == b or b == c or c == d or cut in (a, b, c, d):
+            return None
+        hand_rank = _BINOMIALS[1][a] + _BINOMIALS[2][b] + _BINOMIALS[3][c] + _BINOMIALS[4][d]
+        # The cut's position among the 48 cards that are not in the hand
+        cut_position = cut - (a < cut) - (b < cut) - (c < cut) - (d < cut)
+        return hand_rank * CUTS_PER_HAND + cut_position
+    ids = sorted(card.id for card in hand)
+    if len(set(ids)) != num_cards or cut in ids:
+        return None
+    hand_rank = sum(_BINOMIALS[k + 1][card] for k, card in enumerate(ids))
+    cut_position = cut - sum(card < cut for card in ids)
+    return hand_rank * (52 - num_cards) + cut_position
+
+class ScoreTable:
+    """A read-only, memory-mapped score table written by build_tables"""
+    def __init__(self, path):
+        with open(path, 'rb') as file:
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < _HEADER.size:
+            self._map.close()
+            raise ValueError(f"Not a score table: {path}")
+        magic, version, is_crib, num_cards, table_key = _HEADER.unpack_from(self._map, 0)
+        if magic != _MAGIC or version != _VERSION:
+            self._map.close()
+            raise ValueError(f"Not a score table (or an outdated one): {path}")
+        if len(self._map) != _HEADER.size + table_size(num_cards):
+            self._map.close()
+            raise ValueError(f"Score table has the wrong size: {path}")
+        self.path = path
+        self.is_crib = bool(is_crib)
+        self.num_cards = num_cards
+        # Rules.table_key of the rules the table was built for
+        self.table_key = table_key.decode()
+
+    def lookup(self, hand, cut_card):
+        """Returns the score of the hand with the cut card, or None if the table does not cover it"""
+        index = table_index(hand, cut_card, self.num_cards)
+        if index is None:
+            return None
+        return self._map[_HEADER.size + index]
+
+    def close(self):
+        self._map.close()
+
+def load_tables(directory):
+    """Memory-maps the hand and crib tables from a directory written by build_tables"""
+    hand_table = ScoreTable(os.path.join(directory, HAND_TABLE_NAME))
+    crib_table = ScoreTable(os.path.join(directory, CRIB_TABLE_NAME))
+    if hand_table.is_crib or not crib_table.is_crib:
+        hand_table.close()
+        crib_table.close()
+        raise ValueError(f"Hand and crib tables are swapped in {directory}")
+    if hand_table.table_key != crib_table.table_key:
+        hand_table.close()
+        crib_table.close()
+        raise ValueError(f"Hand and crib tables are for different rules in {directory}")
+    return hand_table, crib_table
+
+def variant_directory(directory, rules):
+    """Returns where the tables for a variant's rules are kept under a directory of tables"""
+    if Rules.table_key(rules) == Rules.table_key(Rules.STANDARD):
+        return directory
+    return os.path.join(directory, Rules.table_key(rules))
+
+def variant_tables(directory, rules):
+    """
+    Returns the directory with the tables for a variant's rules under a directory of tables
+    (see variant_directory), building them first if they are not there yet.
+    """
+    path = variant_directory(directory, rules)
+    if not all(os.path.exists(os.path.join(path, name)) for name in (HAND_TABLE_NAME, CRIB_TABLE_NAME)):
+        build_tables(path, rules)
+    return path
+
+def build_tables(directory, rules=None):
+    """
+    Scores every hand with every cut and writes the hand and crib tables to a directory.
+    rules is the Rules.Rules of a variant (default: standard six-card cribbage).
+    """
+    rules = rules or Rules.STANDARD
+    os.makedirs(directory, exist_ok=True)
+    # Write to temporary names first, so a killed build never leaves a partial table behind
+    # for variant_tables to take as finished
+    with open(os.path.join(directory, HAND_TABLE_NAME) + ".tmp", 'wb') as hand_file, \
+         open(os.path.join(directory, CRIB_TABLE_NAME) + ".tmp", 'wb') as crib_file:
+        write_header(hand_file, is_crib=False, rules=rules)
+        write_header(crib_file, is_crib=True, rules=rules)
+        # Hands and cribs of the same size are scored together
+        if rules.hand_size == rules.crib_size:
+            sizes = [(rules.hand_size, (hand_file, crib_file))]
+        else:
+            sizes = [(rules.hand_size, (hand_file, None)), (rules.crib_size, (None, crib_file))]
+        for num_cards, files in sizes:
+            # Hands are ranked by their highest card first, so each block follows the last
+            for top in range(num_cards - 1, 52):
+                for file, scores in zip(files, score_block(top, rules, num_cards)):
+                    if file is not None:
+                        file.write(scores)
+    for name in (HAND_TABLE_NAME, CRIB_TABLE_NAME):
+        os.replace(os.path.join(directory, name) + ".tmp", os.path.join(directory, name))
+
+def write_header(file, is_crib, rules=None):
+    """Writes the header that starts a table file; the scores follow it in table order"""
+    rules = rules or Rules.STANDARD
+    num_cards = rules.crib_size if is_crib else rules.hand_size
+    file.write(_HEADER.pack(_MAGIC, _VERSION, int(is_crib), num_cards, Rules.table_key(rules).encode()))
+
+def block_start(top, num_cards=4):
+    """Returns the index of the first table entry for hands whose highest card id is `top`"""
+    return comb(top, num_cards) * (52 - num_cards)
+
+def block_hands(top, num_cards=4):
+    """Yields the sorted card ids of every hand whose highest card id is `top`, in table order"""
+    if num_cards == 4:
+        for c in range(2, top):
+            for b in range(1, c):
+                for a in range(b):
+                    yield (a, b, c, top)
+        return
+    if num_cards == 1:
+        yield (top,)
+        return
+    # Table order ranks the lower cards by their highest card first too
+    for below in range(num_cards - 2, top):
+        for lower in block_hands(below, num_cards - 1):
+            yield lower + (top,)
+
+def score_block(top, rules=None, num_cards=4):
+    """
+    Scores every hand of num_cards cards whose highest card id is `top`, with every cut, in
+    table order, under a variant's rules (default: standard six-card cribbage).
+    Returns the (hand, crib) scores as two bytearrays. Nibs is not included.
+    """
+    rules = rules or Rules.STANDARD
+    hand_scores = bytearray()
+    crib_scores = bytearray()
+    # A flush is a point a card, and one more with the cut; without the cut only if the rules allow
+    hand_flush_points = 0 if rules.hand_flush_needs_cut else num_cards
+    crib_flush_points = 0 if rules.crib_flush_needs_cut else num_cards
+    for ids in block_hands(top, num_cards):
+        ranks = [card % 13 + 1 for card in ids]
+        suits = [card // 13 for card in ids]
+        flush_suit = suits[0] if suits.count(suits[0]) == num_cards else None
+        jack_suits = [suit for rank, suit in zip(ranks, suits) if rank == 11]
+        # 15s, pairs and runs depend only on the cut's rank
+        rank_part = [Cribbage.score_ranks(ranks + [cut_rank]) for cut_rank in range(1, 14)]
+
+        for cut in range(52):
+            if cut in ids:
+                continue
+            cut_rank = cut % 13 + 1
+            cut_suit = cut // 13
+            score = rank_part[cut_rank - 1]
+            # Nobs
+            score += jack_suits.count(cut_suit)
+            hand_flush = crib_flush = 0
+            if flush_suit is not None:
+                hand_flush = hand_flush_points
+                crib_flush = crib_flush_points
+                if cut_suit == flush_suit:
+                    hand_flush = crib_flush = num_cards + 1
+            hand_scores.append(score + hand_flush)
+            crib_scores.append(score + crib_flush)
+    return hand_scores, crib_scores
+
+def main(argv=None):
+    # Only the command line needs argparse; enable_score_tables imports this module too
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build the precomputed score tables")
+    parser.add_argument("directory", help="directory of tables; variants go in a subdirectory named by their rules")
+    parser.add_argument("--variant", choices=sorted(Rules.VARIANTS), default=Rules.STANDARD.name, help="rules to build for")
+    args = parser.parse_args(argv)
+    rules = Rules.VARIANTS[args.variant]
+    path = variant_directory(args.directory, rules)
+    build_tables(path, rules)
+    print(f"Wrote {args.variant} tables to {path}")
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,10 @@
 from DecksAndCards.Deck import Deck
 from DecksAndCards.Card import Card, Suits, Values
+import sys
 import Cribbage
+from DecksAndCards import Rules
 
-def main():
+def main(rules=Rules.STANDARD):
     # Create a new deck
     deck = Deck()
 
@@ -11,21 +13,21 @@ def main():
 
     # Create a list to serve as our hand of cards
     hand = []
-    # Draw 6 cards from the deck and add them to the hand
-    hand.extend(deck.draw(6))
+    # Draw the cards dealt to each player in this variant and add them to the hand
+    hand.extend(deck.draw(rules.cards_dealt))
 
-    # Print the hand, prompting the user to choose 2 cards to "discard" into the crib
+    # Print the hand, prompting the user to choose cards to "discard" into the crib
     print_hand(hand)
-    print("Choose 2 cards to discard into the crib:")
+    print(f"Choose {rules.discards} cards to discard into the crib:")
     crib = []
-    for i in range(2):
+    for i in range(rules.discards):
         choose_discard(hand, crib)
 
     # "Draw" the cut card.
     cut_card = deck.draw()[0]
 
     # Score the hand
-    score = Cribbage.score_hand(hand, cut_card)
+    score = Cribbage.score_hand(hand, cut_card, rules=rules)
     print_hand_and_cut_card(hand, cut_card)
     print(f"Your score is: {score}")
 
@@ -44,4 +46,9 @@ def print_hand_and_cut_card(hand, cut_card):
     print(f"Cut Card: {cut_card.full_print()}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    # Optionally the variant to play: python main.py five-card
+    variant = sys.argv[1] if len(sys.argv) > 1 else Rules.STANDARD.name
+    if variant not in Rules.VARIANTS:
+        print(f"Unknown variant: {variant}. Choose from {', '.join(sorted(Rules.VARIANTS))}")
+        sys.exit(1)
+    main(Rules.VARIANTS[variant])